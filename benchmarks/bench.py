@@ -0,0 +1,201 @@
+"""
+Benchmark the MCP tools against the in-process fake Airflow API.
+
+Every scenario calls a registered tool through FastMCP (argument validation
+and result serialization included) and reports latency percentiles,
+throughput at several concurrency levels and the upstream requests each call
+caused. Results can be saved as JSON and compared against a baseline run:
+
+    uv run benchmarks/bench.py --dags 10000 --latency 0.005 --json before.json
+    uv run benchmarks/bench.py --dags 10000 --latency 0.005 --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_airflow import FakeAirflow  # noqa: E402
+
+# (tool, arguments) pairs; DAG-specific scenarios use the first DAGs of the fake.
+SCENARIOS = [
+    ("get_dags_list", {}),
+    ("search_dags", {"tags": ["team_1"], "is_paused": False}),
+    ("get_dag_details", {"dag_id": "dag_00001"}),
+    ("get_dag_runs", {"dag_id": "dag_00001"}),
+    ("get_dag_runs", {"dag_id": "dag_00001", "fields": ["dag_run_id", "state"], "output_format": "table"}),
+    ("get_task_instance", {"dag_id": "dag_00001", "run_id": "scheduled__2025-01-01T00:00:00+00:00"}),
+    ("get_task_instances_batch", {"dag_ids": [f"dag_{i:05d}" for i in range(20)], "states": ["failed", "running"]}),
+    ("get_task_instance_summary", {"dag_ids": [f"dag_{i:05d}" for i in range(5)]}),
+    ("get_dag_run_summary", {"dag_ids": [f"dag_{i:05d}" for i in range(5)]}),
+    ("list_backfills", {"dag_id": "dag_00001"}),
+    ("plan_backfill", {"dag_ids": ["dag_00001"], "from_date": "2025-01-01T00:00:00Z", "to_date": "2025-12-31T00:00:00Z"}),
+    ("list_connections", {}),
+    ("get_assets", {}),
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples`."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def scenario_name(tool: str, arguments: dict) -> str:
+    extras = sorted(key for key in arguments if key in ("fields", "output_format"))
+    return f"{tool}[{','.join(extras)}]" if extras else tool
+
+
+async def run_scenario(mcp, fake: FakeAirflow, tool: str, arguments: dict, iterations: int, concurrency: list[int]) -> dict:
+    errors = 0
+
+    async def call() -> float:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            await mcp.call_tool(tool, arguments)
+        except Exception:
+            errors += 1
+        return time.perf_counter() - start
+
+    # Warm up (token, connection pool, DAG catalog) before measuring.
+    await call()
+
+    fake.reset_counters()
+    latencies = [await call() for _ in range(iterations)]
+    upstream = sum(fake.requests.values()) / iterations
+    upstream_bytes = fake.bytes_sent / iterations
+
+    throughput = {}
+    for workers in concurrency:
+        calls = max(iterations, workers * 4)
+        queue = asyncio.Queue()
+        for _ in range(calls):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                await call()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        throughput[str(workers)] = round(calls / (time.perf_counter() - start), 1)
+
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "upstream_requests": round(upstream, 2),
+        "upstream_kb": round(upstream_bytes / 1024, 1),
+        "throughput": throughput,
+        "errors": errors,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """List scenarios that got slower, lost throughput or issue more upstream requests than `baseline`."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+        if current["upstream_requests"] > before["upstream_requests"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: upstream requests {before['upstream_requests']} -> {current['upstream_requests']} per call"
+            )
+        for workers, rate in current["throughput"].items():
+            old = before["throughput"].get(workers)
+            if old and rate < old * (1 - tolerance):
+                regressions.append(f"{name}: throughput x{workers} {old} -> {rate} calls/s")
+    return regressions
+
+
+def print_table(results: dict) -> None:
+    levels = next(iter(results.values()))["throughput"].keys() if results else []
+    header = f"{'scenario':48s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'req/call':>9s} {'KB/call':>9s}"
+    header += "".join(f" {'x' + level + ' /s':>10s}" for level in levels)
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        line = f"{name:48s} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f} {row['p99_ms']:8.2f}"
+        line += f" {row['upstream_requests']:9.2f} {row['upstream_kb']:9.1f}"
+        line += "".join(f" {row['throughput'][level]:10.1f}" for level in levels)
+        if row["errors"]:
+            line += f"  ({row['errors']} errors)"
+        print(line)
+
+
+async def main(args) -> int:
+    from mcp.server.fastmcp import FastMCP
+
+    from services.airflow_client import AirflowClient
+    from tools.register_tools import RegisterTools
+
+    fake = FakeAirflow(
+        dags=args.dags,
+        runs_per_dag=args.runs_per_dag,
+        tasks_per_dag=args.tasks_per_dag,
+        connections=args.connections,
+        assets=args.assets,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+    )
+    client = AirflowClient(transport=fake.transport())
+    client.cache.enabled = not args.no_cache
+
+    mcp = FastMCP("Airflow MCP benchmark", log_level="WARNING")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    tools = RegisterTools(mcp, client)
+    tools.register_all()
+
+    selected = [(tool, arguments) for tool, arguments in SCENARIOS if not args.tools or tool in args.tools]
+    results = {}
+    async with client:
+        for tool, arguments in selected:
+            name = scenario_name(tool, arguments)
+            print(f"… {name}", file=sys.stderr)
+            results[name] = await run_scenario(mcp, fake, tool, arguments, args.iterations, args.concurrency)
+
+    print_table(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MCP tools against a fake Airflow API")
+    parser.add_argument("--dags", type=int, default=1000, help="Number of DAGs (default: 1000)")
+    parser.add_argument("--runs-per-dag", type=int, default=10)
+    parser.add_argument("--tasks-per-dag", type=int, default=8)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--assets", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds of latency per upstream request")
+    parser.add_argument("--jitter", type=float, default=0.001, help="Extra random latency per request (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--iterations", type=int, default=20, help="Sequential calls per scenario")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent callers to measure")
+    parser.add_argument("--tools", nargs="+", help="Only benchmark these tools")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json file; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default: 0.2)")
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,691 @@
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote
+
+import httpx
+
+TAGS = [f"team_{i}" for i in range(10)] + ["tier_1", "tier_2", "tier_3", "finance", "ml", "etl"]
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+class FakeAirflow:
+    """
+    In-process fake of the Airflow 3 REST API (`/api/v2`) for benchmarks.
+
+    Serves auth, DAGs, DAG runs, task instances (including the batch
+    `.../taskInstances/list` endpoint), tasks, backfills, connections and
+    assets from deterministic synthetic data, with Airflow's pagination,
+    the common filters and ETag/If-None-Match support. DAG runs and task
+    instances are generated lazily per DAG, so 50k DAGs stay cheap until
+    they are actually requested. A created backfill queues its runs and
+    completes them the next time backfills are listed; like Airflow, only one
+    backfill per DAG may be active (409 otherwise).
+
+    Plug it into the server with `AirflowClient(transport=fake.transport())`.
+
+    Args:
+        dags (int): Number of DAGs.
+        runs_per_dag (int): DAG runs per DAG (one daily run each, the newest still running).
+        tasks_per_dag (int): Tasks per DAG; every run has one task instance per task.
+        connections (int): Number of connections.
+        assets (int): Number of assets.
+        backfills (int): Number of backfills, spread over the first DAGs.
+        log_lines (int): Lines in every task instance log, served 500 per continuation token.
+        latency (float): Seconds added to every response.
+        jitter (float): Extra uniformly random latency, in seconds.
+        error_rate (float): Fraction of API requests answered with `error_status`.
+        error_status (int): Status code of injected errors (503 by default).
+        max_page_limit (int): Largest honoured `limit`, like `[api] maximum_page_limit`.
+        seed (int): Seed for the synthetic data and injected errors.
+    """
+
+    def __init__(
+        self,
+        dags: int = 1000,
+        runs_per_dag: int = 10,
+        tasks_per_dag: int = 8,
+        connections: int = 200,
+        assets: int = 500,
+        backfills: int = 50,
+        log_lines: int = 2000,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        max_page_limit: int = 100,
+        seed: int = 0,
+    ):
+        self.runs_per_dag = runs_per_dag
+        self.tasks_per_dag = tasks_per_dag
+        self.log_lines = log_lines
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_page_limit = max_page_limit
+        self.seed = seed
+        self._random = random.Random(seed)
+
+        self.dags = {dag["dag_id"]: dag for dag in (self._dag(i) for i in range(dags))}
+        self.connections = {conn["connection_id"]: conn for conn in (self._connection(i) for i in range(connections))}
+        self.assets = [self._asset(i) for i in range(assets)]
+        dag_ids = list(self.dags)
+        self.backfills = [self._backfill(i, dag_ids[i % len(dag_ids)]) for i in range(backfills)] if dag_ids else []
+
+        self._runs: dict[str, list[dict]] = {}
+        self._task_instances: dict[tuple, list[dict]] = {}
+
+        # Requests served, keyed by "METHOD route", e.g. "GET dags/{dag_id}/dagRuns".
+        self.requests: Counter = Counter()
+        self.bytes_sent = 0
+
+        self._routes = [
+            ("POST", r"auth/token", self._token),
+            ("GET", r"api/v2/dags", self._list_dags),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)", self._get_dag),
+            ("PATCH", r"api/v2/dags/(?P<dag_id>[^/]+)", self._patch_dag),
+            ("DELETE", r"api/v2/dags/(?P<dag_id>[^/]+)", self._delete_dag),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)/details", self._get_dag_details),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)/tasks", self._list_tasks),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns", self._list_dag_runs),
+            ("POST", r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns", self._trigger_dag_run),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns/(?P<run_id>[^/]+)", self._get_dag_run),
+            ("POST", r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns/(?P<run_id>[^/]+)/clear", self._clear_dag_run),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns/(?P<run_id>[^/]+)/taskInstances", self._list_task_instances),
+            ("GET", r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns/(?P<run_id>[^/]+)/taskInstances/(?P<task_id>[^/]+)", self._get_task_instance),
+            (
+                "GET",
+                r"api/v2/dags/(?P<dag_id>[^/]+)/dagRuns/(?P<run_id>[^/]+)/taskInstances/(?P<task_id>[^/]+)/logs/(?P<try_number>\d+)",
+                self._task_logs,
+            ),
+            ("POST", r"api/v2/dags/~/dagRuns/~/taskInstances/list", self._batch_task_instances),
+            ("GET", r"api/v2/backfills", self._list_backfills),
+            ("POST", r"api/v2/backfills", self._create_backfill),
+            ("POST", r"api/v2/backfills/dry_run", self._dry_run_backfill),
+            ("GET", r"api/v2/connections", self._list_connections),
+            ("POST", r"api/v2/connections", self._create_connection),
+            ("PATCH", r"api/v2/connections", self._bulk_connections),
+            ("GET", r"api/v2/connections/(?P<conn_id>[^/]+)", self._get_connection),
+            ("PATCH", r"api/v2/connections/(?P<conn_id>[^/]+)", self._patch_connection),
+            ("DELETE", r"api/v2/connections/(?P<conn_id>[^/]+)", self._delete_connection),
+            ("GET", r"api/v2/assets", self._list_assets),
+        ]
+        self._compiled = [(method, re.compile(pattern + "$"), pattern, handler) for method, pattern, handler in self._routes]
+
+    # ----------------------------- Transport ----------------------------- #
+    def transport(self) -> httpx.MockTransport:
+        """Return an httpx transport that routes requests to this fake."""
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        path = request.url.path.lstrip("/")
+        for method, pattern, route, handler in self._compiled:
+            match = pattern.match(path)
+            if method != request.method or match is None:
+                continue
+
+            self.requests[f"{method} {self._route_name(route)}"] += 1
+            if route != "auth/token" and self.error_rate and self._random.random() < self.error_rate:
+                return httpx.Response(self.error_status, text="Injected error")
+
+            params = {key: unquote(value) for key, value in match.groupdict().items()}
+            status, body = handler(request, **params)
+            return self._respond(request, status, body)
+
+        self.requests[f"{request.method} <unmatched>"] += 1
+        return httpx.Response(404, json={"detail": f"No route for {request.method} {path}"})
+
+    def _respond(self, request: httpx.Request, status: int, body) -> httpx.Response:
+        content = json.dumps(body, separators=(",", ":")).encode() if body is not None else b""
+        headers = {"content-type": "application/json"}
+
+        if request.method == "GET" and status == 200:
+            etag = '"' + hashlib.md5(content).hexdigest() + '"'
+            headers["etag"] = etag
+            if request.headers.get("if-none-match") == etag:
+                return httpx.Response(304, headers=headers)
+
+        self.bytes_sent += len(content)
+        return httpx.Response(status, content=content, headers=headers)
+
+    @staticmethod
+    def _route_name(route: str) -> str:
+        return re.sub(r"\(\?P<(\w+)>[^)]*\)", r"{\1}", route).removeprefix("api/v2/")
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+        self.bytes_sent = 0
+
+    # ----------------------------- Helpers ------------------------------- #
+    def _page(self, request: httpx.Request, items: list, key: str, offset=None, limit=None) -> tuple[int, dict]:
+        query = request.url.params
+        offset = int(offset if offset is not None else query.get("offset", 0))
+        limit = min(int(limit if limit is not None else query.get("limit", 50)), self.max_page_limit)
+        return 200, {key: items[offset:offset + limit], "total_entries": len(items)}
+
+    @staticmethod
+    def _body(request: httpx.Request) -> dict:
+        return json.loads(request.content) if request.content else {}
+
+    @staticmethod
+    def _not_found(what: str) -> tuple[int, dict]:
+        return 404, {"detail": f"{what} not found"}
+
+    @staticmethod
+    def _in_range(value, gte=None, lte=None) -> bool:
+        if gte and (value is None or value < gte.replace("+00:00", "Z")):
+            return False
+        if lte and (value is None or value > lte.replace("+00:00", "Z")):
+            return False
+        return True
+
+    # ----------------------------- Synthetic data ------------------------- #
+    def _dag(self, i: int) -> dict:
+        dag_id = f"dag_{i:05d}"
+        return {
+            "dag_id": dag_id,
+            "dag_display_name": dag_id,
+            "is_paused": i % 7 == 0,
+            "is_stale": False,
+            "last_parsed_time": _iso(EPOCH),
+            "bundle_name": "dags-folder",
+            "relative_fileloc": f"team_{i % 10}/{dag_id}.py",
+            "fileloc": f"/opt/airflow/dags/team_{i % 10}/{dag_id}.py",
+            "description": f"Synthetic DAG {i}",
+            "timetable_summary": "@daily",
+            "tags": [{"name": TAGS[i % 10], "dag_id": dag_id}, {"name": TAGS[10 + i % 6], "dag_id": dag_id}],
+            "owners": [f"owner_{i % 25}"],
+            "max_active_runs": 16,
+            "max_active_tasks": 16,
+            "has_import_errors": False,
+            "next_dagrun_logical_date": _iso(EPOCH + timedelta(days=self.runs_per_dag)),
+            "next_dagrun_run_after": _iso(EPOCH + timedelta(days=self.runs_per_dag)),
+        }
+
+    def _tasks(self, dag_id: str) -> list[dict]:
+        # A small diamond-rich graph: task_k feeds task_k+1 and task_k+2.
+        count = self.tasks_per_dag
+        return [
+            {
+                "task_id": f"task_{k}",
+                "task_display_name": f"task_{k}",
+                "operator_name": "PythonOperator",
+                "downstream_task_ids": [f"task_{j}" for j in (k + 1, k + 2) if j < count],
+                "retries": 2,
+                "pool": "default_pool",
+                "queue": "default",
+            }
+            for k in range(count)
+        ]
+
+    def _dag_runs(self, dag_id: str) -> list[dict]:
+        runs = self._runs.get(dag_id)
+        if runs is None:
+            rng = random.Random(f"{self.seed}-{dag_id}")
+            runs = []
+            for day in range(self.runs_per_dag):
+                logical = EPOCH + timedelta(days=day)
+                start = logical + timedelta(seconds=rng.randint(1, 30))
+                running = day == self.runs_per_dag - 1
+                state = "running" if running else ("failed" if rng.random() < 0.08 else "success")
+                runs.append({
+                    "dag_run_id": f"scheduled__{logical.isoformat()}",
+                    "dag_id": dag_id,
+                    "logical_date": _iso(logical),
+                    "queued_at": _iso(logical),
+                    "start_date": _iso(start),
+                    "end_date": None if running else _iso(start + timedelta(seconds=rng.randint(60, 3600))),
+                    "data_interval_start": _iso(logical - timedelta(days=1)),
+                    "data_interval_end": _iso(logical),
+                    "run_after": _iso(logical),
+                    "last_scheduling_decision": _iso(start),
+                    "run_type": "scheduled",
+                    "state": state,
+                    "triggered_by": "timetable",
+                    "conf": {},
+                    "note": None,
+                    "dag_versions": [{"id": f"v-{dag_id}", "version_number": 1, "dag_id": dag_id, "bundle_name": "dags-folder"}],
+                    "bundle_version": None,
+                    "dag_display_name": dag_id,
+                })
+            self._runs[dag_id] = runs
+        return runs
+
+    def _run_task_instances(self, dag_id: str, run: dict) -> list[dict]:
+        key = (dag_id, run["dag_run_id"])
+        instances = self._task_instances.get(key)
+        if instances is None:
+            rng = random.Random(f"{self.seed}-{key}")
+            instances = []
+            clock = datetime.fromisoformat(run["start_date"].replace("Z", "+00:00"))
+            for k, task in enumerate(self._tasks(dag_id)):
+                duration = round(rng.uniform(5, 600), 3)
+                if run["state"] == "running" and k >= self.tasks_per_dag // 2:
+                    state = "running" if k == self.tasks_per_dag // 2 else None
+                elif run["state"] == "failed" and k == self.tasks_per_dag - 1:
+                    state = "failed"
+                else:
+                    state = "success"
+                finished = state in ("success", "failed")
+                instances.append({
+                    "id": f"{dag_id}-{run['dag_run_id']}-{k}",
+                    "task_id": task["task_id"],
+                    "task_display_name": task["task_id"],
+                    "dag_id": dag_id,
+                    "dag_run_id": run["dag_run_id"],
+                    "map_index": -1,
+                    "logical_date": run["logical_date"],
+                    "run_after": run["run_after"],
+                    "start_date": _iso(clock) if state else None,
+                    "end_date": _iso(clock + timedelta(seconds=duration)) if finished else None,
+                    "duration": duration if finished else None,
+                    "state": state,
+                    "try_number": 1 + (state == "failed"),
+                    "max_tries": 2,
+                    "hostname": f"worker-{k % 4}",
+                    "unixname": "airflow",
+                    "pool": "default_pool",
+                    "pool_slots": 1,
+                    "queue": "default",
+                    "priority_weight": self.tasks_per_dag - k,
+                    "operator": "PythonOperator",
+                    "queued_when": _iso(clock),
+                    "scheduled_when": _iso(clock),
+                    "pid": 1000 + k,
+                    "executor": None,
+                    "executor_config": "{}",
+                    "note": None,
+                    "rendered_map_index": None,
+                    "rendered_fields": {"op_kwargs": {"partition": run["logical_date"]}},
+                    "trigger": None,
+                    "triggerer_job": None,
+                    "dag_version": {"id": f"v-{dag_id}", "version_number": 1, "dag_id": dag_id},
+                })
+                if finished:
+                    clock += timedelta(seconds=duration)
+            self._task_instances[key] = instances
+        return instances
+
+    @staticmethod
+    def _connection(i: int) -> dict:
+        conn_type = ("postgres", "http", "aws", "snowflake")[i % 4]
+        return {
+            "connection_id": f"conn_{i:04d}",
+            "conn_type": conn_type,
+            "description": f"Synthetic {conn_type} connection",
+            "host": f"host-{i}.internal",
+            "login": "svc_airflow",
+            "schema": "analytics",
+            "port": 5432 if conn_type == "postgres" else None,
+            "password": "***",
+            "extra": json.dumps({"region_name": "eu-west-1", "index": i}),
+        }
+
+    def _asset(self, i: int) -> dict:
+        dag_ids = list(self.dags)
+        producer = dag_ids[i % len(dag_ids)] if dag_ids else None
+        consumer = dag_ids[(i + 1) % len(dag_ids)] if dag_ids else None
+        return {
+            "id": i + 1,
+            "name": f"asset_{i:04d}",
+            "uri": f"s3://bucket/asset_{i:04d}",
+            "group": "asset",
+            "extra": {},
+            "created_at": _iso(EPOCH),
+            "updated_at": _iso(EPOCH),
+            "scheduled_dags": [{"dag_id": consumer, "asset_id": i + 1}] if consumer else [],
+            "producing_tasks": [{"dag_id": producer, "task_id": "task_0"}] if producer else [],
+            "consuming_tasks": [],
+            "aliases": [],
+        }
+
+    @staticmethod
+    def _backfill(i: int, dag_id: str) -> dict:
+        start = EPOCH + timedelta(days=i)
+        return {
+            "id": i + 1,
+            "dag_id": dag_id,
+            "from_date": _iso(start),
+            "to_date": _iso(start + timedelta(days=7)),
+            "dag_run_conf": {},
+            "is_paused": False,
+            "reprocess_behavior": "none",
+            "max_active_runs": 10,
+            "created_at": _iso(start),
+            "completed_at": _iso(start + timedelta(days=1)),
+            "updated_at": _iso(start + timedelta(days=1)),
+            "dag_display_name": dag_id,
+        }
+
+    # ----------------------------- Routes -------------------------------- #
+    def _token(self, request):
+        payload = json.dumps({"sub": "airflow", "exp": int(time.time()) + 3600}).encode()
+        token = "e30." + base64.urlsafe_b64encode(payload).decode().rstrip("=") + ".sig"
+        return 201, {"access_token": token}
+
+    def _list_dags(self, request):
+        query = request.url.params
+        dags = list(self.dags.values())
+
+        tags = query.get_list("tags")
+        if tags:
+            wanted = set(tags)
+            match = all if query.get("tags_match_mode") == "all" else any
+            dags = [dag for dag in dags if match(tag in {t["name"] for t in dag["tags"]} for tag in wanted)]
+        pattern = query.get("dag_id_pattern")
+        if pattern:
+            regex = re.compile(re.escape(pattern).replace("%", ".*").replace("_", "."))
+            dags = [dag for dag in dags if regex.fullmatch(dag["dag_id"])]
+        if query.get("paused") is not None:
+            paused = query["paused"].lower() == "true"
+            dags = [dag for dag in dags if dag["is_paused"] == paused]
+
+        return self._page(request, dags, "dags")
+
+    def _get_dag(self, request, dag_id):
+        dag = self.dags.get(dag_id)
+        return (200, dag) if dag else self._not_found(f"DAG {dag_id}")
+
+    def _get_dag_details(self, request, dag_id):
+        dag = self.dags.get(dag_id)
+        if dag is None:
+            return self._not_found(f"DAG {dag_id}")
+        return 200, {
+            **dag,
+            "timetable_description": "At 00:00",
+            "catchup": False,
+            "start_date": _iso(EPOCH),
+            "doc_md": f"# {dag_id}\n" + "Synthetic documentation. " * 40,
+            "params": {f"p{k}": {"value": k, "description": "parameter"} for k in range(10)},
+            "default_args": {"retries": 2, "owner": dag["owners"][0]},
+            "timezone": "UTC",
+        }
+
+    def _patch_dag(self, request, dag_id):
+        dag = self.dags.get(dag_id)
+        if dag is None:
+            return self._not_found(f"DAG {dag_id}")
+        if "is_paused" in (body := self._body(request)):
+            dag["is_paused"] = bool(body["is_paused"])
+        return 200, dag
+
+    def _delete_dag(self, request, dag_id):
+        if self.dags.pop(dag_id, None) is None:
+            return self._not_found(f"DAG {dag_id}")
+        self._runs.pop(dag_id, None)
+        return 204, None
+
+    def _list_tasks(self, request, dag_id):
+        if dag_id not in self.dags:
+            return self._not_found(f"DAG {dag_id}")
+        tasks = self._tasks(dag_id)
+        return 200, {"tasks": tasks, "total_entries": len(tasks)}
+
+    def _filter_runs(self, runs: list[dict], query) -> list[dict]:
+        states = query.get_list("state")
+        if states:
+            runs = [run for run in runs if run["state"] in states]
+        gte, lte = query.get("start_date_gte"), query.get("start_date_lte")
+        if gte or lte:
+            runs = [run for run in runs if self._in_range(run["start_date"], gte, lte)]
+        gte, lte = query.get("logical_date_gte"), query.get("logical_date_lte")
+        if gte or lte:
+            runs = [run for run in runs if self._in_range(run["logical_date"], gte, lte)]
+        run_types = query.get_list("run_type")
+        if run_types:
+            runs = [run for run in runs if run["run_type"] in run_types]
+        return runs
+
+    def _list_dag_runs(self, request, dag_id):
+        if dag_id == "~":
+            runs = [run for other in self.dags for run in self._dag_runs(other)]
+        elif dag_id in self.dags:
+            runs = self._dag_runs(dag_id)
+        else:
+            return self._not_found(f"DAG {dag_id}")
+        return self._page(request, self._filter_runs(runs, request.url.params), "dag_runs")
+
+    def _trigger_dag_run(self, request, dag_id):
+        if dag_id not in self.dags:
+            return self._not_found(f"DAG {dag_id}")
+        now = datetime.now(timezone.utc)
+        body = self._body(request)
+        run = {
+            "dag_run_id": f"manual__{now.isoformat()}",
+            "dag_id": dag_id,
+            "logical_date": body.get("logical_date", _iso(now)),
+            "queued_at": _iso(now),
+            "start_date": None,
+            "end_date": None,
+            "run_after": _iso(now),
+            "run_type": "manual",
+            "state": "queued",
+            "triggered_by": "rest_api",
+            "conf": body.get("conf") or {},
+            "note": None,
+        }
+        self._dag_runs(dag_id).append(run)
+        return 200, run
+
+    def _find_run(self, dag_id, run_id):
+        if dag_id not in self.dags:
+            return None
+        return next((run for run in self._dag_runs(dag_id) if run["dag_run_id"] == run_id), None)
+
+    def _get_dag_run(self, request, dag_id, run_id):
+        run = self._find_run(dag_id, run_id)
+        return (200, run) if run else self._not_found(f"DAG run {run_id}")
+
+    def _clear_dag_run(self, request, dag_id, run_id):
+        run = self._find_run(dag_id, run_id)
+        if run is None:
+            return self._not_found(f"DAG run {run_id}")
+        instances = self._run_task_instances(dag_id, run)
+        if not self._body(request).get("dry_run", True):
+            run["state"] = "queued"
+        return 200, {"task_instances": instances, "total_entries": len(instances)}
+
+    def _list_task_instances(self, request, dag_id, run_id):
+        dag_ids = list(self.dags) if dag_id == "~" else [dag_id]
+        instances = []
+        for other in dag_ids:
+            if other not in self.dags:
+                return self._not_found(f"DAG {other}")
+            for run in self._dag_runs(other):
+                if run_id in ("~", run["dag_run_id"]):
+                    instances.extend(self._run_task_instances(other, run))
+
+        query = request.url.params
+        states = query.get_list("state")
+        if states:
+            instances = [ti for ti in instances if ti["state"] in states]
+        gte, lte = query.get("start_date_gte"), query.get("start_date_lte")
+        if gte or lte:
+            instances = [ti for ti in instances if self._in_range(ti["start_date"], gte, lte)]
+        order_by = query.get("order_by")
+        if order_by:
+            field = order_by.lstrip("-")
+            # Like Postgres, nulls sort last in descending order.
+            instances = sorted(instances, key=lambda ti: (ti.get(field) is not None, ti.get(field) or ""), reverse=order_by.startswith("-"))
+        return self._page(request, instances, "task_instances")
+
+    def _batch_task_instances(self, request):
+        body = self._body(request)
+        dag_ids = body.get("dag_ids") or list(self.dags)
+        run_ids = set(body.get("dag_run_ids") or [])
+        task_ids = set(body.get("task_ids") or [])
+        states = set(body.get("state") or [])
+
+        instances = []
+        for dag_id in dag_ids:
+            if dag_id not in self.dags:
+                continue
+            for run in self._dag_runs(dag_id):
+                if run_ids and run["dag_run_id"] not in run_ids:
+                    continue
+                for ti in self._run_task_instances(dag_id, run):
+                    if task_ids and ti["task_id"] not in task_ids:
+                        continue
+                    if states and ti["state"] not in states:
+                        continue
+                    if not self._in_range(ti["start_date"], body.get("start_date_gte"), body.get("start_date_lte")):
+                        continue
+                    if not self._in_range(ti["end_date"], body.get("end_date_gte"), body.get("end_date_lte")):
+                        continue
+                    instances.append(ti)
+
+        return self._page(request, instances, "task_instances", body.get("page_offset", 0), body.get("page_limit", 100))
+
+    def _find_task_instance(self, dag_id, run_id, task_id):
+        run = self._find_run(dag_id, run_id)
+        if run is None:
+            return None
+        return next((ti for ti in self._run_task_instances(dag_id, run) if ti["task_id"] == task_id), None)
+
+    def _get_task_instance(self, request, dag_id, run_id, task_id):
+        ti = self._find_task_instance(dag_id, run_id, task_id)
+        return (200, ti) if ti else self._not_found(f"Task instance {task_id}")
+
+    def _task_logs(self, request, dag_id, run_id, task_id, try_number):
+        ti = self._find_task_instance(dag_id, run_id, task_id)
+        if ti is None:
+            return self._not_found(f"Task instance {task_id}")
+        # The continuation token is opaque to clients; here it is the next line offset.
+        offset = int(request.url.params.get("token") or 0)
+        end = min(offset + 500, self.log_lines)
+        start = datetime.fromisoformat((ti["start_date"] or ti["queued_when"]).replace("Z", "+00:00"))
+        content = []
+        for n in range(offset, end):
+            failing = ti["state"] == "failed" and n >= self.log_lines - 3
+            level = "error" if failing else ("warning" if n % 97 == 0 else "info")
+            event = f"Traceback line {n} in {task_id} (try {try_number})" if failing else f"Processed batch {n} of {task_id}"
+            content.append({"timestamp": _iso(start + timedelta(milliseconds=n)), "level": level, "event": event, "logger": "task"})
+        return 200, {"content": content, "continuation_token": str(end)}
+
+    def _list_backfills(self, request):
+        dag_id = request.url.params.get("dag_id")
+        backfills = [b for b in self.backfills if dag_id is None or b["dag_id"] == dag_id]
+        now = _iso(datetime.now(timezone.utc))
+        for backfill in backfills:
+            if backfill["completed_at"] is None:
+                # Complete backfills on the next listing, so pollers observe progress.
+                for run in self._dag_runs(backfill["dag_id"]):
+                    if run.get("backfill_id") == backfill["id"]:
+                        run.update(state="success", start_date=now, end_date=now)
+                backfill["completed_at"] = backfill["updated_at"] = now
+        return self._page(request, backfills, "backfills")
+
+    def _backfill_dates(self, body: dict) -> list[str]:
+        start = datetime.fromisoformat(body["from_date"].replace("Z", "+00:00"))
+        end = datetime.fromisoformat(body["to_date"].replace("Z", "+00:00"))
+        days = max(0, (end - start).days + 1)
+        return [_iso(start + timedelta(days=day)) for day in range(days)]
+
+    def _create_backfill(self, request):
+        body = self._body(request)
+        if body.get("dag_id") not in self.dags:
+            return self._not_found(f"DAG {body.get('dag_id')}")
+        if any(b["dag_id"] == body["dag_id"] and b["completed_at"] is None for b in self.backfills):
+            return 409, {"detail": f"Another backfill is running for dag {body['dag_id']}"}
+        backfill = {**self._backfill(len(self.backfills), body["dag_id"]), **body, "completed_at": None}
+        self.backfills.append(backfill)
+        now = datetime.now(timezone.utc)
+        for date in self._backfill_dates(body):
+            self._dag_runs(body["dag_id"]).append({
+                "dag_run_id": f"backfill__{date}",
+                "dag_id": body["dag_id"],
+                "logical_date": date,
+                "queued_at": _iso(now),
+                "start_date": None,
+                "end_date": None,
+                "run_after": date,
+                "run_type": "backfill",
+                "state": "queued",
+                "triggered_by": "backfill",
+                "conf": body.get("dag_run_conf") or {},
+                "note": None,
+                "backfill_id": backfill["id"],
+            })
+        return 200, backfill
+
+    def _dry_run_backfill(self, request):
+        body = self._body(request)
+        if body.get("dag_id") not in self.dags:
+            return self._not_found(f"DAG {body.get('dag_id')}")
+        runs = [{"dag_id": body["dag_id"], "logical_date": date} for date in self._backfill_dates(body)]
+        return 200, {"backfills": runs, "total_entries": len(runs)}
+
+    def _list_connections(self, request):
+        return self._page(request, list(self.connections.values()), "connections")
+
+    def _get_connection(self, request, conn_id):
+        conn = self.connections.get(conn_id)
+        return (200, conn) if conn else self._not_found(f"Connection {conn_id}")
+
+    def _create_connection(self, request):
+        body = self._body(request)
+        if body.get("connection_id") in self.connections:
+            return 409, {"detail": "Connection already exists"}
+        self.connections[body["connection_id"]] = {"password": None, **self._masked(body)}
+        return 201, self.connections[body["connection_id"]]
+
+    def _patch_connection(self, request, conn_id):
+        conn = self.connections.get(conn_id)
+        if conn is None:
+            return self._not_found(f"Connection {conn_id}")
+        conn.update(self._masked(self._body(request)))
+        return 200, conn
+
+    @staticmethod
+    def _masked(conn: dict) -> dict:
+        # Airflow never returns passwords, only "***" when one is set; a body without one keeps the stored secret.
+        if "password" not in conn:
+            return dict(conn)
+        return {**conn, "password": "***" if conn.get("password") else None}
+
+    def _bulk_connections(self, request):
+        results = {}
+        for action in self._body(request).get("actions", []):
+            kind = action["action"]
+            outcome = results.setdefault(kind, {"success": [], "errors": []})
+            for entity in action.get("entities", []):
+                conn_id = entity if kind == "delete" else entity.get("connection_id")
+                exists = conn_id in self.connections
+                if kind == "create" and exists and action.get("action_on_existence", "fail") == "fail":
+                    outcome["errors"].append({"error": f"Connection {conn_id} already exists", "status_code": 409})
+                    continue
+                if kind != "create" and not exists:
+                    if action.get("action_on_non_existence", "fail") == "fail":
+                        outcome["errors"].append({"error": f"Connection {conn_id} not found", "status_code": 404})
+                    continue
+                if kind == "delete":
+                    del self.connections[conn_id]
+                elif kind == "update":
+                    self.connections[conn_id].update(self._masked(entity))
+                else:
+                    self.connections[conn_id] = {"password": None, **self._masked(entity)}
+                outcome["success"].append(conn_id)
+        return 200, results
+
+    def _delete_connection(self, request, conn_id):
+        if self.connections.pop(conn_id, None) is None:
+            return self._not_found(f"Connection {conn_id}")
+        return 204, None
+
+    def _list_assets(self, request):
+        return self._page(request, self.assets, "assets")
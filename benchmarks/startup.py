@@ -0,0 +1,95 @@
+"""
+Measure stdio cold start: time from process launch to the MCP `initialize`
+response (and to the first `tools/list` response).
+
+    uv run benchmarks/startup.py --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SERVER = Path(__file__).resolve().parent.parent / "server" / "main.py"
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "0"},
+    },
+}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+LIST_TOOLS = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+
+def send(process, message: dict) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def read_response(process, request_id: int) -> dict:
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("server exited before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def measure(python: str) -> tuple[float, float]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [python, str(SERVER), "--transport", "stdio"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        cwd=SERVER.parent,
+        env=env,
+    )
+    try:
+        send(process, INITIALIZE)
+        read_response(process, 1)
+        initialized = time.perf_counter() - start
+
+        send(process, INITIALIZED)
+        send(process, LIST_TOOLS)
+        tools = read_response(process, 2)
+        listed = time.perf_counter() - start
+        if not tools.get("result", {}).get("tools"):
+            raise RuntimeError(f"unexpected tools/list response: {tools}")
+    finally:
+        process.stdin.close()
+        process.terminate()
+        process.wait()
+    return initialized, listed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure MCP stdio cold start")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--python", default=sys.executable, help="Interpreter used to launch the server")
+    args = parser.parse_args()
+
+    measure(args.python)  # Warm the OS file cache and bytecode.
+    samples = [measure(args.python) for _ in range(args.runs)]
+
+    for label, values in (("initialize", [s[0] for s in samples]), ("tools/list", [s[1] for s in samples])):
+        values = [v * 1000 for v in values]
+        print(
+            f"{label:12s} min {min(values):7.1f} ms  median {statistics.median(values):7.1f} ms  "
+            f"max {max(values):7.1f} ms  ({args.runs} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
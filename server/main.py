@@ -1,24 +1,74 @@
 # from fastmcp import FastMCP
+from contextlib import asynccontextmanager
+
 from mcp.server.fastmcp import FastMCP 
 
+from services.settings import env_float, env_int, env_str
 from tools.register_tools import RegisterTools
 
+@asynccontextmanager
+async def lifespan(server):
+    """Keep the pooled Airflow client open for as long as a session runs."""
+    async with tools.session():
+        yield
+
 # ---------------- Initialize MCP Server ---------------------- #
 mcp = FastMCP(
     name="Airflow MCP Server",
-    instructions="Interact with Apache Airflow via REST API."
+    instructions="Interact with Apache Airflow via REST API.",
+    lifespan=lifespan
     )
 
 # ---------------- Register Tools ------------------------------ #
-RegisterTools(mcp)._dags()
-RegisterTools(mcp)._backfills()
-RegisterTools(mcp)._assets()
-RegisterTools(mcp)._connections()
-RegisterTools(mcp)._tasks_instance()
+# The Airflow client and tool classes are built on the first tool call.
+tools = RegisterTools(mcp)
+tools.register_all()
+
+# ----------------- HTTP transports ---------------------------- #
+async def serve_http(transport: str, host: str, port: int):
+    """
+    Serve MCP over streamable HTTP or SSE with uvicorn.
+
+    Every session shares the same Airflow client, connection pool and caches.
+    The server holds its own reference on the client so the pool stays warm
+    between sessions, and on SIGINT/SIGTERM uvicorn stops accepting connections
+    and waits up to `_MCP_SHUTDOWN_TIMEOUT` seconds for in-flight requests.
+    """
+    import uvicorn
+
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        log_level=mcp.settings.log_level.lower(),
+        timeout_graceful_shutdown=env_float("_MCP_SHUTDOWN_TIMEOUT", 30.0),
+    )
+
+    async with tools.session():
+        await uvicorn.Server(config).serve()
 
 # ----------------- Run the server ----------------------------- #
 if __name__ == "__main__":
+    import argparse
+    import asyncio
     import sys
-    print("🚀 Starting MCP server", file=sys.stderr)
 
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(description="Airflow MCP Server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        default=env_str("_MCP_TRANSPORT", "stdio"),
+        help="MCP transport (default: stdio)",
+    )
+    parser.add_argument("--host", default=env_str("_MCP_HOST", "127.0.0.1"), help="Bind address for HTTP transports")
+    parser.add_argument("--port", type=int, default=env_int("_MCP_PORT", 8000), help="Port for HTTP transports")
+    args = parser.parse_args()
+
+    print(f"🚀 Starting MCP server ({args.transport})", file=sys.stderr)
+
+    if args.transport == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        asyncio.run(serve_http(args.transport, args.host, args.port))
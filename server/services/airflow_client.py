@@ -1,68 +1,553 @@
+import asyncio
 import httpx
-import requests
-from typing import Any
-from dotenv import load_dotenv
-import os
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator
+import sys
+
+from services.cache import ResponseCache
+from services.metadata_db import MetadataDB
+from services.metrics import Metrics
+from services.models import decode_page, loads
+from services.settings import env_bool, env_float, env_int, env_str
+from services.token_manager import TokenManager
+
+HTTP_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+# Statuses retried for idempotent requests; anything else only retries on 429,
+# since the server may already have applied a POST/PATCH that failed with 5xx.
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+# Path segments at ID positions that are really actions, e.g. `dags/~/dagRuns/~/taskInstances/list`.
+ACTION_SEGMENTS = {"~", "list", "dry_run"}
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Collapse IDs in an endpoint path, e.g. `dags/{id}/dagRuns`, to keep per-endpoint stats bounded."""
+    segments = endpoint.strip("/").split("/")
+    return "/".join(
+        "{id}" if index % 2 and segment not in ACTION_SEGMENTS else segment
+        for index, segment in enumerate(segments)
+    )
+
+
+def instance_prefix(instance: str) -> str:
+    """Environment variable prefix of a named deployment, e.g. "eu-west" -> "_AIRFLOW_EU_WEST_"."""
+    return "_AIRFLOW_" + "".join(c if c.isalnum() else "_" for c in instance.upper()) + "_"
+
+
+class AirflowAPIError(Exception):
+    """Raised by the streaming helpers when Airflow returns an error response."""
+
+    def __init__(self, response: dict):
+        super().__init__(response.get("error", response))
+        self.response = response
 
-# Load from environment variables
-load_dotenv()
 
 class AirflowClient():
-    def __init__(self):
-        self.endpoint_url = os.getenv("_END_POINT_UTL", "http://localhost:8080")
-        self.username = os.getenv("_AIRFLOW_WWW_USER_USERNAME", "airflow")
-        self.password = os.getenv("_AIRFLOW_WWW_USER_PASSWORD", "airflow")
+    """
+    Async client for the Airflow REST API.
 
-    def generate_jwt_token(self) -> str:
-        """Generate JWT token for Airflow REST API authentication."""
-        auth_url = f"{self.endpoint_url}/auth/token"
+    A single instance owns one pooled `httpx.AsyncClient` that is shared by every
+    tool class, so TCP/TLS connections are kept alive and reused across calls.
+    The pool is opened lazily and closed when the last `async with` user exits,
+    which lets the MCP server lifespan own it.
 
-        payload = {
-            "username": self.username,
-            "password": self.password
-        }
+    Args:
+        transport (httpx.AsyncBaseTransport, optional): Transport used instead of
+            the network, e.g. the in-process fake API in `benchmarks/`.
+        instance (str, optional): Name of a federated deployment; its URL, credentials
+            and metadata DB are read from `_AIRFLOW_<NAME>_*` variables (see `instance_prefix`).
+        metrics (Metrics, optional): Metrics shared with other clients.
 
-        headers = {
-            "Content-Type": "application/json"
-        }
+    Raises:
+        ValueError: If `instance` is given but its `_AIRFLOW_<NAME>_URL` is not set.
+    """
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        instance: str | None = None,
+        metrics: Metrics | None = None,
+    ):
+        self.instance = instance
+        self.endpoint_url = env_str("_END_POINT_UTL", "http://localhost:8080")
+        self.username = env_str("_AIRFLOW_WWW_USER_USERNAME", "airflow")
+        self.password = env_str("_AIRFLOW_WWW_USER_PASSWORD", "airflow")
+        metadata_db_uri = None
+        if instance:
+            prefix = instance_prefix(instance)
+            # Falling back to `_END_POINT_UTL` would silently query the wrong deployment.
+            self.endpoint_url = env_str(f"{prefix}URL")
+            if not self.endpoint_url:
+                raise ValueError(f"Airflow instance {instance!r} has no URL; set {prefix}URL.")
+            self.username = env_str(f"{prefix}USERNAME", self.username)
+            self.password = env_str(f"{prefix}PASSWORD", self.password)
+            # Another deployment's metadata DB would answer for the wrong instance.
+            metadata_db_uri = env_str(f"{prefix}METADATA_DB_URI")
 
-        response = requests.post(auth_url, json=payload, headers=headers)
+        self.limits = httpx.Limits(
+            max_connections=env_int("_AIRFLOW_HTTP_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=env_int("_AIRFLOW_HTTP_MAX_KEEPALIVE", 20),
+            keepalive_expiry=env_float("_AIRFLOW_HTTP_KEEPALIVE_EXPIRY", 30.0),
+        )
+        self.timeout = httpx.Timeout(
+            env_float("_AIRFLOW_HTTP_TIMEOUT", 30.0),
+            connect=env_float("_AIRFLOW_HTTP_CONNECT_TIMEOUT", 5.0),
+        )
+        self.http2 = env_bool("_AIRFLOW_HTTP2") and self._http2_available()
+        self.transport = transport
 
-        if response.status_code in (200, 201):
-            return response.json().get("access_token", "")
-        else:
-            raise Exception(f"Authentication failed: {response.status_code} {response.text}")
+        # Retries, per-call deadline and hedging of slow idempotent GETs.
+        self.retries = env_int("_AIRFLOW_RETRIES", 2)
+        self.retry_backoff = env_float("_AIRFLOW_RETRY_BACKOFF", 0.25)
+        self.retry_max_backoff = env_float("_AIRFLOW_RETRY_MAX_BACKOFF", 10.0)
+        self.deadline = env_float("_AIRFLOW_REQUEST_DEADLINE", 60.0)
+        self.hedge_after = env_float("_AIRFLOW_HEDGE_AFTER", 0.0)
 
-    async def api_request(self, endpoint: str, method: str, **kwargs) -> Any:
-        """Make a request to the Airflow API server with JWT authentication."""
-        url = f"{self.endpoint_url}/api/v2/{endpoint}"
+        # Airflow caps `limit` at [api] maximum_page_limit (100 by default).
+        self.page_size = env_int("_AIRFLOW_PAGE_SIZE", 100)
+        self.page_concurrency = env_int("_AIRFLOW_PAGE_CONCURRENCY", 4)
+
+        self.token_manager = TokenManager(
+            self.endpoint_url,
+            self.username,
+            self.password,
+            refresh_margin=env_float("_AIRFLOW_TOKEN_REFRESH_MARGIN", 60.0),
+        )
+
+        # GET response cache shared by every tool.
+        self.cache = ResponseCache()
+
+        self._http: httpx.AsyncClient | None = None
+        self._users = 0
+        self._close_callbacks = []
+
+        # Identical GETs currently in flight, keyed by endpoint, params and validators.
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.counters = {"coalesced_requests": 0}
+
+        # Attempts, retries and hedges per endpoint label, see `endpoint_label`.
+        self.endpoint_stats: dict[str, dict] = {}
+
+        # Latency, status and byte counts of tool calls and upstream requests.
+        self.metrics = metrics or Metrics()
 
+        # Optional read-only metadata DB fast path (disabled unless configured).
+        self.metadata_db = MetadataDB(metadata_db_uri)
+        self.on_close(self.metadata_db.close)
+
+    @staticmethod
+    def _http2_available() -> bool:
+        """HTTP/2 needs the optional `h2` package (`pip install h2`)."""
         try:
-            jwt_token = self.generate_jwt_token()
-            if not jwt_token:
-                raise Exception("Failed to generate JWT token")
-            
-            headers = {
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ _AIRFLOW_HTTP2 is set but 'h2' is not installed; using HTTP/1.1", file=sys.stderr)
+            return False
+        return True
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The shared pooled HTTP client, created on first use."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+            )
+        return self._http
+
+    def on_close(self, callback) -> None:
+        """Register an async callback run when the client closes, e.g. to stop a background sync."""
+        self._close_callbacks.append(callback)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and its keep-alive connections."""
+        for callback in self._close_callbacks:
+            await callback()
+
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def __aenter__(self):
+        self._users += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._users -= 1
+        if self._users <= 0:
+            self._users = 0
+            await self.aclose()
+
+    async def generate_jwt_token(self) -> str:
+        """Return a cached JWT token for Airflow REST API authentication, refreshing it when it nears expiry."""
+        return await self.token_manager.get_token(self.http)
+
+    async def _send(self, method: str, url: str, headers: dict | None = None, **kwargs) -> httpx.Response:
+        """Send one authenticated request, retrying once with a fresh token on 401."""
+        label = endpoint_label(url.split("/api/v2/", 1)[-1])
+        for attempt in range(2):
+            jwt_token = await self.generate_jwt_token()
+
+            request_headers = {
                 "Authorization": f"Bearer {jwt_token}",
-                "Accept": "application/json"
+                "Accept": "application/json",
+                **(headers or {})
             }
 
-            async with httpx.AsyncClient() as client:
-                request_method = getattr(client, method.lower(), None)
+            with self.metrics.upstream_call(method, label, url) as call:
+                response = call["response"] = await self.http.request(method, url, headers=request_headers, **kwargs)
 
-                if not callable(request_method):
-                    raise ValueError(f"Invalid HTTP method: {method}")
+            if response.status_code != 401 or attempt:
+                return response
 
-                response = await request_method(url, headers=headers, **kwargs)
+            self.token_manager.invalidate(jwt_token)
 
-                if response.status_code == 200:
-                    return response.json()
+    def _record(self, label: str, event: str) -> None:
+        stats = self.endpoint_stats.setdefault(
+            label, {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+        )
+        stats[event] += 1
+
+    def _backoff(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Full-jitter exponential backoff, overridden by a `Retry-After` header when present."""
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.retry_max_backoff, self.retry_backoff * 2 ** attempt))
+
+    async def _send_hedged(self, method: str, url: str, label: str, hedge_after: float, **kwargs) -> httpx.Response:
+        """
+        Send a GET and, if it has not answered within `hedge_after` seconds, fire a
+        second identical request; whichever answers first wins, the other is cancelled.
+        """
+        first = asyncio.create_task(self._send(method, url, **kwargs))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return first.result()
+
+            self._record(label, "hedges")
+            second = asyncio.create_task(self._send(method, url, **kwargs))
+            tasks.add(second)
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if succeeded[0] is second:
+                        self._record(label, "hedge_wins")
+                    return succeeded[0].result()
+                # A failed attempt only loses if the other one fails too.
+                if not tasks:
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send_resilient(
+        self,
+        method: str,
+        url: str,
+        label: str,
+        deadline_at: float,
+        retries: int,
+        hedge_after: float,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request with retries and optional hedging, within a deadline.
+
+        Idempotent requests are retried on 429/502/503/504, timeouts and
+        transport errors; other methods only on 429 and connection failures,
+        where the server cannot have applied them. Backoff is jittered and
+        honors `Retry-After`, and no retry is attempted past `deadline_at`.
+        """
+        loop = asyncio.get_running_loop()
+        idempotent = method in IDEMPOTENT_METHODS or self.is_read_only(url)
+        retry_on = RETRYABLE_STATUSES if idempotent else {429}
+
+        attempt = 0
+        while True:
+            self._record(label, "requests")
+            response = None
+            error = None
+            try:
+                if hedge_after and method == "GET":
+                    response = await self._send_hedged(method, url, label, hedge_after, **kwargs)
                 else:
-                    return {
-                        "status": response.status_code,
-                        "error": response.text
-                    }
+                    response = await self._send(method, url, **kwargs)
+                if response.status_code not in retry_on:
+                    return response
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if attempt >= retries:
+                    raise
+                error = e
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt >= retries or not idempotent:
+                    raise
+                error = e
+
+            delay = self._backoff(attempt, response)
+            if attempt >= retries or loop.time() + delay >= deadline_at:
+                # Out of time: give back the last response, or the transport error if there is none.
+                if response is None:
+                    raise error
+                return response
 
+            attempt += 1
+            self._record(label, "retries")
+            await asyncio.sleep(delay)
+
+    async def _send_coalesced(self, method: str, url: str, key: str, headers: dict | None = None, **kwargs) -> httpx.Response:
+        """
+        Send a request, sharing one in-flight upstream call between identical GETs.
+
+        Concurrent GETs with the same endpoint, params and validators await the
+        same task and receive the same response. The task is shielded, so a
+        caller that gets cancelled does not cancel the request for the others.
+        """
+        if method != "GET":
+            return await self._send_resilient(method, url, headers=headers, **kwargs)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._send_resilient(method, url, headers=headers, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.counters["coalesced_requests"] += 1
+
+        return await asyncio.shield(task)
+
+    async def api_request(self, endpoint: str, method: str, **kwargs) -> Any:
+        """Make a request to the Airflow API server with JWT authentication.
+
+        A 401 response drops the cached token and the request is retried once
+        with a freshly issued one. GETs of cacheable endpoints are served from
+        the response cache (pass `cache=False` to bypass it), identical GETs
+        already in flight are coalesced into one upstream call, and successful
+        mutations invalidate the cache entries they affect.
+
+        Transient failures are retried with jittered backoff and slow GETs can
+        be hedged. `deadline`, `retries` and `hedge_after` keyword arguments
+        override the `_AIRFLOW_REQUEST_DEADLINE`, `_AIRFLOW_RETRIES` and
+        `_AIRFLOW_HEDGE_AFTER` defaults for a single call.
+
+        Bodies are decoded with pydantic-core's JSON parser; pass `decode` (a
+        callable taking the raw bytes) to decode straight into typed records.
+        Other 2xx responses without a body come back as `{"status"}`, error
+        statuses as `{"status", "error"}`, and failures as `{"error"}`, flagged
+        `transport_error` when no response was received.
+        """
+        url = f"{self.endpoint_url}/api/v2/{endpoint}"
+        use_cache = kwargs.pop("cache", True)
+        deadline = kwargs.pop("deadline", None) or self.deadline
+        retries = kwargs.pop("retries", self.retries)
+        hedge_after = kwargs.pop("hedge_after", self.hedge_after)
+        decode = kwargs.pop("decode", None) or loads
+        label = endpoint_label(endpoint)
+
+        try:
+            method = method.upper()
+            if method not in HTTP_METHODS:
+                raise ValueError(f"Invalid HTTP method: {method}")
+
+            cache_key, entry, ttl = None, None, 0
+            if method == "GET" and use_cache:
+                ttl = self.cache.ttl_for(endpoint)
+            if ttl:
+                cache_key = self.cache.key(endpoint, kwargs.get("params"))
+                entry = self.cache.get(cache_key)
+                if entry is not None and entry.fresh:
+                    # Decode on every hit so callers never share (and mutate) one object.
+                    return decode(entry.content)
+
+            headers = entry.validators if entry is not None else None
+            flight_key = f"{cache_key or self.cache.key(endpoint, kwargs.get('params'))}|{headers}"
+            deadline_at = asyncio.get_running_loop().time() + deadline
+            try:
+                async with asyncio.timeout_at(deadline_at):
+                    response = await self._send_coalesced(
+                        method, url, flight_key, headers=headers, label=label,
+                        deadline_at=deadline_at, retries=retries, hedge_after=hedge_after, **kwargs
+                    )
+            except TimeoutError:
+                self._record(label, "deadline_exceeded")
+                raise TimeoutError(f"Deadline of {deadline}s exceeded for {method} {endpoint}")
+
+            if cache_key and response.status_code == 304:
+                entry = self.cache.revalidated(cache_key, ttl) or entry
+                return decode(entry.content)
+
+            if cache_key and response.status_code == 200:
+                self.cache.put(cache_key, endpoint, response, ttl)
+            elif method != "GET" and response.status_code < 400 and not self.is_read_only(endpoint):
+                self.cache.invalidate(endpoint)
+
+            if response.status_code == 200:
+                return decode(response.content)
+            elif response.is_success:
+                # 201 Created returns the new record; 204 No Content only its status.
+                return decode(response.content) if response.content else {"status": response.status_code}
+            else:
+                return {
+                    "status": response.status_code,
+                    "error": response.text
+                }
+
+        except httpx.TransportError as e:
+            self.metrics.log_exception(e)
+            return {"error": str(e), "transport_error": True}
         except Exception as e:
-            print(f"Exception during Airflow API request: {e}")
+            self.metrics.log_exception(e)
             return {"error": str(e)}
+
+    @staticmethod
+    def is_read_only(endpoint: str) -> bool:
+        """POSTs to batch `.../list` endpoints only read data and must not invalidate the cache."""
+        return endpoint.rstrip("/").endswith("/list")
+
+    @staticmethod
+    def is_error(response: Any) -> bool:
+        """Return True if `response` is an error returned by `api_request`."""
+        return isinstance(response, str) or (isinstance(response, dict) and "error" in response)
+
+    async def iter_pages(
+        self,
+        endpoint: str,
+        key: str,
+        params: dict | None = None,
+        page_size: int | None = None,
+        max_concurrency: int | None = None,
+        cache: bool = True,
+        method: str = "get",
+        json: dict | None = None,
+        model: type | None = None,
+    ) -> AsyncIterator[list]:
+        """
+        Yield every page of a paginated list endpoint, in order.
+
+        The first page is read to learn `total_entries` and the page size the
+        server actually honors (Airflow caps `limit` at `maximum_page_limit`);
+        the remaining offsets are then prefetched concurrently, keeping at most
+        `max_concurrency` requests in flight. Pages are still yielded in offset
+        order, and stopping the iteration early cancels whatever is still being
+        prefetched.
+
+        Args:
+            endpoint (str): List endpoint, e.g. "dags".
+            key (str): Key of the item list in the response, e.g. "dags".
+            params (dict): Extra query parameters (filters, ordering).
+            page_size (int): Items per request. Defaults to `_AIRFLOW_PAGE_SIZE`.
+            max_concurrency (int): Pages fetched at once. Defaults to `_AIRFLOW_PAGE_CONCURRENCY`.
+            cache (bool): Set to False to bypass the response cache.
+            method (str): "get", or "post" for batch `.../list` endpoints, which take
+                their filters and `page_offset`/`page_limit` in the JSON body.
+            json (dict): Request body for POST list endpoints.
+            model (type): Record class from `services.models` to decode items into,
+                instead of dicts.
+
+        Raises:
+            AirflowAPIError: If any page request fails.
+        """
+        page_size = page_size or self.page_size
+        max_concurrency = max(1, max_concurrency or self.page_concurrency)
+        params = dict(params or {})
+        decode = (lambda content: decode_page(content, model, key)) if model else None
+
+        async def request(offset: int):
+            if method.lower() == "get":
+                return await self.api_request(
+                    endpoint, "get", params={**params, "limit": page_size, "offset": offset}, cache=cache, decode=decode
+                )
+            body = {**(json or {}), "page_offset": offset, "page_limit": page_size}
+            return await self.api_request(endpoint, method, params=params or None, json=body, decode=decode)
+
+        async def fetch(offset: int) -> list:
+            response = await request(offset)
+            if self.is_error(response):
+                raise AirflowAPIError(response if isinstance(response, dict) else {"error": response})
+            return response.get(key, [])
+
+        first = await request(0)
+        if self.is_error(first):
+            raise AirflowAPIError(first if isinstance(first, dict) else {"error": first})
+
+        items = first.get(key, [])
+        yield items
+        if not items:
+            return
+
+        # The server may return fewer items than `page_size`; step by what it returned.
+        step = len(items)
+        total = first.get("total_entries")
+        if total is None:
+            # No total to plan against: walk pages one by one until a short or empty page.
+            offset = step
+            while len(items) == step:
+                items = await fetch(offset)
+                offset += len(items)
+                if items:
+                    yield items
+            return
+
+        offsets = deque(range(step, total, step))
+        in_flight: deque[asyncio.Task] = deque()
+        try:
+            while offsets or in_flight:
+                while offsets and len(in_flight) < max_concurrency:
+                    in_flight.append(asyncio.create_task(fetch(offsets.popleft())))
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight:
+                if task.done() and not task.cancelled():
+                    task.exception()
+                task.cancel()
+
+    async def stream(self, endpoint: str, key: str, params: dict | None = None, **kwargs) -> AsyncIterator[dict]:
+        """
+        Yield the items of a paginated list endpoint one at a time.
+
+        Only the pages currently being prefetched are held in memory, so callers
+        that filter or aggregate never need the full result set. Accepts the same
+        arguments as `iter_pages`.
+        """
+        async for page in self.iter_pages(endpoint, key, params, **kwargs):
+            for item in page:
+                yield item
+
+    async def fetch_all(self, endpoint: str, key: str, params: dict | None = None, **kwargs) -> dict:
+        """
+        Fetch every page of a list endpoint and merge them into one response.
+
+        Args:
+            endpoint (str): List endpoint, e.g. "dags".
+            key (str): Key of the item list in the response, e.g. "dags".
+            params (dict): Extra query parameters (filters, ordering).
+            **kwargs: `page_size`, `max_concurrency`, `cache`, `method`, `json` and `model`, see `iter_pages`.
+
+        Returns:
+            dict: `{key: [...all items...], "total_entries": n}`, or the error
+                response of the first page that failed.
+        """
+        items = []
+        try:
+            async for page in self.iter_pages(endpoint, key, params, **kwargs):
+                items.extend(page)
+        except AirflowAPIError as e:
+            return e.response
+
+        return {key: items, "total_entries": len(items)}
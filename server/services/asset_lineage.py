@@ -0,0 +1,192 @@
+from collections import deque
+from datetime import datetime, timezone
+
+from services.background_sync import BackgroundSync
+from services.models import AssetLinks
+from services.settings import env_float
+
+DIRECTIONS = ("downstream", "upstream")
+
+
+class AssetLineage(BackgroundSync):
+    """
+    In-memory lineage graph of assets and DAGs, refreshed in full in the background.
+
+    Built from the paginated `/assets` listing: a DAG with a task that
+    produces an asset points to the asset, and an asset points to the DAGs
+    scheduled on it or consuming it. Every sync downloads the whole listing:
+    the API cannot filter assets by change time, and an asset's `updated_at`
+    does not move when its producers or consumers do. The sync then only
+    re-links assets whose links changed and drops assets that disappeared, so
+    lineage questions are answered by walking adjacency sets in memory
+    instead of with API calls.
+
+    Args:
+        client: The shared `AirflowClient`.
+        refresh_interval (float): Seconds between background syncs.
+            Defaults to `_AIRFLOW_LINEAGE_REFRESH_INTERVAL`.
+    """
+
+    label = "Asset lineage"
+
+    def __init__(self, client, refresh_interval: float | None = None):
+        super().__init__(client, refresh_interval or env_float("_AIRFLOW_LINEAGE_REFRESH_INTERVAL", 300.0))
+
+        # Asset name -> (uri, producing DAGs, consuming DAGs), as last indexed.
+        self._assets: dict[str, tuple[str | None, frozenset, frozenset]] = {}
+        self._by_uri: dict[str, str] = {}
+        # Adjacency sets in both directions.
+        self._producers: dict[str, set[str]] = {}  # asset -> DAGs producing it
+        self._consumers: dict[str, set[str]] = {}  # asset -> DAGs consuming it
+        self._outputs: dict[str, set[str]] = {}  # DAG -> assets it produces
+        self._inputs: dict[str, set[str]] = {}  # DAG -> assets it consumes
+
+    # ---------------------------- Sync ---------------------------- #
+    async def sync(self) -> dict:
+        """
+        Re-read every asset and bring the graph up to date with the API server.
+
+        Returns:
+            dict: Counts of `added`, `updated`, `removed` and `total` assets.
+        """
+        async with self._sync_lock:
+            seen = set()
+            added = updated = 0
+
+            async for asset in self.client.stream("assets", "assets", {"order_by": "id"}, cache=False, model=AssetLinks):
+                seen.add(asset.name)
+                producers = frozenset(ref.dag_id for ref in asset.producing_tasks or ())
+                consumers = frozenset(
+                    ref.dag_id for ref in (*(asset.scheduled_dags or ()), *(asset.consuming_tasks or ()))
+                )
+                record = (asset.uri, producers, consumers)
+
+                current = self._assets.get(asset.name)
+                if current == record:
+                    continue
+                if current is None:
+                    added += 1
+                else:
+                    updated += 1
+                    self._unlink(asset.name)
+                self._link(asset.name, record)
+
+            removed = [name for name in self._assets if name not in seen]
+            for name in removed:
+                self._unlink(name)
+
+            self.synced_at = datetime.now(timezone.utc)
+            return {"added": added, "updated": updated, "removed": len(removed), "total": len(self._assets)}
+
+    # ---------------------------- Graph --------------------------- #
+    def _link(self, name: str, record: tuple) -> None:
+        uri, producers, consumers = record
+        self._assets[name] = record
+        if uri:
+            self._by_uri[uri] = name
+        self._producers[name] = set(producers)
+        self._consumers[name] = set(consumers)
+        for dag_id in producers:
+            self._outputs.setdefault(dag_id, set()).add(name)
+        for dag_id in consumers:
+            self._inputs.setdefault(dag_id, set()).add(name)
+
+    def _unlink(self, name: str) -> None:
+        uri, producers, consumers = self._assets.pop(name)
+        if uri and self._by_uri.get(uri) == name:
+            del self._by_uri[uri]
+        for dag_id in producers:
+            self._discard(self._outputs, dag_id, name)
+        for dag_id in consumers:
+            self._discard(self._inputs, dag_id, name)
+        self._producers.pop(name, None)
+        self._consumers.pop(name, None)
+
+    @staticmethod
+    def _discard(index: dict[str, set[str]], key: str, value: str) -> None:
+        values = index.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del index[key]
+
+    def resolve_asset(self, asset: str) -> str | None:
+        """Return the name of an asset given its name or URI."""
+        return asset if asset in self._assets else self._by_uri.get(asset)
+
+    def has_dag(self, dag_id: str) -> bool:
+        return dag_id in self._outputs or dag_id in self._inputs
+
+    # ---------------------------- Traverse ------------------------ #
+    def traverse(
+        self,
+        asset: str | None = None,
+        dag_id: str | None = None,
+        direction: str = "downstream",
+        max_depth: int | None = None,
+        include_edges: bool = False,
+    ) -> dict:
+        """
+        Walk the graph breadth-first from an asset or a DAG.
+
+        Downstream follows asset -> consuming DAG -> produced asset; upstream
+        follows the reverse. Depth counts edges from the start node, so the
+        consumers of an asset are at depth 1 and the assets they produce at 2.
+
+        Args:
+            asset (str): Start asset (name or URI).
+            dag_id (str): Start DAG, when no asset is given.
+            direction (str): "downstream" or "upstream".
+            max_depth (int): Stop after this many edges (default: no limit).
+            include_edges (bool): Also return the traversed `[from, to]` edges.
+
+        Returns:
+            dict: Reached `assets` (`{name, uri, depth}`) and `dags` (`{dag_id, depth}`),
+                ordered by depth, plus the time of the last sync.
+        """
+        if direction not in DIRECTIONS:
+            return {"error": f"direction must be one of {DIRECTIONS}."}
+        if asset is not None:
+            name = self.resolve_asset(asset)
+            if name is None:
+                return {"error": f"Asset '{asset}' not found in the lineage graph."}
+            start = ("asset", name)
+        elif dag_id is not None:
+            if not self.has_dag(dag_id):
+                return {"error": f"DAG '{dag_id}' neither produces nor consumes any asset."}
+            start = ("dag", dag_id)
+        else:
+            return {"error": "Give an asset or a dag_id."}
+
+        # Downstream: asset -> DAGs consuming it, DAG -> assets it produces; upstream the reverse.
+        from_asset, from_dag = (self._consumers, self._outputs) if direction == "downstream" else (self._producers, self._inputs)
+
+        depths = {start: 0}
+        edges = []
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            depth = depths[node]
+            if max_depth is not None and depth >= max_depth:
+                continue
+            kind, key = node
+            neighbours = [("dag", d) for d in from_asset.get(key, ())] if kind == "asset" else \
+                [("asset", a) for a in from_dag.get(key, ())]
+            for neighbour in neighbours:
+                if include_edges:
+                    edges.append([node[1], neighbour[1]] if direction == "downstream" else [neighbour[1], node[1]])
+                if neighbour not in depths:
+                    depths[neighbour] = depth + 1
+                    queue.append(neighbour)
+
+        reached = sorted((depth, kind, key) for (kind, key), depth in depths.items() if (kind, key) != start)
+        result = {
+            "start": {start[0]: start[1]},
+            "direction": direction,
+            "assets": [{"name": key, "uri": self._assets[key][0], "depth": depth} for depth, kind, key in reached if kind == "asset"],
+            "dags": [{"dag_id": key, "depth": depth} for depth, kind, key in reached if kind == "dag"],
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+        }
+        if include_edges:
+            result["edges"] = edges
+        return result
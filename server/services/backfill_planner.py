@@ -0,0 +1,262 @@
+import asyncio
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from services.bulk import BulkExecutor
+from services.models import DagRun
+from services.settings import env_int
+
+# How many plans are remembered for `progress`; the oldest is dropped first.
+MAX_PLANS = 100
+
+FINISHED_RUN_STATES = {"success", "failed"}
+
+
+class Partition:
+    """One contiguous slice of a backfill plan, submitted as a single Airflow backfill."""
+
+    __slots__ = ("from_date", "to_date", "runs", "status", "backfill_id", "error")
+
+    def __init__(self, from_date: str, to_date: str, runs: int):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.runs = runs
+        self.status = "pending"  # pending -> submitted -> completed
+        self.backfill_id = None
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__ if getattr(self, slot) is not None}
+
+
+class BackfillPlan:
+    """Partitions of a backfill per DAG, the options they are submitted with, and when submission started."""
+
+    def __init__(self, options: dict, partitions: dict[str, list[Partition]]):
+        self.plan_id = uuid.uuid4().hex[:12]
+        self.options = options
+        self.partitions = partitions
+        self.submitted_at: float | None = None
+
+    @property
+    def estimated_runs(self) -> int:
+        return sum(p.runs for parts in self.partitions.values() for p in parts)
+
+    def active(self, dag_id: str) -> Partition | None:
+        return next((p for p in self.partitions[dag_id] if p.status == "submitted"), None)
+
+    def next_pending(self, dag_id: str) -> Partition | None:
+        return next((p for p in self.partitions[dag_id] if p.status == "pending"), None)
+
+    def summary(self) -> dict:
+        return {
+            "plan_id": self.plan_id,
+            "estimated_runs": self.estimated_runs,
+            "partitions": {dag_id: [p.to_dict() for p in parts] for dag_id, parts in self.partitions.items()},
+        }
+
+
+class BackfillPlanner:
+    """
+    Plans large backfills as partitions and tracks their progress.
+
+    `plan` asks Airflow for a dry run of the range, which lists the exact
+    logical dates a backfill would create, and splits them into contiguous
+    partitions of at most `partition_runs` runs. Airflow runs only one backfill
+    per DAG at a time (a second one is rejected with 409), so each DAG submits
+    its partitions one after another: `progress` submits a DAG's next partition
+    once the previous backfill has completed. Submissions for different DAGs go
+    through a `BulkExecutor`, which bounds concurrency and retries transient
+    failures.
+
+    Args:
+        client: The shared `AirflowClient`.
+        partition_runs (int): Maximum runs per partition. Defaults to `_AIRFLOW_BACKFILL_PARTITION_RUNS`.
+    """
+
+    def __init__(self, client, partition_runs: int | None = None):
+        self.client = client
+        self.partition_runs = max(1, partition_runs or env_int("_AIRFLOW_BACKFILL_PARTITION_RUNS", 100))
+        self.bulk = BulkExecutor()
+        self.plans: OrderedDict[str, BackfillPlan] = OrderedDict()
+
+    @staticmethod
+    def partition(logical_dates: list[str], size: int) -> list[Partition]:
+        """Split sorted logical dates into contiguous partitions of at most `size` runs."""
+        return [
+            Partition(chunk[0], chunk[-1], len(chunk))
+            for chunk in (logical_dates[i:i + size] for i in range(0, len(logical_dates), size))
+        ]
+
+    async def dry_run(self, dag_id: str, from_date: str, to_date: str, options: dict) -> list[str] | dict:
+        """Return the sorted logical dates a backfill of the range would create, or the error response."""
+        payload = {"dag_id": dag_id, "from_date": from_date, "to_date": to_date, **options}
+        response = await self.client.api_request("backfills/dry_run", "post", json=payload)
+        if self.client.is_error(response):
+            return response
+        return sorted(run["logical_date"] for run in response.get("backfills", []) if run.get("logical_date"))
+
+    async def plan(
+        self,
+        dag_ids: list[str],
+        from_date: str,
+        to_date: str,
+        options: dict,
+        partition_runs: int | None = None,
+        submit: bool = False,
+    ) -> dict:
+        """
+        Estimate and partition a backfill of `dag_ids` over a date range.
+
+        Args:
+            dag_ids (list[str]): DAGs to backfill.
+            from_date (str): Start of the range (ISO 8601).
+            to_date (str): End of the range (ISO 8601).
+            options (dict): Other backfill fields (`run_backwards`, `reprocess_behavior`,
+                `max_active_runs`, `dag_run_conf`).
+            partition_runs (int): Maximum runs per partition (default: the planner's).
+            submit (bool): Submit the first partition of every DAG right away.
+
+        Returns:
+            dict: The plan (`plan_id`, `estimated_runs`, partitions per DAG) and,
+                when submitted, the submission summary. Dry-run failures are
+                listed under `errors` and those DAGs are left out of the plan.
+        """
+        size = max(1, partition_runs or self.partition_runs)
+        dry_runs = await asyncio.gather(*(self.dry_run(dag_id, from_date, to_date, options) for dag_id in dag_ids))
+
+        partitions, errors = {}, []
+        for dag_id, dates in zip(dag_ids, dry_runs):
+            if isinstance(dates, list):
+                parts = self.partition(dates, size)
+                partitions[dag_id] = parts[::-1] if options.get("run_backwards") else parts
+            else:
+                errors.append({"dag_id": dag_id, "error": dates})
+
+        plan = BackfillPlan(options, partitions)
+        self.plans[plan.plan_id] = plan
+        while len(self.plans) > MAX_PLANS:
+            self.plans.popitem(last=False)
+
+        result = plan.summary()
+        if errors:
+            result["errors"] = errors
+        if submit:
+            result["submitted"] = await self.submit_next(plan)
+        return result
+
+    async def submit_next(self, plan: BackfillPlan, dag_ids: list[str] | None = None) -> dict:
+        """Submit the next pending partition of every DAG that has no backfill running."""
+        due = []
+        for dag_id in dag_ids if dag_ids is not None else plan.partitions:
+            if plan.active(dag_id) is None and (partition := plan.next_pending(dag_id)) is not None:
+                due.append((dag_id, partition))
+
+        async def submit(item):
+            dag_id, partition = item
+            payload = {"dag_id": dag_id, "from_date": partition.from_date, "to_date": partition.to_date, **plan.options}
+            response = await self.client.api_request("backfills", "post", json=payload, retries=0)
+            if self.client.is_error(response):
+                # Stays pending, so the next progress call tries again (e.g. after a 409).
+                partition.error = response.get("error", response) if isinstance(response, dict) else response
+            else:
+                partition.status, partition.backfill_id, partition.error = "submitted", response.get("id"), None
+            return response
+
+        if plan.submitted_at is None and due:
+            plan.submitted_at = time.time()
+        return await self.bulk.run(due, submit, key=lambda item: f"{item[0]} {item[1].from_date}", idempotent=False)
+
+    async def _dag_progress(self, plan: BackfillPlan, dag_id: str) -> dict:
+        parts = plan.partitions[dag_id]
+        if not parts:
+            return {"states": Counter()}
+        params = {
+            "run_type": "backfill",
+            "logical_date_gte": min(p.from_date for p in parts),
+            "logical_date_lte": max(p.to_date for p in parts),
+        }
+        runs = await self.client.fetch_all(f"dags/{dag_id}/dagRuns", "dag_runs", params, cache=False, model=DagRun)
+        if self.client.is_error(runs):
+            return {"error": runs}
+        states = Counter(run.state for run in runs["dag_runs"])
+
+        active = plan.active(dag_id)
+        if active is not None:
+            backfills = await self.client.fetch_all("backfills", "backfills", {"dag_id": dag_id}, cache=False)
+            if self.client.is_error(backfills):
+                return {"error": backfills}
+            backfill = next((b for b in backfills["backfills"] if b.get("id") == active.backfill_id), None)
+            if backfill is None or backfill.get("completed_at"):
+                active.status = "completed"
+
+        return {"states": states}
+
+    async def progress(self, plan_id: str, advance: bool = True) -> dict:
+        """
+        Aggregate the progress of a plan with one run listing (and, while a
+        partition is running, one backfill listing) per DAG.
+
+        Args:
+            plan_id (str): ID returned by `plan`.
+            advance (bool): Submit the next partition of DAGs whose backfill completed.
+
+        Returns:
+            dict: Run counts (`done`, `failed`, `running`, `queued`, `not_started`),
+                partition counts, `percent_done` and `eta_seconds` (from the
+                completion rate since submission), plus per-DAG errors.
+        """
+        plan = self.plans.get(plan_id)
+        if plan is None:
+            return {"error": f"Unknown backfill plan '{plan_id}'."}
+
+        semaphore = asyncio.Semaphore(self.bulk.concurrency)
+
+        async def dag_progress(dag_id):
+            async with semaphore:
+                return await self._dag_progress(plan, dag_id)
+
+        dag_ids = list(plan.partitions)
+        results = await asyncio.gather(*(dag_progress(dag_id) for dag_id in dag_ids))
+
+        states, errors = Counter(), []
+        for dag_id, result in zip(dag_ids, results):
+            if "error" in result:
+                errors.append({"dag_id": dag_id, "error": result["error"]})
+            else:
+                states.update(result["states"])
+
+        submitted = None
+        if advance:
+            submitted = await self.submit_next(plan, [d for d, r in zip(dag_ids, results) if "error" not in r])
+
+        estimated = plan.estimated_runs
+        finished = sum(count for state, count in states.items() if state in FINISHED_RUN_STATES)
+        eta = None
+        if plan.submitted_at is not None and finished:
+            rate = finished / max(time.time() - plan.submitted_at, 1e-6)
+            eta = round(max(estimated - finished, 0) / rate, 1)
+
+        partitions = Counter(p.status for parts in plan.partitions.values() for p in parts)
+        result = {
+            "plan_id": plan_id,
+            "estimated_runs": estimated,
+            "done": states["success"],
+            "failed": states["failed"],
+            "running": states["running"],
+            "queued": states["queued"],
+            "not_started": max(estimated - sum(states.values()), 0),
+            "percent_done": round(100 * finished / estimated, 1) if estimated else 100.0,
+            "eta_seconds": eta,
+            "partitions": {status: partitions[status] for status in ("pending", "submitted", "completed")},
+        }
+        pending_errors = [
+            {"dag_id": dag_id, "from_date": p.from_date, "error": p.error}
+            for dag_id, parts in plan.partitions.items() for p in parts if p.error
+        ]
+        if errors or pending_errors:
+            result["errors"] = errors + pending_errors
+        if submitted and submitted["total"]:
+            result["submitted"] = submitted
+        return result
@@ -0,0 +1,65 @@
+import asyncio
+import contextvars
+import sys
+from datetime import datetime
+
+from services.airflow_client import AirflowAPIError
+
+
+class BackgroundSync:
+    """
+    Base for in-memory views of Airflow data kept fresh by a background task.
+
+    Subclasses implement `sync()`, holding `_sync_lock` while they update their
+    state and setting `synced_at` when done. The first `ensure_started()` runs
+    one sync, shared by concurrent callers, and starts a task that repeats it
+    every `refresh_interval` seconds until the client is closed. A failed
+    background sync is reported on stderr and the previous state is kept.
+
+    Args:
+        client: The shared `AirflowClient`.
+        refresh_interval (float): Seconds between background syncs.
+    """
+
+    # Shown in the error printed when a background sync fails.
+    label = "Background"
+
+    def __init__(self, client, refresh_interval: float):
+        self.client = client
+        self.refresh_interval = refresh_interval
+
+        self.synced_at: datetime | None = None
+        self._sync_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._initial_sync: asyncio.Task | None = None
+
+        client.on_close(self.stop)
+
+    async def sync(self) -> dict:
+        raise NotImplementedError
+
+    async def ensure_started(self) -> None:
+        """Run the first sync if needed and start the background refresh task."""
+        if self.synced_at is None:
+            # Concurrent first calls share one initial sync.
+            if self._initial_sync is None or self._initial_sync.done():
+                self._initial_sync = asyncio.create_task(self.sync())
+            await self._initial_sync
+
+        if self._task is None or self._task.done():
+            # A fresh context, so background syncs are not attributed to the tool call that started them.
+            self._task = asyncio.create_task(self._refresh_loop(), context=contextvars.Context())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.sync()
+            except AirflowAPIError as e:
+                print(f"{self.label} sync failed: {e}", file=sys.stderr)
@@ -0,0 +1,180 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+import httpx
+
+from services.airflow_client import AirflowClient
+from services.settings import env_float, env_int
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Args:
+        rate (float): Tokens added per second. A rate <= 0 disables limiting.
+        burst (int): Maximum number of tokens that can accumulate.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = max(1, burst or int(rate) or 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BulkExecutor:
+    """
+    Runs one async operation over many items with bounded concurrency.
+
+    Every call goes through a concurrency semaphore and a token-bucket rate
+    limiter. Failed items are retried with jittered exponential backoff when the
+    error is transient. The result is a compact summary, not one entry per item.
+
+    Operations should call `api_request` with `retries=0`: the client's own
+    retries would otherwise multiply with these, for up to
+    `(_AIRFLOW_RETRIES + 1) * (retries + 1)` attempts per item.
+
+    Args:
+        concurrency (int): Maximum operations in flight. Defaults to `_AIRFLOW_BULK_CONCURRENCY`.
+        rate (float): Maximum operations started per second. Defaults to `_AIRFLOW_BULK_RATE`.
+        retries (int): Retries per item after the first attempt. Defaults to `_AIRFLOW_BULK_RETRIES`.
+        backoff (float): Base backoff in seconds. Defaults to `_AIRFLOW_BULK_BACKOFF`.
+        max_errors (int): Maximum number of failures listed in the summary.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        rate: float | None = None,
+        retries: int | None = None,
+        backoff: float | None = None,
+        max_errors: int = 20,
+    ):
+        self.concurrency = max(1, concurrency or env_int("_AIRFLOW_BULK_CONCURRENCY", 10))
+        self.rate = rate if rate is not None else env_float("_AIRFLOW_BULK_RATE", 20.0)
+        self.retries = retries if retries is not None else env_int("_AIRFLOW_BULK_RETRIES", 3)
+        self.backoff = backoff if backoff is not None else env_float("_AIRFLOW_BULK_BACKOFF", 0.5)
+        self.max_errors = max_errors
+
+    @staticmethod
+    def is_retryable(result: Any, idempotent: bool = True) -> bool:
+        """
+        Return True for failures worth another attempt.
+
+        Idempotent operations are retried on transport failures, throttling
+        (429) and server errors (5xx). Others only on 429 and transport
+        failures: a 5xx may come after the change was applied. Any other
+        failure, including one without an HTTP status, is final.
+        """
+        if not isinstance(result, dict):
+            return False
+        status = result.get("status")
+        if isinstance(status, int):
+            return status == 429 or (idempotent and status >= 500)
+        return bool(result.get("transport_error"))
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        operation: Callable[[Any], Awaitable[Any]],
+        key: Callable[[Any], str] = str,
+        skip: Callable[[Any], bool] | None = None,
+        progress: Callable[[int, int, str], Awaitable[None]] | None = None,
+        idempotent: bool = True,
+    ) -> dict:
+        """
+        Apply `operation` to every item and summarize the outcome.
+
+        Args:
+            items (Iterable): The items to process.
+            operation (Callable): Async function called with one item; its result is
+                checked with `AirflowClient.is_error`.
+            key (Callable): Returns the identifier of an item used in the summary.
+            skip (Callable): Returns True for items that need no operation.
+            progress (Callable): Async callback `(done, total, message)`, called at most
+                every 250 ms and once at the end.
+            idempotent (bool): Whether repeating `operation` is safe; see `is_retryable`.
+
+        Returns:
+            dict: Counts of `succeeded`, `failed` and `skipped` items, plus up to
+                `max_errors` failures as `{"id": ..., "error": ...}`.
+        """
+        items = list(items)
+        pending = [item for item in items if not (skip and skip(item))]
+
+        summary = {
+            "total": len(items),
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": len(items) - len(pending),
+            "retries": 0,
+            "errors": [],
+        }
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.rate, burst=self.concurrency)
+        done = 0
+        last_report = 0.0
+
+        async def report(force: bool = False):
+            nonlocal last_report
+            now = time.monotonic()
+            if progress and (force or now - last_report >= 0.25):
+                last_report = now
+                await progress(done, len(pending), f"{summary['succeeded']} succeeded, {summary['failed']} failed")
+
+        async def process(item):
+            nonlocal done
+            async with semaphore:
+                for attempt in range(self.retries + 1):
+                    await bucket.acquire()
+                    try:
+                        result = await operation(item)
+                    except httpx.TransportError as e:
+                        result = {"error": str(e), "transport_error": True}
+                    except Exception as e:
+                        result = {"error": str(e)}
+
+                    if not AirflowClient.is_error(result):
+                        summary["succeeded"] += 1
+                        break
+
+                    if attempt == self.retries or not self.is_retryable(result, idempotent):
+                        summary["failed"] += 1
+                        if len(summary["errors"]) < self.max_errors:
+                            error = result.get("error", result) if isinstance(result, dict) else result
+                            summary["errors"].append({"id": key(item), "error": str(error)[:200]})
+                        break
+
+                    summary["retries"] += 1
+                    delay = self.backoff * 2 ** attempt
+                    await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+
+            done += 1
+            await report()
+
+        await asyncio.gather(*(process(item) for item in pending))
+        await report(force=True)
+
+        return summary
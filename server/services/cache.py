@@ -0,0 +1,182 @@
+import json
+import time
+from collections import OrderedDict
+
+import httpx
+
+from services.settings import env_bool, env_int, env_str
+
+# Default time-to-live (seconds) for GET endpoints worth caching. `*` matches
+# exactly one path segment; endpoints that match no rule are never cached.
+DEFAULT_TTLS = {
+    "dags": 15,
+    "dags/*": 15,
+    "dags/*/details": 30,
+    "dags/*/tasks": 300,
+    "connections": 30,
+    "connections/*": 30,
+    "assets": 60,
+    "assets/*": 60,
+}
+
+
+class CacheEntry:
+    """A cached GET response body together with its HTTP validators."""
+
+    __slots__ = ("endpoint", "content", "etag", "last_modified", "expires_at")
+
+    def __init__(self, endpoint: str, response: httpx.Response, ttl: float):
+        self.endpoint = endpoint
+        self.content = response.content
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def validators(self) -> dict:
+        """Headers for a conditional request, empty if the server sent no validators."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    In-process LRU cache for Airflow GET responses.
+
+    Entries live for a per-endpoint TTL and the cache is bounded by the total
+    size of the cached bodies. Expired entries that carry an ETag or
+    Last-Modified header are kept, so they can be revalidated with a conditional
+    request instead of being downloaded again.
+
+    Args:
+        max_bytes (int): Upper bound on cached body bytes. Defaults to `_AIRFLOW_CACHE_MAX_BYTES`.
+        ttls (dict): Endpoint pattern to TTL in seconds. Defaults to `DEFAULT_TTLS`
+            updated with the JSON object in `_AIRFLOW_CACHE_TTLS`.
+        enabled (bool): Turn the cache on or off. Defaults to `_AIRFLOW_CACHE_ENABLED`.
+    """
+
+    def __init__(self, max_bytes: int | None = None, ttls: dict | None = None, enabled: bool | None = None):
+        self.enabled = enabled if enabled is not None else env_bool("_AIRFLOW_CACHE_ENABLED", True)
+        self.max_bytes = max_bytes or env_int("_AIRFLOW_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+        if ttls is None:
+            ttls = {**DEFAULT_TTLS, **json.loads(env_str("_AIRFLOW_CACHE_TTLS", "{}"))}
+        self.ttls = [(pattern.strip("/").split("/"), float(ttl)) for pattern, ttl in ttls.items()]
+
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "evictions": 0, "invalidations": 0}
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Return the TTL for `endpoint`, or 0 if it should not be cached."""
+        if not self.enabled:
+            return 0
+
+        segments = endpoint.strip("/").split("/")
+        for pattern, ttl in self.ttls:
+            if len(pattern) == len(segments) and all(p in ("*", s) for p, s in zip(pattern, segments)):
+                return ttl
+        return 0
+
+    @staticmethod
+    def key(endpoint: str, params=None) -> str:
+        """Build the cache key for a GET of `endpoint` with query `params`."""
+        query = sorted(httpx.QueryParams(params or {}).multi_items())
+        return f"{endpoint}?{httpx.QueryParams(query)}"
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Look up an entry, fresh or stale.
+
+        A fresh entry counts as a hit. A stale entry is still returned so its
+        validators can be used for a conditional request.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.counters["hits" if entry.fresh else "stale"] += 1
+        return entry
+
+    def put(self, key: str, endpoint: str, response: httpx.Response, ttl: float) -> None:
+        """Store a 200 response, evicting least-recently-used entries to stay within `max_bytes`."""
+        if len(response.content) > self.max_bytes // 4:
+            return
+
+        self._discard(key)
+        entry = CacheEntry(endpoint, response, ttl)
+        self._entries[key] = entry
+        self._bytes += len(entry.content)
+
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.content)
+            self.counters["evictions"] += 1
+
+    def revalidated(self, key: str, ttl: float) -> CacheEntry | None:
+        """Extend a stale entry after the server answered 304 Not Modified."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.expires_at = time.monotonic() + ttl
+            self.counters["revalidated"] += 1
+        return entry
+
+    def invalidate(self, endpoint: str) -> int:
+        """
+        Drop entries affected by a mutation of `endpoint`.
+
+        A mutation of `dags/{dag_id}/...` drops everything cached under
+        `dags/{dag_id}` plus the `dags` listing; a mutation of a collection
+        such as `backfills` drops everything under it.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        segments = endpoint.strip("/").split("/")
+        collection = segments[0]
+        resource = "/".join(segments[:2])
+
+        def affected(cached: str) -> bool:
+            if len(segments) == 1:
+                return cached == collection or cached.startswith(collection + "/")
+            return cached == collection or cached == resource or cached.startswith(resource + "/")
+
+        stale = [key for key, entry in self._entries.items() if affected(entry.endpoint)]
+        for key in stale:
+            self._discard(key)
+
+        self.counters["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size, for sizing the cache."""
+        # Stale entries answered with 304 saved a download, so they count as hits.
+        lookups = self.counters["hits"] + self.counters["misses"] + self.counters["stale"]
+        served = self.counters["hits"] + self.counters["revalidated"]
+        return {
+            **self.counters,
+            "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "enabled": self.enabled,
+        }
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.content)
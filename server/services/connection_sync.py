@@ -0,0 +1,235 @@
+import json
+
+from services.bulk import BulkExecutor
+from services.models import Connection
+
+# Airflow masks passwords and sensitive `extra` keys with this value when reading connections.
+SECRET_MASK = "***"
+
+# Fields compared in the clear; `password` and masked `extra` keys are handled as secrets.
+COMPARED_FIELDS = ("conn_type", "description", "host", "login", "schema", "port")
+
+# Entities per bulk request.
+BULK_BATCH_SIZE = 500
+
+
+def _blank(value):
+    """Treat empty strings and zero ports like unset fields, as Airflow does."""
+    return None if value in ("", 0) else value
+
+
+def _extra_dict(extra):
+    if isinstance(extra, dict):
+        return extra
+    if not extra:
+        return {}
+    try:
+        parsed = json.loads(extra)
+    except (TypeError, ValueError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+class ConnectionSync:
+    """
+    Reconciles Airflow connections with a desired set.
+
+    The current connections are read with pagination and compared field by
+    field. Airflow never returns secrets, so a masked password (or masked
+    `extra` key) cannot be compared: such connections are reported as
+    `secrets_unverified` and only rewritten when asked to. Changes are applied
+    with the bulk `PATCH /connections` endpoint, falling back to one request
+    per connection through a `BulkExecutor` when it is not available.
+
+    Diffs and results only ever contain connection IDs and field names, never values.
+
+    Args:
+        client: The shared `AirflowClient`.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.bulk = BulkExecutor()
+
+    @staticmethod
+    def entity(connection: dict) -> dict:
+        """
+        Build an Airflow connection body from a desired connection.
+
+        `password` is only sent when the desired connection gives it: a missing
+        password leaves the stored secret unchanged.
+        """
+        extra = connection.get("extra")
+        body = {
+            "connection_id": connection["connection_id"],
+            "conn_type": connection["conn_type"],
+            "description": connection.get("description"),
+            "host": connection.get("host"),
+            "login": connection.get("login"),
+            "schema": connection.get("schema"),
+            "port": _blank(connection.get("port")),
+            "extra": json.dumps(extra) if isinstance(extra, dict) else extra,
+        }
+        if "password" in connection:
+            body["password"] = connection["password"]
+        return body
+
+    @staticmethod
+    def compare(desired: dict, current: Connection) -> tuple[list[str], list[str]]:
+        """
+        Compare one desired connection body with the current one.
+
+        Returns:
+            tuple: Names of the fields that differ, and of the secrets that
+                cannot be verified because Airflow masks them.
+        """
+        changed = [f for f in COMPARED_FIELDS if _blank(desired.get(f)) != _blank(getattr(current, f))]
+        unverified = []
+
+        if "password" in desired:
+            want, have = _blank(desired["password"]), _blank(current.password)
+            if have == SECRET_MASK and want is not None:
+                unverified.append("password")
+            elif want != have:
+                changed.append("password")
+
+        want, have = _extra_dict(desired.get("extra")), _extra_dict(current.extra)
+        if want is None or have is None:
+            if _blank(desired.get("extra")) != _blank(current.extra):
+                changed.append("extra")
+        else:
+            masked = {key for key, value in have.items() if value == SECRET_MASK}
+            if {k: v for k, v in want.items() if k not in masked} != {k: v for k, v in have.items() if k not in masked} \
+                    or not masked.issubset(want):
+                changed.append("extra")
+            elif masked:
+                unverified.extend(f"extra.{key}" for key in sorted(masked))
+
+        return changed, unverified
+
+    def diff(self, desired: list[dict], current: list[Connection], delete_missing: bool, update_secrets: bool) -> dict:
+        """
+        Split the desired set into connections to create, update and delete.
+
+        Returns:
+            dict: `create` (IDs), `update` (`{connection_id, changed}`), `delete` (IDs),
+                `unchanged` (count), `secrets_unverified` (IDs) and `invalid` entries,
+                plus the `entities` to send (internal, never returned to callers).
+        """
+        existing = {conn.connection_id: conn for conn in current}
+        result = {"create": [], "update": [], "delete": [], "unchanged": 0, "secrets_unverified": [], "invalid": []}
+        entities = {"create": [], "update": []}
+        seen = set()
+
+        for index, connection in enumerate(desired):
+            if not isinstance(connection, dict) or not connection.get("connection_id") or not connection.get("conn_type"):
+                result["invalid"].append({"index": index, "error": "connection_id and conn_type are required."})
+                continue
+            conn_id = connection["connection_id"]
+            if conn_id in seen:
+                result["invalid"].append({"index": index, "error": f"Duplicate connection_id '{conn_id}'."})
+                continue
+            seen.add(conn_id)
+
+            body = self.entity(connection)
+            if conn_id not in existing:
+                result["create"].append(conn_id)
+                entities["create"].append(body)
+                continue
+
+            changed, unverified = self.compare(body, existing[conn_id])
+            if unverified and update_secrets:
+                changed += unverified
+            elif unverified:
+                result["secrets_unverified"].append(conn_id)
+
+            if changed:
+                result["update"].append({"connection_id": conn_id, "changed": changed})
+                entities["update"].append(body)
+            else:
+                result["unchanged"] += 1
+
+        if delete_missing:
+            result["delete"] = sorted(set(existing) - seen)
+
+        result["entities"] = entities
+        return result
+
+    async def apply(self, entities: dict, delete: list[str], progress=None) -> dict:
+        """
+        Apply creates, updates and deletes, in bulk when the endpoint allows it.
+
+        Returns:
+            dict: `method` ("bulk" or "per_connection") and, per action, the
+                `succeeded` and `failed` counts plus the first errors.
+        """
+        actions = [
+            ("create", entities["create"], {"action_on_existence": "fail"}),
+            ("update", entities["update"], {"action_on_non_existence": "fail"}),
+            ("delete", delete, {"action_on_non_existence": "skip"}),
+        ]
+        result = {action: {"succeeded": 0, "failed": 0, "errors": []} for action, _, _ in actions}
+        method = "bulk"
+
+        for action, items, options in actions:
+            for start in range(0, len(items), BULK_BATCH_SIZE):
+                batch = items[start:start + BULK_BATCH_SIZE]
+                body = {"actions": [{"action": action, "entities": batch, **options}]}
+                response = await self.client.api_request("connections", "patch", json=body)
+                if method == "bulk" and isinstance(response, dict) and response.get("status") in (404, 405) \
+                        and not any(r["succeeded"] or r["failed"] for r in result.values()):
+                    # No bulk endpoint on this server: apply every change one connection at a time.
+                    method = "per_connection"
+                    break
+                if self.client.is_error(response):
+                    result[action]["failed"] += len(batch)
+                    result[action]["errors"].append({"error": str(response.get("error", response))[:200]})
+                    continue
+                outcome = response.get(action) or {}
+                result[action]["succeeded"] += len(outcome.get("success") or [])
+                errors = outcome.get("errors") or []
+                result[action]["failed"] += len(errors)
+                result[action]["errors"].extend(
+                    {"error": str(e.get("error", e))[:200], "status": e.get("status_code")} for e in errors[:20]
+                )
+            if method == "per_connection":
+                items = [(action, item) for action, batch, _ in actions for item in batch]
+                return {"method": method, **await self._apply_each(items, result, progress)}
+
+        return {"method": method, **result}
+
+    async def _apply_each(self, items: list[tuple], result: dict, progress=None) -> dict:
+        attempted = set()
+
+        async def apply_one(item):
+            action, entity = item
+            if action == "create":
+                conn_id = entity["connection_id"]
+                retried = conn_id in attempted
+                attempted.add(conn_id)
+                response = await self.client.api_request("connections", "post", json=entity, retries=0)
+                if retried and isinstance(response, dict) and response.get("status") == 409:
+                    # The failed earlier attempt reached Airflow and created it.
+                    return {"status": 409}
+                return response
+            if action == "update":
+                return await self.client.api_request(
+                    f"connections/{entity['connection_id']}", "patch", json=entity, retries=0
+                )
+            return await self.client.api_request(f"connections/{entity}", "delete", retries=0)
+
+        for action in result:
+            batch = [item for item in items if item[0] == action]
+            if not batch:
+                continue
+            summary = await self.bulk.run(
+                batch,
+                apply_one,
+                key=lambda item: item[1] if item[0] == "delete" else item[1]["connection_id"],
+                progress=progress,
+                idempotent=action != "create",
+            )
+            result[action]["succeeded"] += summary["succeeded"]
+            result[action]["failed"] += summary["failed"]
+            result[action]["errors"].extend(summary["errors"])
+        return result
@@ -0,0 +1,189 @@
+from array import array
+from collections import Counter
+from datetime import datetime
+from math import inf
+from operator import sub
+
+from services.stats import finite, percentile, rounded
+
+
+def epoch(timestamp: str | None) -> float | None:
+    """Seconds since the epoch of an ISO 8601 timestamp, or None when unset."""
+    return datetime.fromisoformat(timestamp).timestamp() if timestamp else None
+
+
+class TaskGraph:
+    """
+    The task dependency graph of one DAG, from `GET /dags/{dag_id}/tasks`.
+
+    Tasks are numbered in listing order; `upstream[t]` holds the numbers of
+    the tasks that `t` depends on.
+    """
+
+    __slots__ = ("task_ids", "index", "upstream")
+
+    def __init__(self, tasks: list[dict]):
+        self.task_ids = [task["task_id"] for task in tasks]
+        self.index = {task_id: number for number, task_id in enumerate(self.task_ids)}
+        upstream = [[] for _ in self.task_ids]
+        for number, task in enumerate(tasks):
+            for task_id in task.get("downstream_task_ids") or ():
+                if task_id in self.index:
+                    upstream[self.index[task_id]].append(number)
+        self.upstream = [tuple(numbers) for numbers in upstream]
+
+
+class RunTimings:
+    """
+    Start and end times of every task across a set of DAG runs, in flat columnar arrays.
+
+    The times of task `t` in run `r` live at `r * width + t`, so one run is a
+    contiguous slice and one task's history a strided slice, and no per-task
+    instance object is kept once it has been added. Missing starts are +inf and
+    missing ends -inf, which makes "earliest start" and "latest end" plain
+    `min`/`max` and lets mapped task instances fold into one span.
+
+    Args:
+        graph (TaskGraph): The DAG's tasks.
+        runs (list[tuple]): `(dag_run_id, start_date)` of every run, in output order.
+    """
+
+    def __init__(self, graph: TaskGraph, runs: list[tuple[str, str | None]]):
+        self.graph = graph
+        self.width = len(graph.task_ids)
+        self.run_ids = [run_id for run_id, _ in runs]
+        self.run_index = {run_id: number for number, run_id in enumerate(self.run_ids)}
+        self.run_starts = [epoch(start) for _, start in runs]
+        size = len(runs) * self.width
+        self.starts = array("d", [inf]) * size
+        self.ends = array("d", [-inf]) * size
+
+    def add(self, task_instance) -> None:
+        """Record one finished task instance; mapped instances widen their task's span."""
+        run = self.run_index.get(task_instance.dag_run_id)
+        task = self.graph.index.get(task_instance.task_id)
+        if run is None or task is None or not (task_instance.start_date and task_instance.end_date):
+            return
+        cell = run * self.width + task
+        self.starts[cell] = min(self.starts[cell], epoch(task_instance.start_date))
+        self.ends[cell] = max(self.ends[cell], epoch(task_instance.end_date))
+
+    def critical_path(self, run: int) -> tuple[float, list[tuple[int, float, float]]] | None:
+        """
+        Walk back from the last task to finish in `run` through the upstream task
+        that finished last, i.e. the one it was actually waiting for.
+
+        Returns:
+            tuple: The run's wall time and its critical path as `(task, running
+                seconds, seconds waited since the blocking upstream finished)`,
+                first task first; or None when no task of the run finished.
+        """
+        base = run * self.width
+        starts = self.starts[base:base + self.width]
+        ends = self.ends[base:base + self.width]
+        last = max(range(self.width), key=ends.__getitem__, default=None)
+        if last is None or ends[last] == -inf:
+            return None
+
+        run_start = self.run_starts[run]
+        if run_start is None:
+            run_start = min(starts)
+
+        # Task graphs are acyclic, so following upstream edges always ends.
+        upstream = self.graph.upstream
+        path = []
+        task = last
+        while task is not None:
+            blocker = max(upstream[task], key=ends.__getitem__, default=None)
+            if blocker is not None and ends[blocker] == -inf:
+                blocker = None
+            ready = ends[blocker] if blocker is not None else run_start
+            path.append((task, ends[task] - starts[task], max(0.0, starts[task] - ready)))
+            task = blocker
+        path.reverse()
+        return ends[last] - run_start, path
+
+    def durations(self, task: int) -> list[float]:
+        """Running time of `task` in every run where it finished."""
+        return finite(map(sub, self.ends[task::self.width], self.starts[task::self.width]))
+
+
+def analyze(timings: RunTimings, top: int = 10) -> dict:
+    """
+    Find the critical path of every run and rank tasks by their share of wall time.
+
+    A task's contribution in a run is its running time plus the time it
+    waited, after its blocking upstream finished, while on that run's
+    critical path; summed over the path this is the run's wall time.
+
+    Args:
+        timings (RunTimings): Task timings of the runs to analyze.
+        top (int): Number of bottleneck tasks returned.
+
+    Returns:
+        dict: `runs_analyzed`, `wall_time` percentiles, the most frequent
+            `critical_path` and the ranked `bottlenecks`.
+    """
+    graph = timings.graph
+    width = timings.width
+    running = array("d", [0.0]) * width
+    waiting = array("d", [0.0]) * width
+    on_path = array("l", [0]) * width
+    paths = Counter()
+    walls = []
+
+    for run in range(len(timings.run_ids)):
+        found = timings.critical_path(run)
+        if found is None:
+            continue
+        wall, path = found
+        walls.append(wall)
+        paths[tuple(task for task, _, _ in path)] += 1
+        for task, run_seconds, wait_seconds in path:
+            running[task] += run_seconds
+            waiting[task] += wait_seconds
+            on_path[task] += 1
+
+    if not walls:
+        return {"runs_analyzed": 0, "task_count": width, "bottlenecks": []}
+
+    analyzed = len(walls)
+    total_wall = sum(walls)
+    ranked = sorted(
+        (task for task in range(width) if on_path[task]),
+        key=lambda task: running[task] + waiting[task],
+        reverse=True,
+    )
+
+    bottlenecks = []
+    for task in ranked[:top]:
+        durations = sorted(timings.durations(task))
+        bottlenecks.append({
+            "task_id": graph.task_ids[task],
+            "share_of_wall_time": rounded((running[task] + waiting[task]) / total_wall, 4) if total_wall else None,
+            "on_critical_path": rounded(on_path[task] / analyzed),
+            "critical_seconds_mean": rounded(running[task] / analyzed, 1),
+            "wait_seconds_mean": rounded(waiting[task] / analyzed, 1),
+            "duration_p50": rounded(percentile(durations, 0.5), 1),
+            "duration_p95": rounded(percentile(durations, 0.95), 1),
+            "duration_max": rounded(durations[-1], 1) if durations else None,
+        })
+
+    path, count = paths.most_common(1)[0]
+    walls.sort()
+    return {
+        "runs_analyzed": analyzed,
+        "task_count": width,
+        "wall_time": {
+            "mean": rounded(total_wall / analyzed, 1),
+            "p50": rounded(percentile(walls, 0.5), 1),
+            "p95": rounded(percentile(walls, 0.95), 1),
+            "max": rounded(walls[-1], 1),
+        },
+        "critical_path": {
+            "task_ids": [graph.task_ids[task] for task in path],
+            "runs": count,
+            "distinct_paths": len(paths),
+        },
+        "bottlenecks": bottlenecks,
+    }
@@ -0,0 +1,172 @@
+import bisect
+from datetime import datetime, timezone
+
+from services.background_sync import BackgroundSync
+from services.models import Dag
+from services.settings import env_float
+
+# DAG fields kept in the catalog (a subset of `Dag`); everything else is dropped.
+CATALOG_FIELDS = (
+    "dag_id",
+    "dag_display_name",
+    "is_paused",
+    "owners",
+    "tags",
+    "fileloc",
+    "description",
+    "timetable_summary",
+    "has_import_errors",
+    "last_parsed_time",
+)
+
+
+class DagCatalog(BackgroundSync):
+    """
+    In-memory, incrementally synced index of DAG metadata.
+
+    The catalog is filled from the paginated `/dags` listing and then kept up to
+    date by a background task. A sync only re-indexes DAGs whose
+    `last_parsed_time` or paused state changed and drops DAGs that disappeared,
+    so searches are answered from memory without touching the API server.
+
+    Indexes are kept on tag, owner, paused state and (through a sorted list of
+    IDs) dag_id prefix.
+
+    Args:
+        client: The shared `AirflowClient`.
+        refresh_interval (float): Seconds between background syncs.
+            Defaults to `_AIRFLOW_CATALOG_REFRESH_INTERVAL`.
+    """
+
+    label = "DAG catalog"
+
+    def __init__(self, client, refresh_interval: float | None = None):
+        super().__init__(client, refresh_interval or env_float("_AIRFLOW_CATALOG_REFRESH_INTERVAL", 60.0))
+
+        self._records: dict[str, dict] = {}
+        self._sorted_ids: list[str] = []
+        self._by_tag: dict[str, set[str]] = {}
+        self._by_owner: dict[str, set[str]] = {}
+        self._paused: set[str] = set()
+
+    # ---------------------------- Sync ---------------------------- #
+    async def sync(self) -> dict:
+        """
+        Bring the catalog up to date with the API server.
+
+        Returns:
+            dict: Counts of `added`, `updated`, `removed` and `total` DAGs.
+        """
+        async with self._sync_lock:
+            seen = set()
+            added = updated = 0
+
+            async for dag in self.client.stream("dags", "dags", {"order_by": "dag_id"}, cache=False, model=Dag):
+                dag_id = dag.dag_id
+                seen.add(dag_id)
+
+                current = self._records.get(dag_id)
+                if current is None:
+                    added += 1
+                elif (
+                    current["last_parsed_time"] == dag.last_parsed_time
+                    and current["is_paused"] == dag.is_paused
+                ):
+                    continue
+                else:
+                    updated += 1
+                    self._unindex(current)
+
+                self._index(dag_id, {field: getattr(dag, field) for field in CATALOG_FIELDS})
+
+            removed = [dag_id for dag_id in self._records if dag_id not in seen]
+            for dag_id in removed:
+                self._unindex(self._records.pop(dag_id))
+
+            if added or removed:
+                self._sorted_ids = sorted(self._records)
+
+            self.synced_at = datetime.now(timezone.utc)
+            return {"added": added, "updated": updated, "removed": len(removed), "total": len(self._records)}
+
+    # ---------------------------- Index --------------------------- #
+    def _index(self, dag_id: str, record: dict) -> None:
+        record["tags"] = sorted(tag["name"] if isinstance(tag, dict) else tag for tag in record.get("tags") or [])
+        record["owners"] = list(record.get("owners") or [])
+        self._records[dag_id] = record
+
+        for tag in record["tags"]:
+            self._by_tag.setdefault(tag, set()).add(dag_id)
+        for owner in record["owners"]:
+            self._by_owner.setdefault(owner.lower(), set()).add(dag_id)
+        if record["is_paused"]:
+            self._paused.add(dag_id)
+
+    def _unindex(self, record: dict) -> None:
+        dag_id = record["dag_id"]
+        for tag in record["tags"]:
+            self._by_tag.get(tag, set()).discard(dag_id)
+        for owner in record["owners"]:
+            self._by_owner.get(owner.lower(), set()).discard(dag_id)
+        self._paused.discard(dag_id)
+
+    def _with_prefix(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._sorted_ids, prefix)
+        end = bisect.bisect_left(self._sorted_ids, prefix + "\uffff")
+        return self._sorted_ids[start:end]
+
+    # ---------------------------- Search -------------------------- #
+    def search(
+        self,
+        tags: list[str] | None = None,
+        tags_match_mode: str = "any",
+        owner: str | None = None,
+        is_paused: bool | None = None,
+        dag_id_prefix: str | None = None,
+        limit: int = 100,
+    ) -> dict:
+        """
+        Find DAGs in the catalog.
+
+        All given filters must match. Candidate sets come from the indexes and
+        are intersected smallest first.
+
+        Args:
+            tags (list[str]): Tags to match.
+            tags_match_mode (str): "any" to match DAGs with at least one tag, "all" to require every tag.
+            owner (str): Owner to match (case-insensitive).
+            is_paused (bool): Only paused (True) or only active (False) DAGs.
+            dag_id_prefix (str): Only DAGs whose ID starts with this prefix.
+            limit (int): Maximum number of DAGs returned.
+
+        Returns:
+            dict: `total_matches`, the first `limit` matching DAG records ordered by
+                dag_id, and the time of the last sync.
+        """
+        candidates: list[set[str]] = []
+
+        if tags:
+            tag_sets = [self._by_tag.get(tag, set()) for tag in tags]
+            candidates.append(set.intersection(*tag_sets) if tags_match_mode == "all" else set().union(*tag_sets))
+        if owner:
+            candidates.append(self._by_owner.get(owner.lower(), set()))
+        if dag_id_prefix:
+            candidates.append(set(self._with_prefix(dag_id_prefix)))
+
+        if candidates:
+            candidates.sort(key=len)
+            matches = candidates[0].intersection(*candidates[1:])
+        else:
+            matches = set(self._records)
+
+        if is_paused is True:
+            matches &= self._paused
+        elif is_paused is False:
+            matches -= self._paused
+
+        dag_ids = sorted(matches)
+        return {
+            "total_matches": len(dag_ids),
+            "dags": [self._records[dag_id] for dag_id in dag_ids[:limit]],
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+        }
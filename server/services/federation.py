@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from services.airflow_client import AirflowClient, instance_prefix
+from services.settings import env_float, env_str
+
+
+class Federation:
+    """
+    A set of named Airflow deployments queried concurrently.
+
+    Each deployment has its own `AirflowClient`, hence its own credentials,
+    JWT, connection pool and response cache. `fan_out` runs one call per
+    deployment at the same time, each under its own timeout, so a slow or
+    failing deployment only removes its own share of the result.
+
+    Deployments are configured with `_AIRFLOW_INSTANCES` (comma-separated
+    names) and, per name, `_AIRFLOW_<NAME>_URL`, `_AIRFLOW_<NAME>_USERNAME`,
+    `_AIRFLOW_<NAME>_PASSWORD` and `_AIRFLOW_<NAME>_TIMEOUT`.
+
+    Args:
+        clients (dict): Client per deployment name, in query order.
+        timeouts (dict): Seconds each deployment may take; defaults to `_AIRFLOW_FANOUT_TIMEOUT`.
+    """
+
+    def __init__(self, clients: dict[str, AirflowClient], timeouts: dict[str, float] | None = None):
+        self.clients = clients
+        default = env_float("_AIRFLOW_FANOUT_TIMEOUT", 15.0)
+        self.timeouts = {name: (timeouts or {}).get(name, default) for name in clients}
+
+    @classmethod
+    def from_env(cls, metrics=None, transport=None) -> "Federation | None":
+        """
+        Build the deployments listed in `_AIRFLOW_INSTANCES`, or return None when it is unset.
+
+        Raises:
+            ValueError: If a listed deployment has no `_AIRFLOW_<NAME>_URL`.
+        """
+        names = [name.strip() for name in env_str("_AIRFLOW_INSTANCES").split(",") if name.strip()]
+        if not names:
+            return None
+        default = env_float("_AIRFLOW_FANOUT_TIMEOUT", 15.0)
+        clients = {name: AirflowClient(transport, instance=name, metrics=metrics) for name in names}
+        timeouts = {name: env_float(f"{instance_prefix(name)}TIMEOUT", default) for name in names}
+        return cls(clients, timeouts)
+
+    def select(self, instances: list[str] | None) -> list[str]:
+        """
+        Resolve a subset of deployment names (all of them when `instances` is empty).
+
+        Raises:
+            ValueError: If a name is not a configured deployment.
+        """
+        if not instances:
+            return list(self.clients)
+        unknown = [name for name in instances if name not in self.clients]
+        if unknown:
+            raise ValueError(f"Unknown Airflow instances {unknown}; configured: {list(self.clients)}.")
+        return list(dict.fromkeys(instances))
+
+    async def fan_out(self, names: list[str], call: Callable[[str], Awaitable[Any]]) -> dict[str, dict]:
+        """
+        Run `call(name)` for every deployment concurrently.
+
+        Returns:
+            dict: Per deployment, `{"status": "ok", "result": ..., "elapsed_ms": ...}`,
+                `{"status": "error", "error": ...}` or `{"status": "timeout", ...}`.
+        """
+        async def run(name: str) -> dict:
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(call(name), self.timeouts[name])
+            except TimeoutError:
+                return {"status": "timeout", "error": f"No response within {self.timeouts[name]}s."}
+            except Exception as e:
+                return {"status": "error", "error": str(e)}
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            if AirflowClient.is_error(result) and not isinstance(result, str):
+                return {"status": "error", "error": result.get("error", result), "elapsed_ms": elapsed}
+            return {"status": "ok", "result": result, "elapsed_ms": elapsed}
+
+        outcomes = await asyncio.gather(*(run(name) for name in names))
+        return dict(zip(names, outcomes))
+
+    @staticmethod
+    def merge(outcomes: dict[str, dict], key: str, label: str = "value") -> dict:
+        """
+        Merge per-deployment results into one instance-tagged result.
+
+        Lists of records get an `instance` field, lists of plain values become
+        `{"instance": ..., label: value}` records, and `{columns, rows}` tables
+        get a leading `instance` column.
+
+        Returns:
+            dict: `{key: merged, "instances": per-deployment status}`, plus
+                `"partial": True` when some deployments failed or timed out.
+        """
+        merged: list | dict = []
+        instances = {}
+        for name, outcome in outcomes.items():
+            status = {k: v for k, v in outcome.items() if k != "result"}
+            instances[name] = status
+            if outcome["status"] != "ok":
+                continue
+
+            result = outcome["result"]
+            if isinstance(result, str):
+                status["message"] = result
+                continue
+            if isinstance(result, dict) and "columns" in result:
+                if not merged:
+                    merged = {"columns": ["instance"], "rows": []}
+                columns = merged["columns"]
+                # Deployments on different Airflow versions may return different columns.
+                for column in result["columns"]:
+                    if column not in columns:
+                        columns.append(column)
+                        for row in merged["rows"]:
+                            row.append(None)
+                positions = [columns.index(column) for column in result["columns"]]
+                for row in result["rows"]:
+                    aligned = [name] + [None] * (len(columns) - 1)
+                    for position, value in zip(positions, row):
+                        aligned[position] = value
+                    merged["rows"].append(aligned)
+                status["count"] = len(result["rows"])
+                continue
+            if isinstance(result, dict):
+                result = result.get(key, [])
+            merged.extend(
+                {"instance": name, **item} if isinstance(item, dict) else {"instance": name, label: item}
+                for item in result
+            )
+            status["count"] = len(result)
+
+        response = {key: merged, "instances": instances}
+        if any(outcome["status"] != "ok" for outcome in outcomes.values()):
+            response["partial"] = True
+        return response
+
+    async def aclose(self) -> None:
+        for client in self.clients.values():
+            await client.aclose()
@@ -0,0 +1,210 @@
+import asyncio
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator
+
+from services.settings import env_int, env_str
+
+
+class MetadataDB:
+    """
+    Optional read-only access to the Airflow metadata database (Postgres).
+
+    Enabled by setting `_AIRFLOW_METADATA_DB_URI` to a libpq connection string
+    (ideally for a read-only role or replica). Connections come from a thread-safe
+    `psycopg2` pool, every session is opened read-only with a statement timeout,
+    and blocking driver calls run in worker threads so the event loop is never
+    stalled. Large results are streamed through server-side (named) cursors.
+
+    Args:
+        dsn (str): Connection string. Defaults to `_AIRFLOW_METADATA_DB_URI`.
+        pool_size (int): Maximum pooled connections. Defaults to `_AIRFLOW_METADATA_DB_POOL_SIZE`.
+        statement_timeout (int): Per-statement timeout in milliseconds.
+            Defaults to `_AIRFLOW_METADATA_DB_STATEMENT_TIMEOUT`.
+    """
+
+    def __init__(self, dsn: str | None = None, pool_size: int | None = None, statement_timeout: int | None = None):
+        self.dsn = dsn if dsn is not None else env_str("_AIRFLOW_METADATA_DB_URI")
+        self.pool_size = pool_size or env_int("_AIRFLOW_METADATA_DB_POOL_SIZE", 5)
+        self.statement_timeout = statement_timeout or env_int("_AIRFLOW_METADATA_DB_STATEMENT_TIMEOUT", 30000)
+        self._pool = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.dsn)
+
+    def _get_pool(self):
+        if self._pool is None:
+            from psycopg2.pool import ThreadedConnectionPool
+
+            self._pool = ThreadedConnectionPool(
+                1,
+                self.pool_size,
+                self.dsn,
+                options=f"-c statement_timeout={self.statement_timeout}",
+                application_name="airflow-mcp-server",
+            )
+        return self._pool
+
+    @contextmanager
+    def _connection(self):
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            conn.set_session(readonly=True)
+            yield conn
+        finally:
+            conn.rollback()
+            pool.putconn(conn)
+
+    async def fetch(self, sql: str, params: dict | None = None) -> list[dict]:
+        """Run a (small) query and return its rows as dictionaries."""
+
+        def run():
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                columns = [column.name for column in cursor.description]
+                return [self._row(columns, row) for row in cursor.fetchall()]
+
+        return await asyncio.to_thread(run)
+
+    async def stream(self, sql: str, params: dict | None = None, batch_size: int = 2000) -> AsyncIterator[dict]:
+        """
+        Stream rows of a large query through a server-side cursor.
+
+        Only `batch_size` rows are transferred and held in memory at a time.
+        """
+        connection = self._connection()
+        conn = await asyncio.to_thread(connection.__enter__)
+        try:
+            cursor = conn.cursor(name="mcp_stream")
+            cursor.itersize = batch_size
+            await asyncio.to_thread(cursor.execute, sql, params)
+
+            columns = None
+            while True:
+                rows = await asyncio.to_thread(cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                columns = columns or [column.name for column in cursor.description]
+                for row in rows:
+                    yield self._row(columns, row)
+
+            await asyncio.to_thread(cursor.close)
+        finally:
+            await asyncio.to_thread(connection.__exit__, None, None, None)
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.closeall)
+
+    @staticmethod
+    def _row(columns: list[str], row: tuple) -> dict:
+        def convert(value):
+            if isinstance(value, datetime):
+                return value.isoformat()
+            if isinstance(value, Decimal):
+                return float(value)
+            return value
+
+        return {column: convert(value) for column, value in zip(columns, row)}
+
+    @staticmethod
+    def warn_fallback(error: Exception) -> None:
+        print(f"Metadata DB query failed, falling back to REST: {error}", file=sys.stderr)
+
+    # ------------------------- Airflow schema queries ------------------------- #
+    @staticmethod
+    def _filters(table: str, dag_ids=None, states=None, start_date_gte=None, start_date_lte=None) -> tuple[str, dict]:
+        clauses, params = [], {}
+        if dag_ids:
+            clauses.append(f"{table}.dag_id = ANY(%(dag_ids)s)")
+            params["dag_ids"] = list(dag_ids)
+        if states:
+            clauses.append(f"{table}.state = ANY(%(states)s)")
+            params["states"] = list(states)
+        if start_date_gte:
+            clauses.append(f"{table}.start_date >= %(start_date_gte)s")
+            params["start_date_gte"] = start_date_gte
+        if start_date_lte:
+            clauses.append(f"{table}.start_date <= %(start_date_lte)s")
+            params["start_date_lte"] = start_date_lte
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    async def task_instance_summary(self, **filters) -> list[dict]:
+        """Count task instances per DAG and state, with average and maximum duration in seconds."""
+        where, params = self._filters("ti", **filters)
+        sql = (
+            "SELECT ti.dag_id, ti.state, COUNT(*) AS count, "
+            "AVG(ti.duration) AS avg_duration, MAX(ti.duration) AS max_duration "
+            f"FROM task_instance ti{where} "
+            "GROUP BY ti.dag_id, ti.state ORDER BY count DESC"
+        )
+        return await self.fetch(sql, params)
+
+    def task_instances(self, limit: int, **filters) -> AsyncIterator[dict]:
+        """Stream task instances, newest first, using REST field names."""
+        where, params = self._filters("ti", **filters)
+        params["limit"] = limit
+        sql = (
+            "SELECT ti.dag_id, ti.run_id AS dag_run_id, ti.task_id, ti.map_index, ti.state, "
+            "ti.try_number, ti.start_date, ti.end_date, ti.duration, ti.operator, ti.hostname "
+            f"FROM task_instance ti{where} "
+            "ORDER BY ti.start_date DESC NULLS LAST LIMIT %(limit)s"
+        )
+        return self.stream(sql, params)
+
+    async def dag_run_summary(self, **filters) -> list[dict]:
+        """Count DAG runs per DAG and state, with average and maximum duration in seconds."""
+        where, params = self._filters("dr", **filters)
+        sql = (
+            "SELECT dr.dag_id, dr.state, COUNT(*) AS count, "
+            "AVG(EXTRACT(EPOCH FROM dr.end_date - dr.start_date)) AS avg_duration, "
+            "MAX(EXTRACT(EPOCH FROM dr.end_date - dr.start_date)) AS max_duration "
+            f"FROM dag_run dr{where} "
+            "GROUP BY dr.dag_id, dr.state ORDER BY count DESC"
+        )
+        return await self.fetch(sql, params)
+
+    def dag_run_timings(self, **filters) -> AsyncIterator[dict]:
+        """Stream every DAG run's dag_id, dag_run_id, state, start (epoch seconds) and duration (seconds)."""
+        where, params = self._filters("dr", **filters)
+        sql = (
+            "SELECT dr.dag_id, dr.run_id AS dag_run_id, dr.state, EXTRACT(EPOCH FROM dr.start_date) AS start, "
+            "EXTRACT(EPOCH FROM dr.end_date - dr.start_date) AS duration "
+            f"FROM dag_run dr{where}"
+        )
+        return self.stream(sql, params)
+
+
+async def summarize(rows: AsyncIterator[dict], duration=lambda row: row.get("duration")) -> list[dict]:
+    """
+    Build the same per-DAG, per-state summary as the SQL queries from streamed REST rows.
+
+    Used by the REST fallback; only one running total per (dag_id, state) is kept.
+    """
+    groups: dict[tuple, list] = {}
+    async for row in rows:
+        group = groups.setdefault((row.get("dag_id"), row.get("state")), [0, 0.0, 0, None])
+        group[0] += 1
+        seconds = duration(row)
+        if seconds is not None:
+            group[1] += seconds
+            group[2] += 1
+            group[3] = seconds if group[3] is None else max(group[3], seconds)
+
+    summary = [
+        {
+            "dag_id": dag_id,
+            "state": state,
+            "count": count,
+            "avg_duration": total / timed if timed else None,
+            "max_duration": longest,
+        }
+        for (dag_id, state), (count, total, timed, longest) in groups.items()
+    ]
+    return sorted(summary, key=lambda row: row["count"], reverse=True)
@@ -0,0 +1,267 @@
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from services.settings import env_bool
+
+# Upper bounds (seconds) of the latency histogram buckets; the last one is +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+# Per-tool-call scope, so upstream requests made anywhere below a tool are attributed to it.
+_current_tool: ContextVar[dict | None] = ContextVar("current_tool", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with Prometheus semantics and estimated quantiles."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the `q` quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index]
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return LATENCY_BUCKETS[-2]
+
+    def summary(self) -> dict:
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+class Metrics:
+    """
+    In-process instrumentation of tool calls and upstream Airflow requests.
+
+    Records, per tool, call counts, errors, a latency histogram and the number
+    of upstream requests the calls caused; and per upstream endpoint, request
+    counts, a latency histogram, bytes sent and received and status codes.
+    Snapshots feed the `server_stats` tool and resource, and `prometheus()`
+    renders the same data in the Prometheus text format for `/metrics`.
+
+    When the `opentelemetry-api` package is installed, every tool call also
+    opens a span and every upstream request a child span of it.
+
+    Args:
+        enabled (bool): Record metrics. Defaults to `_MCP_METRICS_ENABLED`.
+        tracing (bool): Emit OpenTelemetry spans when available. Defaults to `_MCP_OTEL_ENABLED`.
+    """
+
+    def __init__(self, enabled: bool | None = None, tracing: bool | None = None):
+        self.enabled = enabled if enabled is not None else env_bool("_MCP_METRICS_ENABLED", True)
+        self.tracer = None
+        if tracing if tracing is not None else env_bool("_MCP_OTEL_ENABLED", True):
+            self.tracer = self._get_tracer()
+
+        self.tools: dict[str, dict] = {}
+        self.upstream: dict[str, dict] = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _get_tracer():
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            return None
+        return trace.get_tracer("airflow-mcp-server")
+
+    def _span(self, name: str, kind: str = "INTERNAL", **attributes):
+        if self.tracer is None:
+            return nullcontext()
+        from opentelemetry.trace import SpanKind
+
+        return self.tracer.start_as_current_span(name, kind=getattr(SpanKind, kind), attributes=attributes)
+
+    # ------------------------------ Recording ------------------------------ #
+    @contextmanager
+    def tool_call(self, name: str):
+        """
+        Time one tool call. The yielded dict counts the call's upstream requests;
+        set its `error` key when the tool returned an error response.
+        """
+        scope = {"upstream": 0, "error": False}
+        token = _current_tool.set(scope)
+        start = time.perf_counter()
+        try:
+            with self._span(f"tool {name}", **{"mcp.tool.name": name}):
+                yield scope
+        except BaseException:
+            scope["error"] = True
+            raise
+        finally:
+            _current_tool.reset(token)
+            if self.enabled:
+                stats = self.tools.get(name)
+                if stats is None:
+                    stats = self.tools[name] = {"calls": 0, "errors": 0, "upstream_requests": 0, "latency": Histogram()}
+                stats["calls"] += 1
+                stats["errors"] += scope["error"]
+                stats["upstream_requests"] += scope["upstream"]
+                stats["latency"].observe(time.perf_counter() - start)
+
+    @contextmanager
+    def upstream_call(self, method: str, label: str, url: str):
+        """
+        Time one upstream HTTP request. Set the yielded dict's `response` key to
+        the `httpx.Response` so its status and size are recorded.
+        """
+        call = {"response": None}
+        scope = _current_tool.get()
+        if scope is not None:
+            scope["upstream"] += 1
+
+        start = time.perf_counter()
+        status = None
+        try:
+            with self._span(f"{method} {label}", kind="CLIENT", **{"http.request.method": method, "url.full": url}) as span:
+                yield call
+                response = call["response"]
+                if response is not None:
+                    status = str(response.status_code)
+                    if span is not None:
+                        span.set_attribute("http.response.status_code", response.status_code)
+        except BaseException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            if self.enabled:
+                self._observe_upstream(f"{method} {label}", status or "unknown", time.perf_counter() - start, call["response"])
+
+    def _observe_upstream(self, key: str, status: str, seconds: float, response) -> None:
+        stats = self.upstream.get(key)
+        if stats is None:
+            stats = self.upstream[key] = {
+                "requests": 0, "bytes_out": 0, "bytes_in": 0, "statuses": Counter(), "latency": Histogram()
+            }
+        stats["requests"] += 1
+        stats["statuses"][status] += 1
+        stats["latency"].observe(seconds)
+        if response is not None:
+            stats["bytes_out"] += len(response.request.content or b"")
+            stats["bytes_in"] += len(response.content)
+
+    @staticmethod
+    def log_exception(error: Exception) -> None:
+        # stdout carries the MCP stdio protocol, so diagnostics go to stderr.
+        print(f"Exception during Airflow API request: {error}", file=sys.stderr)
+
+    # ------------------------------ Reporting ------------------------------ #
+    def snapshot(self) -> dict:
+        """Per-tool and per-endpoint statistics with latency percentiles in milliseconds."""
+        tools = {}
+        for name, stats in sorted(self.tools.items()):
+            tools[name] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "upstream_requests_per_call": round(stats["upstream_requests"] / stats["calls"], 2),
+                **stats["latency"].summary(),
+            }
+
+        upstream = {}
+        for key, stats in sorted(self.upstream.items()):
+            upstream[key] = {
+                "requests": stats["requests"],
+                "bytes_out": stats["bytes_out"],
+                "bytes_in": stats["bytes_in"],
+                "statuses": dict(stats["statuses"]),
+                **stats["latency"].summary(),
+            }
+
+        return {"uptime_seconds": round(time.time() - self.started_at, 1), "tools": tools, "upstream": upstream}
+
+    def prometheus(self, cache: dict | None = None, endpoints: dict | None = None, counters: dict | None = None) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            cache (dict): `ResponseCache.stats()`.
+            endpoints (dict): Retry/hedge/deadline events per endpoint (`AirflowClient.endpoint_stats`).
+            counters (dict): Other client counters, e.g. coalesced requests.
+        """
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict, float]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                rendered = ",".join(f'{key}="{self._escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+
+        def histogram(name: str, help_text: str, series: list[tuple[dict, Histogram]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in series:
+                base = ",".join(f'{key}="{self._escape(val)}"' for key, val in labels.items())
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{base},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{base}}} {hist.sum}")
+                lines.append(f"{name}_count{{{base}}} {hist.count}")
+
+        tools = sorted(self.tools.items())
+        metric("airflow_mcp_tool_calls_total", "counter", "Tool calls.", [({"tool": n}, s["calls"]) for n, s in tools])
+        metric("airflow_mcp_tool_errors_total", "counter", "Tool calls that failed or returned an error.",
+               [({"tool": n}, s["errors"]) for n, s in tools])
+        metric("airflow_mcp_tool_upstream_requests_total", "counter", "Upstream requests made by tool calls.",
+               [({"tool": n}, s["upstream_requests"]) for n, s in tools])
+        histogram("airflow_mcp_tool_duration_seconds", "Tool call latency.", [({"tool": n}, s["latency"]) for n, s in tools])
+
+        upstream = []
+        for key, stats in sorted(self.upstream.items()):
+            method, endpoint = key.split(" ", 1)
+            upstream.append(({"method": method, "endpoint": endpoint}, stats))
+        metric("airflow_mcp_upstream_responses_total", "counter", "Upstream responses by status (or exception).",
+               [({**labels, "status": status}, count) for labels, s in upstream for status, count in sorted(s["statuses"].items())])
+        metric("airflow_mcp_upstream_sent_bytes_total", "counter", "Request body bytes sent upstream.",
+               [(labels, s["bytes_out"]) for labels, s in upstream])
+        metric("airflow_mcp_upstream_received_bytes_total", "counter", "Response body bytes received from upstream.",
+               [(labels, s["bytes_in"]) for labels, s in upstream])
+        histogram("airflow_mcp_upstream_duration_seconds", "Upstream request latency.",
+                  [(labels, s["latency"]) for labels, s in upstream])
+
+        if cache:
+            for name in ("hits", "misses", "stale", "revalidated", "evictions", "invalidations"):
+                metric(f"airflow_mcp_cache_{name}_total", "counter", f"Response cache {name}.", [({}, cache.get(name, 0))])
+            metric("airflow_mcp_cache_bytes", "gauge", "Bytes held by the response cache.", [({}, cache.get("bytes", 0))])
+        for event in ("retries", "hedges", "hedge_wins", "deadline_exceeded"):
+            metric(f"airflow_mcp_upstream_{event}_total", "counter", f"Upstream {event.replace('_', ' ')}.",
+                   [({"endpoint": label}, stats.get(event, 0)) for label, stats in sorted((endpoints or {}).items())])
+        for name, value in sorted((counters or {}).items()):
+            metric(f"airflow_mcp_{name}_total", "counter", name.replace("_", " ").capitalize() + ".", [({}, value)])
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
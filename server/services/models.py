@@ -0,0 +1,159 @@
+from dataclasses import dataclass, make_dataclass
+from functools import cache
+from typing import Any
+
+from pydantic import TypeAdapter
+from pydantic_core import from_json
+
+# Typed records for large Airflow listings. They are `__slots__` dataclasses
+# validated by pydantic-core straight from the response bytes: fields that are
+# not declared here are skipped while parsing, and no intermediate dict is built
+# per item. Only the fields the tools use are declared, since every extra
+# (especially nested) field costs decode time and memory. Timestamps stay
+# ISO 8601 strings. Because undeclared fields are dropped, these records are
+# for internal aggregation (catalog, summaries, planners, statistics) only:
+# tools that return listings to the user keep the full upstream records.
+
+
+@dataclass(slots=True)
+class Dag:
+    dag_id: str
+    dag_display_name: str | None = None
+    is_paused: bool | None = None
+    is_stale: bool | None = None
+    last_parsed_time: str | None = None
+    fileloc: str | None = None
+    relative_fileloc: str | None = None
+    bundle_name: str | None = None
+    description: str | None = None
+    timetable_summary: str | None = None
+    tags: list[Any] | None = None
+    owners: list[str] | None = None
+    max_active_runs: int | None = None
+    max_active_tasks: int | None = None
+    has_import_errors: bool | None = None
+    next_dagrun_logical_date: str | None = None
+    next_dagrun_run_after: str | None = None
+
+
+@dataclass(slots=True)
+class DagRun:
+    dag_run_id: str
+    dag_id: str
+    state: str | None = None
+    run_type: str | None = None
+    triggered_by: str | None = None
+    logical_date: str | None = None
+    queued_at: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+    run_after: str | None = None
+    conf: dict[str, Any] | None = None
+    note: str | None = None
+
+
+@dataclass(slots=True)
+class DagRunTiming:
+    dag_id: str
+    dag_run_id: str | None = None
+    state: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+
+
+@dataclass(slots=True)
+class TaskInstance:
+    task_id: str
+    dag_id: str
+    dag_run_id: str
+    map_index: int = -1
+    state: str | None = None
+    try_number: int | None = None
+    max_tries: int | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+    duration: float | None = None
+    queued_when: str | None = None
+    operator: str | None = None
+    hostname: str | None = None
+    pool: str | None = None
+    queue: str | None = None
+    executor: str | None = None
+    note: str | None = None
+    rendered_map_index: str | None = None
+
+
+@dataclass(slots=True)
+class Asset:
+    id: int
+    name: str
+    uri: str | None = None
+    group: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
+
+
+@dataclass(slots=True)
+class DagReference:
+    dag_id: str
+
+
+@dataclass(slots=True)
+class TaskReference:
+    dag_id: str
+    task_id: str | None = None
+
+
+@dataclass(slots=True)
+class AssetLinks:
+    name: str
+    uri: str | None = None
+    scheduled_dags: list[DagReference] | None = None
+    producing_tasks: list[TaskReference] | None = None
+    consuming_tasks: list[TaskReference] | None = None
+
+
+@dataclass(slots=True)
+class Connection:
+    connection_id: str
+    conn_type: str
+    description: str | None = None
+    host: str | None = None
+    login: str | None = None
+    schema: str | None = None
+    port: int | None = None
+    password: str | None = None
+    extra: str | None = None
+
+
+def loads(content: bytes) -> Any:
+    """Decode a JSON body into plain Python objects with pydantic-core's parser."""
+    return from_json(content)
+
+
+@cache
+def _page_adapter(model: type, key: str) -> TypeAdapter:
+    page = make_dataclass(
+        f"{model.__name__}Page",
+        [(key, list[model]), ("total_entries", int | None, None)],
+        slots=True,
+    )
+    return TypeAdapter(page)
+
+
+def decode_page(content: bytes, model: type, key: str) -> dict:
+    """
+    Decode one page of a list endpoint into `model` records.
+
+    Returns:
+        dict: `{key: [records], "total_entries": n}`, the same shape as the raw page.
+    """
+    page = _page_adapter(model, key).validate_json(content)
+    return {key: getattr(page, key), "total_entries": page.total_entries}
+
+
+def to_dict(record) -> dict:
+    """Return a record's fields as a (shallow) dict; dicts pass through unchanged."""
+    if isinstance(record, dict):
+        return record
+    return {field: getattr(record, field) for field in record.__slots__}
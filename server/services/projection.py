@@ -0,0 +1,88 @@
+from services.models import to_dict
+
+# Airflow's REST API v2 has no response-field selector, so projections are
+# applied to the decoded response before it is serialized to the MCP client.
+# Fields are dotted paths ("owners", "dag_versions.version_number"); a path
+# through a list applies to every element.
+OUTPUT_FORMATS = ("json", "table")
+
+
+def _tree(fields: list[str]) -> dict:
+    tree: dict = {}
+    for field in fields:
+        node = tree
+        for part in field.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _select(value, tree: dict):
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_select(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _select(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def project(data, fields: list[str] | None):
+    """
+    Keep only `fields` of a record, or of every record in a list.
+
+    Unknown fields are ignored, so one field list can be used across records
+    of different shapes. With no `fields` the data is returned unchanged.
+    """
+    if not fields:
+        return data
+    return _select(data, _tree(fields))
+
+
+def tabulate(records: list[dict], fields: list[str] | None = None) -> dict:
+    """
+    Convert a list of records into `{"columns": [...], "rows": [[...], ...]}`.
+
+    Column names are written once instead of once per record, which roughly
+    halves the size of typical Airflow listings. Columns are `fields` if given,
+    otherwise every top-level key in order of first appearance.
+    """
+    if fields:
+        records = project(records, fields)
+        columns = [field.split(".")[0] for field in fields]
+        columns = list(dict.fromkeys(columns))
+    else:
+        columns = list(dict.fromkeys(key for record in records for key in record))
+
+    return {"columns": columns, "rows": [[record.get(column) for column in columns] for record in records]}
+
+
+def shape(response, fields: list[str] | None = None, output_format: str = "json", key: str | None = None):
+    """
+    Apply `fields` and `output_format` to a tool response.
+
+    Args:
+        response: A record, a list of records (dicts or `services.models` records),
+            or a paginated listing (a dict holding the records under `key`).
+            Error responses pass through unchanged.
+        fields (list[str]): Dotted field paths to keep.
+        output_format (str): "json" (default) or "table" for `tabulate`d lists.
+        key (str): Key of the records in a listing, e.g. "connections".
+
+    Returns:
+        The shaped response, or an error dict for an unknown `output_format`.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return {"error": f"Unknown output_format '{output_format}', expected one of {', '.join(OUTPUT_FORMATS)}."}
+    if isinstance(response, dict) and ("error" in response or (key and key not in response)):
+        return response
+
+    records = response[key] if key else response
+    if isinstance(records, list):
+        # Typed records from `services.models` are shaped like their dict form.
+        records = [to_dict(record) for record in records]
+    if output_format == "table" and isinstance(records, list):
+        records = tabulate(records, fields)
+    else:
+        records = project(records, fields)
+
+    return {**response, key: records} if key else records
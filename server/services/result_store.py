@@ -0,0 +1,167 @@
+import secrets
+import time
+from collections import OrderedDict
+
+from pydantic_core import to_json
+
+from services.settings import env_float, env_int
+
+
+class StoredResult:
+    """The records of one oversized tool result, plus the rest of its response."""
+
+    __slots__ = ("envelope", "key", "columns", "items", "page_items", "size", "expires_at")
+
+    def __init__(self, envelope: dict, key: str, columns: list | None, items: list, page_items: int, size: int, ttl: float):
+        self.envelope = envelope
+        self.key = key
+        self.columns = columns
+        self.items = items
+        self.page_items = page_items
+        self.size = size
+        self.expires_at = time.monotonic() + ttl
+
+
+class ResultStore:
+    """
+    Bounded, expiring in-memory store that pages oversized tool results.
+
+    A result whose JSON is larger than `page_bytes` is kept here and only its
+    first page is returned, with an opaque `next_cursor`; `fetch_more` serves
+    the following pages from memory, so Airflow is never queried again for
+    them. The paged part is the largest list in the result: a list under a key
+    such as `dag_runs`, or the `rows` of a table. A bare list is always
+    returned as `{"items": [...]}`, paged or not, so its shape does not depend
+    on its size.
+
+    The result is encoded once, the way FastMCP would encode it; when it fits,
+    that JSON text is returned so it is not encoded a second time.
+
+    Result sets expire after `ttl` seconds, and the oldest are evicted to make
+    room for a new one so their total size stays within `max_bytes`. A result
+    larger than `max_bytes` can never be stored and is answered with an error
+    rather than with partial data.
+
+    Args:
+        page_bytes (int): Largest response returned whole, and the target page size.
+            Defaults to `_MCP_RESULT_PAGE_BYTES`.
+        max_bytes (int): Upper bound on stored result bytes. Defaults to `_MCP_RESULT_STORE_MAX_BYTES`.
+        ttl (float): Seconds a result set can be paged through. Defaults to `_MCP_RESULT_TTL`.
+    """
+
+    def __init__(self, page_bytes: int | None = None, max_bytes: int | None = None, ttl: float | None = None):
+        self.page_bytes = page_bytes or env_int("_MCP_RESULT_PAGE_BYTES", 64 * 1024)
+        self.max_bytes = max_bytes or env_int("_MCP_RESULT_STORE_MAX_BYTES", 64 * 1024 * 1024)
+        self.ttl = ttl or env_float("_MCP_RESULT_TTL", 600.0)
+
+        self._results: OrderedDict[str, StoredResult] = OrderedDict()
+        self._bytes = 0
+        self.counters = {"stored": 0, "pages_served": 0, "evictions": 0, "expired": 0, "too_large": 0}
+
+    @staticmethod
+    def _locate(result: dict) -> tuple[str, list | None, list] | None:
+        """Find the list to page: `(key, table columns, items)`, or None if there is none."""
+        found = None
+        for key, value in result.items():
+            if isinstance(value, dict) and isinstance(value.get("rows"), list) and "columns" in value:
+                candidate = (key, value["columns"], value["rows"])
+            elif isinstance(value, list):
+                candidate = (key, None, value)
+            else:
+                continue
+            if found is None or len(candidate[2]) > len(found[2]):
+                found = candidate
+        return found
+
+    def page(self, result):
+        """
+        Return `result` whole when it is small enough, else its first page.
+
+        Error responses and results without a list to split are never paged and
+        are returned unchanged; a result that fits is returned as its JSON text.
+        """
+        if isinstance(result, list):
+            # FastMCP would send every item of a bare list as its own content block.
+            result = {"items": result}
+        if not isinstance(result, dict) or "error" in result:
+            return result
+        located = self._locate(result)
+        if located is None or len(located[2]) < 2:
+            return result
+
+        # Encoded as FastMCP encodes tool results, so the size is what would be sent.
+        encoded = to_json(result, fallback=str, indent=2)
+        size = len(encoded)
+        if size <= self.page_bytes:
+            return encoded.decode()
+
+        if size > self.max_bytes:
+            self.counters["too_large"] += 1
+            return {
+                "error": f"The result is {size} bytes, more than the {self.max_bytes} bytes that can be paged "
+                "(_MCP_RESULT_STORE_MAX_BYTES). Narrow it with filters or `fields`."
+            }
+
+        key, columns, items = located
+        envelope = {k: v for k, v in result.items() if k != key}
+        page_items = max(1, len(items) * self.page_bytes // size)
+        stored = StoredResult(envelope, key, columns, items, page_items, size, self.ttl)
+
+        self._purge()
+        while self._results and self._bytes + size > self.max_bytes:
+            _, evicted = self._results.popitem(last=False)
+            self._bytes -= evicted.size
+            self.counters["evictions"] += 1
+
+        result_id = secrets.token_urlsafe(16)
+        self._results[result_id] = stored
+        self._bytes += size
+        self.counters["stored"] += 1
+        return self._render(stored, 0, result_id)
+
+    def fetch(self, cursor: str) -> dict:
+        """
+        Serve the page a cursor points to.
+
+        Returns:
+            dict: The page in the shape of the original result, with `page` info
+                and `next_cursor` (None on the last page), or an error if the
+                cursor is malformed or its result set has expired.
+        """
+        result_id, _, offset = cursor.rpartition(".")
+        if not result_id or not offset.isdigit():
+            return {"error": "Invalid cursor."}
+
+        self._purge()
+        stored = self._results.get(result_id)
+        if stored is None:
+            return {"error": "Cursor expired or its result was evicted; run the original tool again."}
+        if int(offset) >= len(stored.items):
+            return {"error": "Cursor is past the end of the result."}
+
+        self.counters["pages_served"] += 1
+        return self._render(stored, int(offset), result_id)
+
+    def _render(self, stored: StoredResult, offset: int, result_id: str | None) -> dict:
+        items = stored.items[offset:offset + stored.page_items]
+        end = offset + len(items)
+        page = {"offset": offset, "returned": len(items), "total": len(stored.items)}
+        next_cursor = f"{result_id}.{end}" if result_id and end < len(stored.items) else None
+
+        if stored.columns is not None:
+            items = {"columns": stored.columns, "rows": items}
+        return {**stored.envelope, stored.key: items, "page": page, "next_cursor": next_cursor}
+
+    def _purge(self) -> None:
+        """Drop expired result sets; they all share one TTL, so the oldest expire first."""
+        now = time.monotonic()
+        while self._results:
+            result_id, stored = next(iter(self._results.items()))
+            if stored.expires_at > now:
+                break
+            del self._results[result_id]
+            self._bytes -= stored.size
+            self.counters["expired"] += 1
+
+    def stats(self) -> dict:
+        return {"results": len(self._results), "bytes": self._bytes, "max_bytes": self.max_bytes, **self.counters}
@@ -0,0 +1,163 @@
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from heapq import nlargest
+from itertools import compress, repeat
+from math import fsum, isfinite, nan, sqrt
+from operator import gt, mul, sub
+
+from services.stats import percentile, rounded
+
+# State codes of the `states` column; any other state is stored as OTHER.
+STATES = ("success", "failed", "running", "queued")
+SUCCESS, FAILED, OTHER = 0, 1, len(STATES)
+_STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# Modified z-score above which a run counts as a MAD anomaly (Iglewicz and Hoaglin).
+MAD_THRESHOLD = 3.5
+
+SECONDS_PER_DAY = 86400.0
+
+
+class RunHistory:
+    """
+    The run history of one DAG as parallel typed arrays, one slot per run.
+
+    `starts` holds epoch seconds and `durations` seconds (NaN for runs that
+    have not started or finished); `states` holds one byte per run. Only
+    `run_ids`, kept so anomalies can name their runs, holds an object per
+    run: the run ID string already decoded from the response or row.
+    """
+
+    __slots__ = ("starts", "durations", "states", "run_ids")
+
+    def __init__(self):
+        self.starts = array("d")
+        self.durations = array("d")
+        self.states = array("B")
+        self.run_ids: list[str | None] = []
+
+    def append(self, state: str | None, start: float | None, duration: float | None, run_id: str | None = None) -> None:
+        self.starts.append(nan if start is None else start)
+        self.durations.append(nan if duration is None else duration)
+        self.states.append(_STATE_CODES.get(state, OTHER))
+        self.run_ids.append(run_id)
+
+
+class RunHistories:
+    """`RunHistory` per DAG, filled from streamed REST records or metadata DB rows."""
+
+    def __init__(self):
+        self.dags: dict[str, RunHistory] = {}
+
+    def history(self, dag_id: str) -> RunHistory:
+        history = self.dags.get(dag_id)
+        if history is None:
+            history = self.dags[dag_id] = RunHistory()
+        return history
+
+    def add_record(self, dag_run) -> None:
+        """Add a `DagRunTiming` from the REST API."""
+        start = datetime.fromisoformat(dag_run.start_date).timestamp() if dag_run.start_date else None
+        duration = None
+        if start is not None and dag_run.end_date:
+            duration = datetime.fromisoformat(dag_run.end_date).timestamp() - start
+        self.history(dag_run.dag_id).append(dag_run.state, start, duration, dag_run.dag_run_id)
+
+    def add_row(self, row: dict) -> None:
+        """Add a `MetadataDB.dag_run_timings` row."""
+        self.history(row["dag_id"]).append(row["state"], row["start"], row["duration"], row["dag_run_id"])
+
+    def __len__(self) -> int:
+        return sum(len(history.states) for history in self.dags.values())
+
+
+def summarize_history(dag_id: str, history: RunHistory, z_threshold: float = 3.0, max_anomalies: int = 5) -> dict:
+    """
+    Summarize one DAG's run durations, failure rate, trend and anomalies.
+
+    Every statistic is computed with whole-column operations (`compress`,
+    `map` over `operator` functions, `fsum`, one sort), so the per-run work
+    runs in C and no per-run object is built.
+
+    - `trend_seconds_per_day` is the least-squares slope of duration against
+      start time; `trend_pct_per_week` is the same slope relative to the mean.
+    - `zscore_anomalies` counts runs more than `z_threshold` standard deviations
+      from the mean; `mad_anomalies` counts runs whose modified z-score
+      (0.6745 * deviation from the median / MAD) exceeds 3.5, which is robust
+      to the outliers themselves.
+    - `anomalies` lists the most anomalous runs, with their `dag_run_id`, by
+      modified z-score (by z-score when the MAD is zero).
+
+    Returns:
+        dict: A flat summary, so that a list of them can be tabulated.
+    """
+    counts = Counter(history.states)
+    finished = counts[SUCCESS] + counts[FAILED]
+
+    timed = list(map(isfinite, history.durations))
+    durations = array("d", compress(history.durations, timed))
+    starts = array("d", compress(history.starts, timed))
+    n = len(durations)
+
+    summary = {
+        "dag_id": dag_id,
+        "runs": len(history.states),
+        "succeeded": counts[SUCCESS],
+        "failed": counts[FAILED],
+        "failure_rate": rounded(counts[FAILED] / finished, 4) if finished else None,
+        "timed_runs": n,
+    }
+    if not n:
+        return summary
+
+    ordered = sorted(durations)
+    mean = fsum(durations) / n
+    deviations = array("d", map(sub, durations, repeat(mean)))
+    std = sqrt(fsum(map(mul, deviations, deviations)) / n)
+
+    slope = None
+    if n > 1:
+        x_mean = fsum(starts) / n
+        x_deviations = array("d", map(sub, starts, repeat(x_mean)))
+        x_variance = fsum(map(mul, x_deviations, x_deviations))
+        if x_variance:
+            slope = fsum(map(mul, x_deviations, deviations)) / x_variance * SECONDS_PER_DAY
+
+    median = percentile(ordered, 0.5)
+    absolute = sorted(map(abs, map(sub, durations, repeat(median))))
+    mad = percentile(absolute, 0.5)
+
+    z_scores = array("d", map(mul, deviations, repeat(1 / std))) if std else None
+    robust = array("d", map(mul, map(sub, durations, repeat(median)), repeat(0.6745 / mad))) if mad else None
+
+    summary.update({
+        "duration_mean": rounded(mean, 1),
+        "duration_std": rounded(std, 1),
+        "duration_p50": rounded(median, 1),
+        "duration_p90": rounded(percentile(ordered, 0.9), 1),
+        "duration_p95": rounded(percentile(ordered, 0.95), 1),
+        "duration_p99": rounded(percentile(ordered, 0.99), 1),
+        "duration_max": rounded(ordered[-1], 1),
+        "trend_seconds_per_day": rounded(slope, 2),
+        "trend_pct_per_week": rounded(slope * 7 / mean * 100, 2) if slope is not None and mean else None,
+        "zscore_anomalies": sum(map(gt, map(abs, z_scores), repeat(z_threshold))) if z_scores else 0,
+        "mad_anomalies": sum(map(gt, map(abs, robust), repeat(MAD_THRESHOLD))) if robust else 0,
+    })
+
+    scores, threshold = (robust, MAD_THRESHOLD) if robust else (z_scores, z_threshold)
+    anomalies = []
+    if scores:
+        run_ids = list(compress(history.run_ids, timed))
+        for index in nlargest(max_anomalies, range(n), key=lambda i: abs(scores[i])):
+            if abs(scores[index]) <= threshold:
+                break
+            anomalies.append({
+                "dag_run_id": run_ids[index],
+                "start_date": datetime.fromtimestamp(starts[index], timezone.utc).isoformat(),
+                "duration": rounded(durations[index], 1),
+                "z_score": rounded(z_scores[index], 2) if z_scores else None,
+                "mad_score": rounded(robust[index], 2) if robust else None,
+            })
+    summary["anomalies"] = anomalies
+    return summary
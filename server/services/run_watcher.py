@@ -0,0 +1,244 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from services.airflow_client import AirflowAPIError
+from services.settings import env_float, env_int
+
+TERMINAL_RUN_STATES = {"success", "failed"}
+
+
+class WatchState:
+    """Delta-polling state of one watched DAG: the `updated_at_gte` cursor and the last seen states."""
+
+    __slots__ = ("cursor", "runs", "task_instances", "used_at")
+
+    def __init__(self, cursor: datetime):
+        self.cursor = cursor
+        self.runs: dict[str, str] = {}
+        self.task_instances: dict[tuple, str] = {}
+        self.used_at = time.monotonic()
+
+    @property
+    def active_runs(self) -> int:
+        return sum(1 for state in self.runs.values() if state not in TERMINAL_RUN_STATES)
+
+
+class RunWatcher:
+    """
+    Follows DAG runs by polling only what changed since the previous poll.
+
+    Every watched DAG keeps an `updated_at_gte` cursor, so each poll downloads
+    just the runs and task instances updated since the last one instead of the
+    whole run history. Run and task payloads carry no `updated_at`, so the
+    cursor is the time the previous poll started, minus a small overlap for
+    clock skew; the overlap is deduplicated against the last seen states.
+
+    Cursors are kept per MCP session, so agents watching the same DAG do not
+    consume each other's deltas. A DAG not watched for `idle_ttl` seconds, or
+    the least recently watched beyond `max_dags` per session, is forgotten; a
+    later watch of it starts over from `lookback`.
+
+    Args:
+        client: The shared `AirflowClient`.
+        min_interval (float): First and fastest poll interval. Defaults to `_AIRFLOW_WATCH_MIN_INTERVAL`.
+        max_interval (float): Slowest poll interval after repeated empty polls.
+            Defaults to `_AIRFLOW_WATCH_MAX_INTERVAL`.
+        lookback (float): Seconds of history reported by the first poll of a DAG.
+            Defaults to `_AIRFLOW_WATCH_LOOKBACK`.
+        idle_ttl (float): Seconds a DAG's watch state is kept after its last watch.
+            Defaults to `_AIRFLOW_WATCH_IDLE_TTL`.
+        max_dags (int): Watch states kept per session. Defaults to `_AIRFLOW_WATCH_MAX_DAGS`.
+    """
+
+    OVERLAP = timedelta(seconds=5)
+
+    def __init__(
+        self,
+        client,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        lookback: float | None = None,
+        idle_ttl: float | None = None,
+        max_dags: int | None = None,
+    ):
+        self.client = client
+        self.min_interval = min_interval or env_float("_AIRFLOW_WATCH_MIN_INTERVAL", 2.0)
+        self.max_interval = max_interval or env_float("_AIRFLOW_WATCH_MAX_INTERVAL", 30.0)
+        self.lookback = lookback or env_float("_AIRFLOW_WATCH_LOOKBACK", 900.0)
+        self.idle_ttl = idle_ttl or env_float("_AIRFLOW_WATCH_IDLE_TTL", 3600.0)
+        self.max_dags = max(1, max_dags or env_int("_AIRFLOW_WATCH_MAX_DAGS", 1000))
+
+        self._sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._default: OrderedDict[str, WatchState] = OrderedDict()
+
+    def _states(self, session) -> OrderedDict[str, WatchState]:
+        if session is None:
+            return self._default
+        return self._sessions.setdefault(session, OrderedDict())
+
+    def _checkout(self, states: OrderedDict[str, WatchState], dag_ids: list[str]) -> dict[str, WatchState]:
+        """Return the watch state of each DAG, creating missing ones and evicting idle ones."""
+        now = time.monotonic()
+        # Least recently watched first, so idle states are found at the front.
+        while states:
+            dag_id, state = next(iter(states.items()))
+            if now - state.used_at < self.idle_ttl:
+                break
+            del states[dag_id]
+
+        watched = {}
+        for dag_id in dag_ids:
+            state = states.get(dag_id)
+            if state is None:
+                state = states[dag_id] = WatchState(datetime.now(timezone.utc) - timedelta(seconds=self.lookback))
+            state.used_at = now
+            states.move_to_end(dag_id)
+            watched[dag_id] = state
+
+        while len(states) > max(self.max_dags, len(watched)):
+            states.popitem(last=False)
+        return watched
+
+    async def poll(self, dag_id: str, state: WatchState, include_task_instances: bool = True) -> tuple[list, list]:
+        """
+        Fetch the runs (and task instances) of one DAG updated since its cursor.
+
+        The cursor only advances when the poll succeeds, so a failed poll is
+        retried from the same point.
+
+        Returns:
+            tuple: Lists of run and task-instance state transitions.
+
+        Raises:
+            AirflowAPIError: If the API server returned an error.
+        """
+        started = datetime.now(timezone.utc)
+        params = {"updated_at_gte": state.cursor.isoformat()}
+
+        requests = [self.client.fetch_all(f"dags/{dag_id}/dagRuns", "dag_runs", params, cache=False)]
+        if include_task_instances:
+            requests.append(
+                self.client.fetch_all(f"dags/{dag_id}/dagRuns/~/taskInstances", "task_instances", params, cache=False)
+            )
+        responses = await asyncio.gather(*requests)
+
+        for response in responses:
+            if self.client.is_error(response):
+                raise AirflowAPIError(response)
+
+        run_changes = []
+        for run in responses[0]["dag_runs"]:
+            run_id, new = run.get("dag_run_id"), run.get("state")
+            previous = state.runs.get(run_id)
+            if previous != new:
+                state.runs[run_id] = new
+                run_changes.append({
+                    "dag_id": dag_id,
+                    "dag_run_id": run_id,
+                    "previous_state": previous,
+                    "state": new,
+                    "start_date": run.get("start_date"),
+                    "end_date": run.get("end_date"),
+                })
+
+        task_changes = []
+        for task_instance in responses[1]["task_instances"] if include_task_instances else []:
+            key = (task_instance.get("dag_run_id"), task_instance.get("task_id"), task_instance.get("map_index"))
+            new = task_instance.get("state")
+            previous = state.task_instances.get(key)
+            if previous != new:
+                state.task_instances[key] = new
+                task_changes.append({
+                    "dag_id": dag_id,
+                    "dag_run_id": key[0],
+                    "task_id": key[1],
+                    "map_index": key[2],
+                    "previous_state": previous,
+                    "state": new,
+                    "try_number": task_instance.get("try_number"),
+                })
+
+        state.cursor = started - self.OVERLAP
+        state.used_at = time.monotonic()
+        return run_changes, task_changes
+
+    async def watch(
+        self,
+        dag_ids: list[str],
+        session=None,
+        timeout: float = 60.0,
+        include_task_instances: bool = True,
+        return_on_change: bool = False,
+        progress=None,
+    ) -> dict:
+        """
+        Poll the given DAGs until their runs finish, a change is seen, or `timeout` expires.
+
+        The poll interval starts at `min_interval`, doubles after every poll that
+        finds nothing (up to `max_interval`) and resets when something changes.
+        Each transition is also sent through `progress` as it is observed.
+
+        Returns:
+            dict: `run_changes`, `task_instance_changes`, `active_runs`, `polls`,
+                the `cursors` the next call will continue from and, if the last
+                poll of a DAG failed, its error under `errors`.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        watched = self._checkout(self._states(session), dag_ids)
+
+        run_changes, task_changes, errors = [], [], {}
+        interval, polls = self.min_interval, 0
+
+        while True:
+            results = await asyncio.gather(
+                *(self.poll(dag_id, state, include_task_instances) for dag_id, state in watched.items()),
+                return_exceptions=True,
+            )
+            polls += 1
+
+            new_runs, new_tasks = [], []
+            for dag_id, result in zip(watched, results):
+                if isinstance(result, AirflowAPIError):
+                    errors[dag_id] = result.response
+                    continue
+                if isinstance(result, BaseException):
+                    raise result
+                errors.pop(dag_id, None)
+                new_runs.extend(result[0])
+                new_tasks.extend(result[1])
+            run_changes.extend(new_runs)
+            task_changes.extend(new_tasks)
+
+            if progress:
+                elapsed = timeout - max(0.0, deadline - loop.time())
+                for change in new_runs + new_tasks:
+                    subject = f"{change['dag_id']} {change['dag_run_id']}"
+                    if "task_id" in change:
+                        subject += f" {change['task_id']}"
+                    await progress(elapsed, timeout, f"{subject}: {change['previous_state']} → {change['state']}")
+
+            active = sum(state.active_runs for state in watched.values())
+            seen_runs = any(state.runs for state in watched.values())
+            changed = bool(new_runs or new_tasks)
+
+            if (seen_runs and active == 0) or (changed and return_on_change):
+                break
+
+            interval = self.min_interval if changed else min(self.max_interval, interval * 2)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(interval, remaining))
+
+        return {
+            "run_changes": run_changes,
+            "task_instance_changes": task_changes,
+            "active_runs": sum(state.active_runs for state in watched.values()),
+            "polls": polls,
+            "cursors": {dag_id: state.cursor.isoformat() for dag_id, state in watched.items()},
+            **({"errors": errors} if errors else {}),
+        }
@@ -0,0 +1,53 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+from services.settings import env_int
+
+
+class SessionLimiter:
+    """
+    Caps how many tool calls one MCP session can run at the same time.
+
+    When many agents share one HTTP server, a single session firing dozens of
+    parallel tool calls would otherwise monopolize the shared Airflow connection
+    pool. Each session gets its own semaphore, which is dropped together with
+    the session object.
+
+    Args:
+        max_concurrency (int): Tool calls in flight per session.
+            Defaults to `_MCP_SESSION_CONCURRENCY`; 0 disables the limit.
+    """
+
+    def __init__(self, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency if max_concurrency is not None else env_int("_MCP_SESSION_CONCURRENCY", 8)
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def current_session():
+        """Return the MCP session of the request being handled, or None outside a request."""
+        from mcp.server.lowlevel.server import request_ctx
+
+        try:
+            return request_ctx.get().session
+        except LookupError:
+            return None
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the current session's concurrency slots for the duration of a tool call."""
+        session = self.current_session()
+        if session is None or self.max_concurrency <= 0:
+            yield
+            return
+
+        semaphore = self._semaphores.get(session)
+        if semaphore is None:
+            semaphore = self._semaphores[session] = asyncio.Semaphore(self.max_concurrency)
+
+        async with semaphore:
+            yield
+
+    @property
+    def active_sessions(self) -> int:
+        return len(self._semaphores)
@@ -0,0 +1,35 @@
+import os
+
+from dotenv import load_dotenv
+
+# Settings are read from the environment, with `.env` filling in unset variables.
+load_dotenv()
+
+
+def env_str(name: str, default: str = "") -> str:
+    """Read a string setting from the environment."""
+    return os.getenv(name, default)
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to `default` when unset or invalid."""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to `default` when unset or invalid."""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean setting from the environment ("1", "true", "yes" and "on" are truthy)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
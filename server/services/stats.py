@@ -0,0 +1,25 @@
+from math import isfinite
+
+
+def percentile(ordered, q: float) -> float | None:
+    """
+    Return the `q` quantile (0-1) of already sorted values, interpolating linearly.
+
+    Returns:
+        float: The quantile, or None when there are no values.
+    """
+    if not ordered:
+        return None
+    rank = q * (len(ordered) - 1)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def finite(values) -> list[float]:
+    """Drop the NaN/inf placeholders used for missing values in columnar arrays."""
+    return [value for value in values if isfinite(value)]
+
+
+def rounded(value: float | None, digits: int = 3) -> float | None:
+    return round(value, digits) if value is not None else None
@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+
+
+class TokenManager:
+    """
+    Keeps an Airflow JWT in memory and refreshes it before it expires.
+
+    The expiry is read from the token's `exp` claim. Once the token enters the
+    refresh window a single background refresh is started and the current token
+    keeps being served until the new one arrives. When there is no usable token
+    every caller awaits the same refresh, so `/auth/token` is hit once no matter
+    how many tool calls are in flight.
+
+    Args:
+        endpoint_url (str): Base URL of the Airflow API server.
+        username (str): Airflow username.
+        password (str): Airflow password.
+        refresh_margin (float): Seconds before expiry at which a refresh starts.
+        default_lifetime (float): Lifetime assumed when the token has no `exp` claim.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        username: str,
+        password: str,
+        refresh_margin: float = 60.0,
+        default_lifetime: float = 300.0,
+    ):
+        self.auth_url = f"{endpoint_url}/auth/token"
+        self.username = username
+        self.password = password
+        self.refresh_margin = refresh_margin
+        self.default_lifetime = default_lifetime
+
+        self._token = ""
+        self._expires_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+
+    @staticmethod
+    def decode_expiry(token: str) -> float | None:
+        """
+        Read the `exp` claim from a JWT without verifying its signature.
+
+        Args:
+            token (str): The encoded JWT.
+
+        Returns:
+            float | None: The expiry as a UNIX timestamp, or None if it cannot be read.
+        """
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            claims = json.loads(base64.urlsafe_b64decode(payload))
+            return float(claims["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    async def get_token(self, client: httpx.AsyncClient) -> str:
+        """
+        Return a valid JWT, refreshing it if needed.
+
+        Args:
+            client (httpx.AsyncClient): The shared client used to call `/auth/token`.
+
+        Returns:
+            str: The bearer token.
+        """
+        remaining = self._expires_at - time.time()
+
+        if self._token and remaining > self.refresh_margin:
+            return self._token
+
+        refresh = self._start_refresh(client)
+
+        # Still valid: keep serving it while the refresh runs in the background.
+        if self._token and remaining > 0:
+            return self._token
+
+        return await asyncio.shield(refresh)
+
+    def invalidate(self, token: str) -> None:
+        """
+        Drop a token the server rejected.
+
+        Only the token that was actually used is dropped, so a burst of 401s
+        for the same stale token leads to a single refresh.
+
+        Args:
+            token (str): The token that was rejected.
+        """
+        if token and token == self._token:
+            self._token = ""
+            self._expires_at = 0.0
+
+    def _start_refresh(self, client: httpx.AsyncClient) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(client))
+            # Avoid "exception was never retrieved" when nobody awaits a background refresh.
+            self._refresh_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._refresh_task
+
+    async def _refresh(self, client: httpx.AsyncClient) -> str:
+        payload = {
+            "username": self.username,
+            "password": self.password
+        }
+
+        headers = {
+            "Content-Type": "application/json"
+        }
+
+        response = await client.post(self.auth_url, json=payload, headers=headers)
+
+        if response.status_code not in (200, 201):
+            raise Exception(f"Authentication failed: {response.status_code} {response.text}")
+
+        token = response.json().get("access_token", "")
+        if not token:
+            raise Exception("Failed to generate JWT token")
+
+        expires_at = self.decode_expiry(token)
+        if expires_at is None:
+            expires_at = time.time() + self.default_lifetime
+
+        self._token = token
+        self._expires_at = expires_at
+        return token
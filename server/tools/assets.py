@@ -2,24 +2,97 @@ class AirflowAssets:
     """Class to manage Airflow assets."""
 
     def __init__(self, client):
+        from services.asset_lineage import AssetLineage
+
         self.client = client
+        self.lineage = AssetLineage(client)
 
     async def get_assets(self) -> list:
         """
         Fetch all Airflow assets via the Airflow REST API.
 
-        Sends a GET request to the `/assets` endpoint and extracts the asset names.
-        Assets can represent datasets, code packages, or other resources linked to DAGs.
+        Sends GET requests to the `/assets` endpoint, following every page, and
+        extracts the asset names. Assets can represent datasets, code packages,
+        or other resources linked to DAGs.
 
         Returns:
-            list: A list of asset names as strings. If an error occurs, a string error message is returned.
+            list: A list of asset names as strings. If an error occurs, the error response is returned.
         """
+        from services.models import Asset
+
         endpoint = "assets" 
-        method = 'get'
 
-        response = await self.client.api_request(endpoint, method)
-        if isinstance(response, str):
+        response = await self.client.fetch_all(endpoint, "assets", model=Asset)
+        if self.client.is_error(response):
             return response
         
         # Extract just the name values from the response
-        return [asset["name"] for asset in response.get("assets", [])]
\ No newline at end of file
+        return [asset.name for asset in response.get("assets", [])]
+
+    async def asset_lineage(
+        self,
+        asset: str,
+        direction: str = "downstream",
+        max_depth: int | None = None,
+        include_edges: bool = False,
+    ):
+        """
+        Find the DAGs and assets downstream (or upstream) of an asset, transitively.
+
+        Answered from the local lineage graph, which is synced from the `/assets`
+        endpoint in the background; only the first call waits for the initial sync.
+        Downstream, an asset leads to the DAGs scheduled on or consuming it, and a
+        DAG to the assets its tasks produce.
+
+        Args:
+            asset (str): Asset name or URI.
+            direction (str): "downstream" (default) or "upstream".
+            max_depth (int, optional): Maximum number of hops; consumers of the asset
+                                       are 1 hop away, the assets they produce 2.
+            include_edges (bool, optional): Also return the traversed edges.
+
+        Returns:
+            dict: The reached `assets` and `dags`, each with its `depth`, and `synced_at`.
+                  If the initial sync fails, the error response is returned.
+        """
+        from services.airflow_client import AirflowAPIError
+
+        try:
+            await self.lineage.ensure_started()
+        except AirflowAPIError as e:
+            return e.response
+
+        return self.lineage.traverse(asset=asset, direction=direction, max_depth=max_depth, include_edges=include_edges)
+
+    async def dag_lineage(
+        self,
+        dag_id: str,
+        direction: str = "downstream",
+        max_depth: int | None = None,
+        include_edges: bool = False,
+    ):
+        """
+        Find the assets (and DAGs) a DAG feeds, or depends on, transitively.
+
+        Uses the same local lineage graph as `asset_lineage`. Downstream, the
+        assets produced by the DAG's tasks are 1 hop away, the DAGs consuming them 2.
+
+        Args:
+            dag_id (str): The DAG ID.
+            direction (str): "downstream" (default) for what the DAG feeds,
+                             "upstream" for what it depends on.
+            max_depth (int, optional): Maximum number of hops.
+            include_edges (bool, optional): Also return the traversed edges.
+
+        Returns:
+            dict: The reached `assets` and `dags`, each with its `depth`, and `synced_at`.
+                  If the initial sync fails, the error response is returned.
+        """
+        from services.airflow_client import AirflowAPIError
+
+        try:
+            await self.lineage.ensure_started()
+        except AirflowAPIError as e:
+            return e.response
+
+        return self.lineage.traverse(dag_id=dag_id, direction=direction, max_depth=max_depth, include_edges=include_edges)
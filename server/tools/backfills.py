@@ -7,49 +7,99 @@ class AirflowBackfills:
                 for making API calls to Airflow.
     """
     def __init__(self, client):
+        from services.backfill_planner import BackfillPlanner
+
         self.client = client
+        self.planner = BackfillPlanner(client)
 
-    async def list_backfills(self,dag_id: str):
+    async def list_backfills(self, dag_id: str, fields: list[str] | None = None, output_format: str = "json"):
         """
-        Retrieves and summarizes backfill runs for a specific DAG.
+        Retrieves the backfills of a specific DAG.
 
-        Sends a GET request to the Airflow `/backfills` endpoint and filters the results
-        for the given `dag_id`. If any backfills are found, it returns a human-readable
-        summary including DAG run IDs, states, and time ranges.
+        Sends GET requests to the Airflow `/backfills` endpoint filtered by `dag_id`
+        on the server, following every page.
 
         Args:
             dag_id (str): The identifier of the DAG for which to list backfills.
+            fields (list[str], optional): Only return these backfill fields, e.g.
+                                          ["id", "from_date", "to_date", "completed_at"].
+            output_format (str, optional): "json" (default) or "table" for
+                                           `{columns, rows}` output.
 
         Returns:
-            str: A formatted string summarizing the backfills for the DAG.
-                If no backfills are found, a message stating that is returned.
-                If an error occurs during the request, the error message is returned.
+            dict: `{"backfills": [...], "total_entries": n}` (ID, date range, pause
+                  state, reprocess behavior and creation/completion times), or the
+                  error response if the request fails.
         """
+        from services.projection import shape
 
-        endpoint = "backfills"
-        method = 'get'
+        response = await self.client.fetch_all("backfills", "backfills", {"dag_id": dag_id})
+        return shape(response, fields, output_format, "backfills")
 
-        response = await self.client.api_request(endpoint, method)
+    async def plan_backfill(
+        self,
+        dag_ids: list[str],
+        from_date: str,
+        to_date: str,
+        partition_runs: int | None = None,
+        submit: bool = False,
+        run_backwards: bool = False,
+        reprocess_behavior: str = "none",
+        max_active_runs: int = 10,
+        dag_run_conf: dict | None = None,
+    ):
+        """
+        Plan a backfill of one or more DAGs as partitions, and optionally start it.
 
-        if isinstance(response, str):
-            return response 
+        Uses Airflow's backfill dry run to count the runs the range would create,
+        then splits them into contiguous partitions of at most `partition_runs`
+        runs. Airflow runs one backfill per DAG at a time, so a DAG's partitions
+        are submitted one after another: `submit=True` starts the first partition
+        of every DAG, and each `backfill_progress` call submits the next one once
+        the previous backfill has completed.
 
-        backfills = response.get("backfills", [])
-        total = response.get("total_entries", 0)
+        Args:
+            dag_ids (list[str]): DAGs to backfill.
+            from_date (str): Start time (ISO 8601).
+            to_date (str): End time (ISO 8601).
+            partition_runs (int, optional): Maximum runs per partition
+                                            (default: `_AIRFLOW_BACKFILL_PARTITION_RUNS`).
+            submit (bool, optional): Start the backfill; False only plans it. Defaults to False.
+            run_backwards (bool): Run partitions (and runs) from the latest date backwards.
+            reprocess_behavior (str): 'none', 'all', or 'failed'.
+            max_active_runs (int): Max concurrent runs per partition.
+            dag_run_conf (dict): Optional config for the DAG runs.
 
-        if not backfills:
-            return f"No backfills found for DAG '{dag_id}'."
+        Returns:
+            dict: `plan_id` (for `backfill_progress`), `estimated_runs`, the
+                  partitions per DAG and, when submitted, a submission summary.
+        """
+        options = {
+            "run_backwards": run_backwards,
+            "dag_run_conf": dag_run_conf or {},
+            "reprocess_behavior": reprocess_behavior,
+            "max_active_runs": max_active_runs,
+        }
+        return await self.planner.plan(dag_ids, from_date, to_date, options, partition_runs, submit)
+
+    async def backfill_progress(self, plan_id: str, advance: bool = True):
+        """
+        Report the aggregated progress of a planned backfill.
 
-        lines = [f"Found {total} backfills for DAG '{dag_id}':\n"]
-        for b in backfills:
-            dag_run_id = b.get("dag_run_id", "unknown")
-            state = b.get("state", "unknown")
-            start_date = b.get("start_date", "N/A")
-            end_date = b.get("end_date", "N/A")
-            lines.append(f"- Run ID: {dag_run_id}, State: {state}, Start: {start_date}, End: {end_date}")
+        Counts the plan's backfill runs per state with one listing per DAG, marks
+        finished partitions, and (with `advance`) submits the next partitions.
+
+        Args:
+            plan_id (str): ID returned by `plan_backfill`.
+            advance (bool, optional): Submit the next partition of DAGs whose
+                                      current backfill completed. Defaults to True.
+
+        Returns:
+            dict: `done`, `failed`, `running`, `queued` and `not_started` runs,
+                  `percent_done`, `eta_seconds`, partition counts and errors.
+        """
+        return await self.planner.progress(plan_id, advance)
 
-        return "\n".join(lines)
-    
     async def create_backfill(self,
         dag_id: str,
         from_date: str,
@@ -6,30 +6,37 @@ class AirflowConnection:
     """
 
     def __init__(self, client):
+        from services.connection_sync import ConnectionSync
+
         self.client = client
+        self.sync = ConnectionSync(client)
 
-    async def list_connection(self):
+    async def list_connection(self, fields: list[str] | None = None, output_format: str = "json"):
         """
         List all connections in Airflow.
 
-        Sends a GET request to the Airflow `/connections` endpoint and retrieves
-        a list of connections.
+        Sends GET requests to the Airflow `/connections` endpoint, following
+        every page, and retrieves a list of connections.
+
+        Args:
+            fields (list[str], optional): Connection fields to return, e.g. ["connection_id", "conn_type"].
+            output_format (str): "json" (default) or "table" for `{columns, rows}`.
 
         Returns:
-            list: A list of connection names as strings. If an error occurs, a string error message is returned.
+            dict: `{"connections": [...], "total_entries": n}`. If an error occurs, the error response is returned.
         """
+        from services.projection import shape
+
         endpoint = "connections"
-        method = 'get'
 
-        response = await self.client.api_request(endpoint, method)
+        response = await self.client.fetch_all(endpoint, "connections")
 
-        if isinstance(response, str):
+        if self.client.is_error(response):
             return response
 
-        # Extract just the connection names from the response
-        return response
+        return shape(response, fields, output_format, key="connections")
 
-    async def get_connection_details(self, conn_id: str):
+    async def get_connection_details(self, conn_id: str, fields: list[str] | None = None):
         """
         Fetch detailed information for a specific Airflow connection.
 
@@ -38,11 +45,14 @@ class AirflowConnection:
 
         Args:
             conn_id (str): The connection identifier.
+            fields (list[str], optional): Only return these fields, e.g. ["host", "port"].
 
         Returns:
             dict: A dictionary containing connection details such as type, host, schema, etc.
                 If an error occurs, a string error message is returned.
         """
+        from services.projection import shape
+
         endpoint = f"connections/{conn_id}"
         method = 'get'
 
@@ -51,7 +61,7 @@ class AirflowConnection:
         if isinstance(response, str):
             return response
 
-        return response
+        return shape(response, fields)
 
     async def create_connection(
         self,
@@ -178,3 +188,59 @@ class AirflowConnection:
         response = await self.client.api_request(endpoint, method, json=payload)
 
         return response
+
+    async def sync_connections(
+        self,
+        connections: list[dict],
+        dry_run: bool = True,
+        delete_missing: bool = True,
+        update_secrets: bool = False,
+        progress=None,
+    ):
+        """
+        Make Airflow's connections match a desired set, changing only what differs.
+
+        Fetches every page of `/connections`, diffs it against `connections` and,
+        unless `dry_run`, applies the creates, updates and deletes through the
+        bulk `PATCH /connections` endpoint (or one bounded-concurrency request per
+        connection when the server has no bulk endpoint). Airflow masks secrets,
+        so connections whose only possible difference is a password or a masked
+        `extra` key are listed under `secrets_unverified` and left alone unless
+        `update_secrets` is set.
+
+        Args:
+            connections (list[dict]): The full desired set. Each needs `connection_id`
+                                      and `conn_type`; `description`, `host`, `login`,
+                                      `schema`, `port`, `password` and `extra` (dict
+                                      or JSON string) are optional; an omitted
+                                      `password` leaves the stored one unchanged.
+            dry_run (bool, optional): Only preview the diff. Defaults to True.
+            delete_missing (bool, optional): Delete connections absent from the desired
+                                             set. Defaults to True.
+            update_secrets (bool, optional): Rewrite connections whose secrets cannot be
+                                             verified. Defaults to False.
+            progress (Callable, optional): Async `(done, total, message)` callback used
+                                           for MCP progress notifications.
+
+        Returns:
+            dict: The diff (`create`, `update` with changed field names, `delete`,
+                  `unchanged`, `secrets_unverified`, `invalid`) and, when applied,
+                  `applied` counts per action. Secret values are never included.
+                  Nothing is applied while `invalid` entries exist. If listing the current connections fails, returns the error response.
+        """
+        from services.models import Connection
+
+        current = await self.client.fetch_all("connections", "connections", cache=False, model=Connection)
+        if self.client.is_error(current):
+            return current
+
+        diff = self.sync.diff(connections, current["connections"], delete_missing, update_secrets)
+        entities = diff.pop("entities")
+        result = {"dry_run": dry_run, **{key: value for key, value in diff.items() if value or key == "unchanged"}}
+
+        if not dry_run and diff["invalid"]:
+            # An invalid entry's connection would otherwise be deleted as missing.
+            result["error"] = "Nothing applied: fix the invalid entries first."
+        elif not dry_run and (diff["create"] or diff["update"] or diff["delete"]):
+            result["applied"] = await self.sync.apply(entities, diff["delete"], progress)
+        return result
@@ -10,30 +10,76 @@ class AirflowDAGs:
                 to communicate with the Airflow REST API.
     """
     def __init__(self, client):
+        from services.bulk import BulkExecutor
+        from services.dag_catalog import DagCatalog
+        from services.run_watcher import RunWatcher
+
         self.client = client
+        self.bulk = BulkExecutor()
+        self.catalog = DagCatalog(client)
+        self.watcher = RunWatcher(client)
 
     async def get_dags_list(self) -> list:
         """
         Fetch all available Airflow DAGs via the Airflow REST API.
 
-        Sends a GET request to the `/dags` endpoint and retrieves a list of DAGs.
-        Returns only the DAG IDs, omitting other metadata.
+        Sends GET requests to the `/dags` endpoint, following every page, and
+        retrieves a list of DAGs. Returns only the DAG IDs, omitting other metadata.
 
         Returns:
-            list: A list of DAG IDs as strings. If an error occurs, a string error message is returned.
+            list: A list of DAG IDs as strings. If an error occurs, the error response is returned.
         """
+        from services.models import Dag
+
         endpoint = "dags"
-        method = 'get'
 
-        response = await self.client.api_request(endpoint, method)
+        response = await self.client.fetch_all(endpoint, "dags", model=Dag)
 
-        if isinstance(response, str):
+        if self.client.is_error(response):
             return response
 
         # Extract just the dag_id values from the response
-        return [dag["dag_id"] for dag in response.get("dags", [])]
+        return [dag.dag_id for dag in response.get("dags", [])]
     
-    async def get_dag_details(self,dag_id) -> list:
+    async def search_dags(
+        self,
+        tags: list[str] | None = None,
+        tags_match_mode: str = "any",
+        owner: str | None = None,
+        is_paused: bool | None = None,
+        dag_id_prefix: str | None = None,
+        limit: int = 100,
+    ):
+        """
+        Search DAGs by tag, owner, paused state and DAG ID prefix.
+
+        Queries are answered from the local DAG catalog, which is synced from
+        the `/dags` endpoint in the background; only the first call waits for
+        the initial sync.
+
+        Args:
+            tags (list[str], optional): Tags to match.
+            tags_match_mode (str): "any" (default) or "all" of the given tags.
+            owner (str, optional): DAG owner (case-insensitive).
+            is_paused (bool, optional): Only paused (True) or active (False) DAGs.
+            dag_id_prefix (str, optional): Only DAGs whose ID starts with this prefix.
+            limit (int): Maximum number of DAGs returned (default: 100).
+
+        Returns:
+            dict: `total_matches`, the matching DAGs (ID, tags, owners, paused state,
+                  file location, schedule, ...) and `synced_at`. If the initial sync
+                  fails, the error response is returned.
+        """
+        from services.airflow_client import AirflowAPIError
+
+        try:
+            await self.catalog.ensure_started()
+        except AirflowAPIError as e:
+            return e.response
+
+        return self.catalog.search(tags, tags_match_mode, owner, is_paused, dag_id_prefix, limit)
+
+    async def get_dag_details(self,dag_id, fields: list[str] | None = None) -> list:
         """
         Fetch detailed information for a specific Airflow DAG.
 
@@ -42,11 +88,14 @@ class AirflowDAGs:
 
         Args:
             dag_id (str): The DAG identifier.
+            fields (list[str], optional): Only return these fields, e.g. ["schedule", "owners"].
 
         Returns:
             dict: A dictionary containing DAG details such as schedule, tasks, owners, etc.
                 If an error occurs, a string error message is returned.
         """
+        from services.projection import shape
+
         endpoint = f"dags/{dag_id}/details"
         method = 'get'
 
@@ -55,31 +104,275 @@ class AirflowDAGs:
         if isinstance(response, str):
             return response 
 
-        return response
+        return shape(response, fields)
     
-    async def get_dag_runs(self, dag_id: str):
+    async def get_dag_runs(self, dag_id: str, fields: list[str] | None = None, output_format: str = "json"):
         """
         Fetch all runs for a specific DAG.
 
-        Sends a GET request to the `/dags/{dag_id}/dagRuns` endpoint to retrieve
-        all runs associated with the specified DAG.
+        Sends GET requests to the `/dags/{dag_id}/dagRuns` endpoint, following
+        every page, to retrieve all runs associated with the specified DAG.
 
         Args:
             dag_id (str): The identifier of the DAG.
+            fields (list[str], optional): DAG run fields to return, e.g. ["dag_run_id", "state"].
+            output_format (str): "json" (default) or "table" for `{columns, rows}`.
 
         Returns:
             list: A list of dictionaries containing details of each DAG run.
-                  If an error occurs, a string error message is returned.
+                  If an error occurs, the error response is returned.
         """
+        from services.projection import shape
+
         endpoint = f"dags/{dag_id}/dagRuns"
-        method = 'get'
 
-        response = await self.client.api_request(endpoint, method)
+        # Full upstream records: every field stays available to `fields`.
+        response = await self.client.fetch_all(endpoint, "dag_runs")
 
-        if isinstance(response, str):
+        if self.client.is_error(response):
             return response
 
-        return response.get("dag_runs", [])
+        return shape(response.get("dag_runs", []), fields, output_format)
+
+    async def get_dag_run_summary(
+        self,
+        dag_ids: list[str] | None = None,
+        states: list[str] | None = None,
+        start_date_gte: str | None = None,
+        start_date_lte: str | None = None,
+    ):
+        """
+        Summarize DAG runs per DAG and state.
+
+        Runs one aggregate query when the metadata DB fast path is configured;
+        otherwise DAG runs are streamed over REST and aggregated on the fly.
+
+        Args:
+            dag_ids (list[str], optional): Only these DAGs (default: all DAGs).
+            states (list[str], optional): Only these states, e.g. ["failed"].
+            start_date_gte (str, optional): ISO 8601 lower bound on start date.
+            start_date_lte (str, optional): ISO 8601 upper bound on start date.
+
+        Returns:
+            dict: `backend` ("metadata_db" or "rest") and `summary`, a list of
+                  `{dag_id, state, count, avg_duration, max_duration}` rows
+                  (durations in seconds).
+        """
+        from datetime import datetime
+        from services.airflow_client import AirflowAPIError
+        from services.metadata_db import summarize
+
+        filters = {"dag_ids": dag_ids, "states": states, "start_date_gte": start_date_gte, "start_date_lte": start_date_lte}
+
+        db = self.client.metadata_db
+        if db.enabled:
+            try:
+                return {"backend": "metadata_db", "summary": await db.dag_run_summary(**filters)}
+            except Exception as e:
+                db.warn_fallback(e)
+
+        params = {}
+        if states:
+            params["state"] = states
+        if start_date_gte:
+            params["start_date_gte"] = start_date_gte
+        if start_date_lte:
+            params["start_date_lte"] = start_date_lte
+
+        async def rows():
+            for dag_id in dag_ids or ["~"]:
+                async for dag_run in self.client.stream(f"dags/{dag_id}/dagRuns", "dag_runs", params):
+                    yield dag_run
+
+        def duration(dag_run):
+            if not (dag_run.get("start_date") and dag_run.get("end_date")):
+                return None
+            end = datetime.fromisoformat(dag_run["end_date"])
+            return (end - datetime.fromisoformat(dag_run["start_date"])).total_seconds()
+
+        try:
+            return {"backend": "rest", "summary": await summarize(rows(), duration)}
+        except AirflowAPIError as e:
+            return e.response
+
+    async def get_dag_run_stats(
+        self,
+        dag_ids: list[str] | None = None,
+        start_date_gte: str | None = None,
+        start_date_lte: str | None = None,
+        z_threshold: float = 3.0,
+        max_anomalies: int = 5,
+        output_format: str = "json",
+    ):
+        """
+        Summarize run durations per DAG to spot slow, failing or drifting DAGs.
+
+        Run history is streamed, page by page (or through a server-side cursor
+        when the metadata DB fast path is configured), into typed arrays of
+        start times, durations and states per DAG, so even 100k+ runs are
+        summarized without keeping a record per run.
+
+        Args:
+            dag_ids (list[str], optional): Only these DAGs (default: all DAGs).
+            start_date_gte (str, optional): ISO 8601 lower bound on start date.
+            start_date_lte (str, optional): ISO 8601 upper bound on start date.
+            z_threshold (float): Standard deviations from the mean that make a run a
+                                 z-score anomaly (default: 3).
+            max_anomalies (int): Most anomalous runs listed per DAG (default: 5).
+            output_format (str): "json" (default) or "table" for `{columns, rows}`.
+
+        Returns:
+            dict: `backend`, `total_runs` and `dags`, one summary per DAG ordered by
+                  p95 duration: run, success and failure counts, `failure_rate`, duration
+                  mean/std/p50/p90/p95/p99/max (seconds), `trend_seconds_per_day` and
+                  `trend_pct_per_week`, `zscore_anomalies` and `mad_anomalies` counts,
+                  and the most anomalous runs. If a request fails, the error response
+                  is returned.
+        """
+        from services.airflow_client import AirflowAPIError
+        from services.models import DagRunTiming
+        from services.projection import shape
+        from services.run_stats import RunHistories, summarize_history
+
+        filters = {"dag_ids": dag_ids, "start_date_gte": start_date_gte, "start_date_lte": start_date_lte}
+        histories = RunHistories()
+        backend = "rest"
+
+        db = self.client.metadata_db
+        if db.enabled:
+            try:
+                async for row in db.dag_run_timings(**filters):
+                    histories.add_row(row)
+                backend = "metadata_db"
+            except Exception as e:
+                db.warn_fallback(e)
+                histories = RunHistories()
+
+        if backend == "rest":
+            params = {}
+            if start_date_gte:
+                params["start_date_gte"] = start_date_gte
+            if start_date_lte:
+                params["start_date_lte"] = start_date_lte
+            try:
+                for dag_id in dag_ids or ["~"]:
+                    async for dag_run in self.client.stream(
+                        f"dags/{dag_id}/dagRuns", "dag_runs", params, cache=False, model=DagRunTiming
+                    ):
+                        histories.add_record(dag_run)
+            except AirflowAPIError as e:
+                return e.response
+
+        summaries = [
+            summarize_history(dag_id, history, z_threshold, max_anomalies)
+            for dag_id, history in histories.dags.items()
+        ]
+        summaries.sort(key=lambda summary: summary.get("duration_p95") or 0, reverse=True)
+        response = {"backend": backend, "total_runs": len(histories), "dags": summaries}
+        return shape(response, None, output_format, key="dags")
+
+    async def get_critical_path(self, dag_id: str, runs: int = 20, top: int = 10):
+        """
+        Explain where a DAG's wall time goes: its critical path and bottleneck tasks.
+
+        The task graph comes from `/dags/{dag_id}/tasks` (cached), the last `runs`
+        finished DAG runs from `/dags/{dag_id}/dagRuns`, and their task instances
+        from the batch `/dags/~/dagRuns/~/taskInstances/list` endpoint. Task timings
+        are kept in columnar arrays, and in each run the critical path is walked
+        back from the last task to finish through the upstream task it waited for.
+
+        Args:
+            dag_id (str): The DAG ID.
+            runs (int): Number of most recent finished runs to analyze (default: 20).
+            top (int): Number of bottleneck tasks returned (default: 10).
+
+        Returns:
+            dict: `runs_analyzed`, `wall_time` percentiles (seconds), the most frequent
+                  `critical_path` and `bottlenecks` ranked by `share_of_wall_time`, each
+                  with its running and waiting seconds on the critical path, how often it
+                  is on it and its duration percentiles. If a request fails, the error
+                  response is returned.
+        """
+        from contextlib import aclosing
+
+        from services.airflow_client import AirflowAPIError
+        from services.critical_path import RunTimings, TaskGraph, analyze
+        from services.models import DagRun, TaskInstance
+
+        tasks = await self.client.api_request(f"dags/{dag_id}/tasks", "get")
+        if self.client.is_error(tasks):
+            return tasks
+        graph = TaskGraph(tasks.get("tasks", []))
+
+        finished = []
+        params = {"order_by": "-logical_date", "state": ["success", "failed"]}
+        try:
+            # One page at a time: only the newest `runs` are needed.
+            dag_runs = self.client.stream(
+                f"dags/{dag_id}/dagRuns", "dag_runs", params, page_size=min(runs, 100), max_concurrency=1, model=DagRun
+            )
+            async with aclosing(dag_runs):
+                async for dag_run in dag_runs:
+                    finished.append((dag_run.dag_run_id, dag_run.start_date))
+                    if len(finished) >= runs:
+                        break
+
+            timings = RunTimings(graph, finished)
+            if finished:
+                body = {"dag_ids": [dag_id], "dag_run_ids": timings.run_ids}
+                async for task_instance in self.client.stream(
+                    "dags/~/dagRuns/~/taskInstances/list", "task_instances", method="post", json=body, model=TaskInstance
+                ):
+                    timings.add(task_instance)
+        except AirflowAPIError as e:
+            return e.response
+
+        return {"dag_id": dag_id, **analyze(timings, top)}
+
+    async def watch_dag_runs(
+        self,
+        dag_ids: list[str],
+        timeout: float = 60.0,
+        include_task_instances: bool = True,
+        return_on_change: bool = False,
+        session=None,
+        progress=None,
+    ):
+        """
+        Follow the runs of one or more DAGs, returning only what changed.
+
+        Each watched DAG keeps an `updated_at_gte` cursor (per MCP session), so
+        every poll of `/dags/{dag_id}/dagRuns` and its task instances downloads
+        only the runs and tasks updated since the previous poll. The first call
+        for a DAG reports runs updated within the last `_AIRFLOW_WATCH_LOOKBACK`
+        seconds; later calls continue where the previous one stopped.
+
+        Polling starts every `_AIRFLOW_WATCH_MIN_INTERVAL` seconds and backs off
+        up to `_AIRFLOW_WATCH_MAX_INTERVAL` while nothing changes.
+
+        Args:
+            dag_ids (list[str]): The DAGs to watch.
+            timeout (float): Maximum seconds to keep polling (default: 60).
+            include_task_instances (bool): Also report task-instance state changes (default: True).
+            return_on_change (bool): Return as soon as any change is seen instead of
+                                     waiting for all runs to finish (default: False).
+            session: The MCP session that owns the cursors.
+            progress (Callable, optional): Async `(elapsed, timeout, message)` callback;
+                                           every state transition is sent through it.
+
+        Returns:
+            dict: `run_changes` and `task_instance_changes` (each with `previous_state`
+                  and `state`), the number of `active_runs` left, the number of `polls`
+                  and the `cursors` per DAG. Per-DAG poll failures are under `errors`.
+        """
+        return await self.watcher.watch(
+            dag_ids,
+            session=session,
+            timeout=timeout,
+            include_task_instances=include_task_instances,
+            return_on_change=return_on_change,
+            progress=progress,
+        )
 
     async def trigger_dag(self, dag_id: str):
         """
@@ -164,60 +457,63 @@ class AirflowDAGs:
 
         return response
     
-    async def pause_dags(self, dag_id: str, pause: bool):
+    async def pause_all_dags(
+        self,
+        pause: bool = True,
+        tags: list[str] | None = None,
+        dag_id_prefix: str | None = None,
+        only_changed: bool = True,
+        progress=None,
+    ):
         """
-        Pause or unpause a single DAG by updating its `is_paused` status.
+        Pause or unpause all DAGs, or a filtered subset, with bounded concurrency.
 
-        Sends a PATCH request to the `/dags/{dag_id}` endpoint with the
-        pause flag.
+        Fetches every page of `/dags` (narrowed by tag and DAG ID prefix on the
+        server), then issues PATCH requests through a `BulkExecutor`, which caps
+        concurrency, rate-limits requests and retries transient failures.
 
         Args:
-            dag_id (str): The identifier of the DAG to pause/unpause.
-            pause (bool): True to pause the DAG, False to unpause.
-
-        Returns:
-            dict: A dictionary containing the `dag_id` and the result of the API call.
-        """
-        endpoint = f"dags/{dag_id}"
-        payload = {"is_paused": pause}
-
-        return {
-            "dag_id": dag_id,
-            "result": await self.client.api_request(endpoint, "patch", json=payload)
-        }
-
-    async def pause_all_dags(self, pause: bool = True):
-        """
-        Pause or unpause all DAGs concurrently.
-
-        Fetches the list of all DAGs, then issues PATCH requests in parallel
-        to update their `is_paused` status.
-
-        Args:
-            pause (bool, optional): True to pause all DAGs, False to unpause.
+            pause (bool, optional): True to pause the DAGs, False to unpause.
                                     Defaults to True.
+            tags (list[str], optional): Only DAGs carrying any of these tags.
+            dag_id_prefix (str, optional): Only DAGs whose ID starts with this prefix.
+            only_changed (bool, optional): Skip DAGs already in the target state
+                                           (e.g. only pause currently-unpaused DAGs).
+                                           Defaults to True.
+            progress (Callable, optional): Async `(done, total, message)` callback used
+                                           for MCP progress notifications.
 
         Returns:
-            list: A list of results or exceptions from each concurrent PATCH request.
-                  If fetching DAGs fails, returns an error string.
+            dict: A summary with `total`, `succeeded`, `failed`, `skipped` and `retries`
+                  counts plus the first few errors (all zero when no DAG matches). If
+                  fetching DAGs fails, returns the error response.
         """
-        import asyncio
-        
-        # Step 1: Get all DAGs
-        response = await self.client.api_request("dags", "get")
-        if isinstance(response, str):
-            return f"Failed to get DAGs: {response}"
+        from services.models import Dag
+
+        params = {}
+        if tags:
+            params["tags"] = tags
+            params["tags_match_mode"] = "any"
+        if dag_id_prefix:
+            params["dag_id_pattern"] = f"{dag_id_prefix}%"
+
+        # Step 1: Get the matching DAGs, bypassing the cache: the skip below needs
+        # their current paused state, which may have changed outside this server.
+        response = await self.client.fetch_all("dags", "dags", params, cache=False, model=Dag)
+        if self.client.is_error(response):
+            return response
 
         dags = response.get("dags", [])
-        if not dags:
-            return "No DAGs found."
-
-        # Step 2: Prepare concurrent PATCH tasks
-        tasks = [self.pause_dags(dag["dag_id"], pause) for dag in dags]
-
-        # Step 3: Run all PATCH requests in parallel
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        return results
-
-
+        if dag_id_prefix:
+            # `dag_id_pattern` is a LIKE pattern, so `_` can over-match.
+            dags = [dag for dag in dags if dag.dag_id.startswith(dag_id_prefix)]
+
+        # Step 2: PATCH the DAGs that are not already in the target state
+        # (the executor does the retrying, so the client does not retry as well)
+        return await self.bulk.run(
+            dags,
+            lambda dag: self.client.api_request(f"dags/{dag.dag_id}", "patch", json={"is_paused": pause}, retries=0),
+            key=lambda dag: dag.dag_id,
+            skip=(lambda dag: dag.is_paused == pause) if only_changed else None,
+            progress=progress,
+        )
@@ -1,78 +1,336 @@
+import functools
+import importlib
+from contextlib import asynccontextmanager
+
+from mcp.server.fastmcp import Context
+
+
 class RegisterTools:
-    def __init__(self, mcp):
-        from services.airflow_client import AirflowClient
-        from tools.dags import AirflowDAGs
-        from tools.backfills import AirflowBackfills
-        from tools.assets import AirflowAssets
-        from tools.connections import AirflowConnection
-        from tools.tasks_instance import AirflowTasksInstance
-
-        self.client = AirflowClient()
-        self.dags = AirflowDAGs(self.client)
-        self.backfills = AirflowBackfills(self.client)
-        self.assets = AirflowAssets(self.client)
-        self.connection = AirflowConnection(self.client)
-        self.tasks_instance = AirflowTasksInstance(self.client)
+    """
+    Single registry of every MCP tool.
+
+    Tool groups are registered from `GROUPS`; the Airflow client and the tool
+    classes in `TOOL_CLASSES` are imported and built on first use, so starting
+    the server (and answering `initialize`) does not pay for them.
+
+    Args:
+        mcp: The FastMCP server to register on.
+        client (AirflowClient): Shared client; created on first use when omitted.
+    """
+
+    # Registration methods run by `register_all`, in order.
+    GROUPS = ("_dags", "_backfills", "_assets", "_connections", "_tasks_instance", "_server")
+
+    # Attribute -> (module, class) of the lazily built tool classes.
+    TOOL_CLASSES = {
+        "dags": ("tools.dags", "AirflowDAGs"),
+        "backfills": ("tools.backfills", "AirflowBackfills"),
+        "assets": ("tools.assets", "AirflowAssets"),
+        "connection": ("tools.connections", "AirflowConnection"),
+        "tasks_instance": ("tools.tasks_instance", "AirflowTasksInstance"),
+        "task_logs": ("tools.task_logs", "AirflowTaskLogs"),
+    }
+
+    def __init__(self, mcp, client=None):
+        from services.result_store import ResultStore
+        from services.sessions import SessionLimiter
 
         self.mcp = mcp
+        self.limiter = SessionLimiter()
+        self.results = ResultStore()
+        self._client = client
+        self._sessions = 0
+        self._federation = None
+        self._deployment_tools = {}
+
+    def register_all(self):
+        """Register every tool group in `GROUPS` with the MCP server."""
+        for group in self.GROUPS:
+            getattr(self, group)()
+
+    @property
+    def client(self):
+        """The pooled Airflow client shared by every tool class, created on first use."""
+        if self._client is None:
+            from services.airflow_client import AirflowClient
+
+            self._client = AirflowClient()
+        return self._client
+
+    @property
+    def federation(self):
+        """
+        The federated deployments from `_AIRFLOW_INSTANCES`, or None when none are configured.
+
+        Raises:
+            ValueError: If a listed deployment is misconfigured; the federated tools then fail
+                with that message rather than query the wrong Airflow.
+        """
+        if self._federation is None:
+            from services.federation import Federation
+
+            # False marks "checked, none configured" so the environment is read once.
+            self._federation = Federation.from_env(self.client.metrics, self.client.transport) or False
+        return self._federation or None
+
+    async def fan_out(self, instances: list[str] | None, attr: str, call, key: str, label: str = "value") -> dict:
+        """
+        Run `call` on the `attr` tool class of every selected deployment
+        concurrently and merge the instance-tagged results.
+        """
+        if self.federation is None:
+            return {"error": "No Airflow instances are configured (_AIRFLOW_INSTANCES)."}
+        try:
+            names = self.federation.select(instances)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        def tools(name):
+            if (name, attr) not in self._deployment_tools:
+                module, cls = self.TOOL_CLASSES[attr]
+                client = self.federation.clients[name]
+                self._deployment_tools[name, attr] = getattr(importlib.import_module(module), cls)(client)
+            return self._deployment_tools[name, attr]
+
+        outcomes = await self.federation.fan_out(names, lambda name: call(tools(name)))
+        return self.federation.merge(outcomes, key, label)
+
+    def __getattr__(self, name):
+        # Only called for missing attributes: build a tool class on first use and keep it.
+        if name not in self.TOOL_CLASSES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        module, cls = self.TOOL_CLASSES[name]
+        instance = getattr(importlib.import_module(module), cls)(self.client)
+        setattr(self, name, instance)
+        return instance
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Keep the shared client open while a session (or the HTTP server) runs,
+        without creating it; the pool is closed when the last holder exits.
+        """
+        self._sessions += 1
+        try:
+            yield
+        finally:
+            self._sessions -= 1
+            if self._sessions == 0 and self._client is not None:
+                await self._client.aclose()
+            if self._sessions == 0 and self._federation:
+                await self._federation.aclose()
+
+    def tool(self, name: str, paged: bool = True):
+        """
+        Register a tool with the MCP server, bounded by the per-session concurrency
+        limit and instrumented (latency, errors and upstream requests per call).
+        Oversized results are split into pages served by `fetch_more`, unless
+        `paged` is False; bare lists are then returned as `{"items": [...]}`.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                async with self.limiter.slot():
+                    with self.client.metrics.tool_call(name) as call:
+                        result = await fn(*args, **kwargs)
+                        call["error"] = isinstance(result, dict) and "error" in result
+                        return self.results.page(result) if paged else result
+
+            return self.mcp.tool(name)(wrapper)
+
+        return decorator
 
     #-------------------------------- Dags Registration ----------------------------------#
     def _dags(self):
-        @self.mcp.tool("get_dags_list")
-        async def get_dags_list():
-            """Get the list of all the Dags (see tools.get_dags_list for details)."""
-            return await self.dags.get_dags_list()
+        @self.tool("get_dags_list")
+        async def get_dags_list(instances: list[str] | None = None):
+            """Get the DAG IDs of all the Dags under `items`; with federated deployments, from all or the given `instances`, under `dags` (see tools.get_dags_list for details)."""
+            if self.federation is None and not instances:
+                return await self.dags.get_dags_list()
+            return await self.fan_out(instances, "dags", lambda dags: dags.get_dags_list(), "dags", "dag_id")
         
-        @self.mcp.tool("get_dag_details")
-        async def get_dag_details(dag_id: str):
-            """Get details of a specific DAG (see tools.get_dag_details for details)."""
-            return await self.dags.get_dag_details(dag_id)
+        @self.tool("search_dags")
+        async def search_dags(
+            tags: list[str] | None = None,
+            tags_match_mode: str = "any",
+            owner: str | None = None,
+            is_paused: bool | None = None,
+            dag_id_prefix: str | None = None,
+            limit: int = 100,
+            ):
+            """Search DAGs by tag, owner, paused state or DAG ID prefix from the local catalog (see tools.search_dags for details)."""
+            return await self.dags.search_dags(tags, tags_match_mode, owner, is_paused, dag_id_prefix, limit)
+
+        @self.tool("get_dag_details")
+        async def get_dag_details(dag_id: str, fields: list[str] | None = None):
+            """Get details of a specific DAG, optionally only the given fields (see tools.get_dag_details for details)."""
+            return await self.dags.get_dag_details(dag_id, fields)
         
-        @self.mcp.tool("get_dag_runs")
-        async def get_dag_runs(dag_id: str):
-            """Get all runs for a specific DAG (see tools.get_dag_runs for details)."""
-            return await self.dags.get_dag_runs(dag_id)
+        @self.tool("get_dag_runs")
+        async def get_dag_runs(
+            dag_id: str,
+            fields: list[str] | None = None,
+            output_format: str = "json",
+            instances: list[str] | None = None,
+            ):
+            """Get all runs for a specific DAG (under `items`, or as a table); `fields` and `output_format="table"` shrink the result, `instances` picks federated deployments (see tools.get_dag_runs for details)."""
+            if self.federation is None and not instances:
+                return await self.dags.get_dag_runs(dag_id, fields, output_format)
+            return await self.fan_out(
+                instances, "dags", lambda dags: dags.get_dag_runs(dag_id, fields, output_format), "dag_runs"
+            )
+
+        @self.tool("get_dag_run_summary")
+        async def get_dag_run_summary(
+            dag_ids: list[str] | None = None,
+            states: list[str] | None = None,
+            start_date_gte: str | None = None,
+            start_date_lte: str | None = None,
+            ):
+            """Count DAG runs per DAG and state with average/max duration (see tools.get_dag_run_summary for details)."""
+            return await self.dags.get_dag_run_summary(dag_ids, states, start_date_gte, start_date_lte)
+
+        @self.tool("get_dag_run_stats")
+        async def get_dag_run_stats(
+            dag_ids: list[str] | None = None,
+            start_date_gte: str | None = None,
+            start_date_lte: str | None = None,
+            z_threshold: float = 3.0,
+            max_anomalies: int = 5,
+            output_format: str = "json",
+            ):
+            """Per-DAG run duration percentiles, failure rate, duration trend and z-score/MAD anomalies over the whole run history (see tools.get_dag_run_stats for details)."""
+            return await self.dags.get_dag_run_stats(
+                dag_ids, start_date_gte, start_date_lte, z_threshold, max_anomalies, output_format
+            )
+
+        @self.tool("get_critical_path")
+        async def get_critical_path(dag_id: str, runs: int = 20, top: int = 10):
+            """Find a DAG's critical path over its last `runs` finished runs and rank the tasks that account for most of its wall time (see tools.get_critical_path for details)."""
+            return await self.dags.get_critical_path(dag_id, runs, top)
 
-        @self.mcp.tool("trigger_dag")
+        @self.tool("watch_dag_runs")
+        async def watch_dag_runs(
+            ctx: Context,
+            dag_ids: list[str],
+            timeout: float = 60.0,
+            include_task_instances: bool = True,
+            return_on_change: bool = False,
+            ):
+            """Follow DAG runs until they finish, returning only runs and task instances that changed since the last poll (see tools.watch_dag_runs for details)."""
+            return await self.dags.watch_dag_runs(
+                dag_ids,
+                timeout,
+                include_task_instances,
+                return_on_change,
+                session=self.limiter.current_session(),
+                progress=ctx.report_progress,
+            )
+
+        @self.tool("trigger_dag")
         async def trigger_dag(dag_id: str):
             """Triggers a DAG run (see tools.trigger_dag for details)."""
             return await self.dags.trigger_dag(dag_id)
         
-        @self.mcp.tool("clear_dag_run")
+        @self.tool("clear_dag_run")
         async def clear_dag_run(dag_id: str, dag_run_id: str, dry_run: bool = True, only_failed: bool = False):
             """Clears a specific DAG run (see tools.clear_dag_run for details)."""
             return await self.dags.clear_dag_run(dag_id, dag_run_id, dry_run, only_failed)
 
-        @self.mcp.tool("delete_dag")
+        @self.tool("delete_dag")
         async def delete_dag(dag_id: str):
             """Deletes a DAG from Airflow (see tools.delete_dag for details)."""
             return await self.dags.delete_dag(dag_id)
 
-        @self.mcp.tool("pause_all_dags")
-        async def pause_all_dags():
-            """Pauses all DAGs in Airflow (see tools.pause_all_dags for details)."""
-            return await self.dags.pause_all_dags(pause=True)
+        @self.tool("pause_all_dags")
+        async def pause_all_dags(
+            ctx: Context,
+            pause: bool = True,
+            tags: list[str] | None = None,
+            dag_id_prefix: str | None = None,
+            only_changed: bool = True,
+            ):
+            """Pauses (or unpauses) all DAGs in Airflow, optionally filtered by tag or DAG ID prefix (see tools.pause_all_dags for details)."""
+            return await self.dags.pause_all_dags(pause, tags, dag_id_prefix, only_changed, progress=ctx.report_progress)
         
     #-------------------------------- Tasks Registration ----------------------------------#
     def _tasks_instance(self):
-        @self.mcp.tool("get_task_instance")
-        async def get_task_instance(dag_id: str,run_id: str):
-            """Get a specific task instance (see tools.get_task_instance for details)."""
-            return await self.tasks_instance.get_task_instance(dag_id, run_id)
+        @self.tool("get_task_instance")
+        async def get_task_instance(dag_id: str,run_id: str, fields: list[str] | None = None, output_format: str = "json"):
+            """Get a specific task instance; `fields` and `output_format="table"` shrink the result (see tools.get_task_instance for details)."""
+            return await self.tasks_instance.get_task_instance(dag_id, run_id, fields=fields, output_format=output_format)
 
-        @self.mcp.tool("clear_task_instance")
+        @self.tool("get_task_instances_batch")
+        async def get_task_instances_batch(
+            dag_ids: list[str] | None = None,
+            dag_run_ids: list[str] | None = None,
+            states: list[str] | None = None,
+            task_ids: list[str] | None = None,
+            start_date_gte: str | None = None,
+            start_date_lte: str | None = None,
+            end_date_gte: str | None = None,
+            end_date_lte: str | None = None,
+            max_results: int = 10000,
+            fields: list[str] | None = None,
+            output_format: str = "json",
+            ):
+            """Get task instances for many DAGs/runs/states in one call (see tools.get_task_instances_batch for details)."""
+            return await self.tasks_instance.get_task_instances_batch(
+                dag_ids, dag_run_ids, states, task_ids, start_date_gte, start_date_lte, end_date_gte, end_date_lte, max_results,
+                fields, output_format,
+            )
+
+        @self.tool("get_task_instance_summary")
+        async def get_task_instance_summary(
+            dag_ids: list[str] | None = None,
+            states: list[str] | None = None,
+            start_date_gte: str | None = None,
+            start_date_lte: str | None = None,
+            ):
+            """Count task instances per DAG and state across all runs (see tools.get_task_instance_summary for details)."""
+            return await self.tasks_instance.get_task_instance_summary(dag_ids, states, start_date_gte, start_date_lte)
+
+        @self.tool("query_task_instances")
+        async def query_task_instances(
+            dag_ids: list[str] | None = None,
+            states: list[str] | None = None,
+            start_date_gte: str | None = None,
+            start_date_lte: str | None = None,
+            limit: int = 500,
+            ):
+            """List task instances across DAGs and runs, newest first (see tools.query_task_instances for details)."""
+            return await self.tasks_instance.query_task_instances(dag_ids, states, start_date_gte, start_date_lte, limit)
+
+        @self.tool("clear_task_instance")
         async def clear_task_instance(dag_id: str, dag_run_id:str, start_date: str, end_date: str):
             """Clears a specific task instance (see tools.clear_task_instance for details)."""
             return await self.tasks_instance.clear_task_instance(dag_id, dag_run_id, start_date)
 
+        @self.tool("get_task_logs")
+        async def get_task_logs(
+            dag_id: str,
+            dag_run_id: str,
+            task_id: str,
+            try_number: int | None = None,
+            map_index: int = -1,
+            tail_lines: int | None = None,
+            max_bytes: int | None = None,
+            grep: str | None = None,
+            ignore_case: bool = True,
+            ):
+            """Read a task's log page by page: head up to `max_bytes`, the last `tail_lines` lines, and/or only lines matching `grep` (see tools.get_task_logs for details)."""
+            return await self.task_logs.get_task_logs(
+                dag_id, dag_run_id, task_id, try_number, map_index, tail_lines, max_bytes, grep, ignore_case
+            )
+
     #-------------------------------- Backfills Registration ----------------------------------#
     def _backfills(self):
-        @self.mcp.tool("list_backfills")
-        async def list_backfills(dag_id: str):
+        @self.tool("list_backfills")
+        async def list_backfills(dag_id: str, fields: list[str] | None = None, output_format: str = "json"):
             """List backfills for a specific DAG (see tools.list_backfills for details)."""
-            return await self.backfills.list_backfills(dag_id)
+            return await self.backfills.list_backfills(dag_id, fields, output_format)
         
-        @self.mcp.tool("create_backfill")
+        @self.tool("create_backfill")
         async def create_backfill(
             dag_id: str,
             from_date: str,
@@ -86,38 +344,140 @@ class RegisterTools:
             return await self.backfills.create_backfill(
                 dag_id, from_date, to_date, run_backwards, reprocess_behavior, max_active_runs, dag_run_conf
             )
+
+        @self.tool("plan_backfill")
+        async def plan_backfill(
+            dag_ids: list[str],
+            from_date: str,
+            to_date: str,
+            partition_runs: int | None = None,
+            submit: bool = False,
+            run_backwards: bool = False,
+            reprocess_behavior: str = "none",
+            max_active_runs: int = 10,
+            dag_run_conf: dict | None = None,
+            ):
+            """Estimate a backfill's runs via dry run and split it into partitions; `submit=True` starts it (see tools.plan_backfill for details)."""
+            return await self.backfills.plan_backfill(
+                dag_ids, from_date, to_date, partition_runs, submit, run_backwards, reprocess_behavior, max_active_runs, dag_run_conf
+            )
+
+        @self.tool("backfill_progress")
+        async def backfill_progress(plan_id: str, advance: bool = True):
+            """Runs done/running/failed, percent done and ETA of a planned backfill; submits the next partitions (see tools.backfill_progress for details)."""
+            return await self.backfills.backfill_progress(plan_id, advance)
         
     #-------------------------------- Assets Registration ----------------------------------#
     def _assets(self):
-        @self.mcp.tool("get_assets")
-        async def get_assets():
-            """Fetch all Airflow assets (see tools.get_assets for details)."""
-            return await self.assets.get_assets()
+        @self.tool("get_assets")
+        async def get_assets(instances: list[str] | None = None):
+            """Fetch the names of all Airflow assets under `items`; with federated deployments, from all or the given `instances`, under `assets` (see tools.get_assets for details)."""
+            if self.federation is None and not instances:
+                return await self.assets.get_assets()
+            return await self.fan_out(instances, "assets", lambda assets: assets.get_assets(), "assets", "name")
+
+        @self.tool("asset_lineage")
+        async def asset_lineage(
+            asset: str,
+            direction: str = "downstream",
+            max_depth: int | None = None,
+            include_edges: bool = False,
+            ):
+            """Find the DAGs and assets downstream or upstream of an asset (name or URI), transitively, from the local lineage graph (see tools.asset_lineage for details)."""
+            return await self.assets.asset_lineage(asset, direction, max_depth, include_edges)
+
+        @self.tool("dag_lineage")
+        async def dag_lineage(
+            dag_id: str,
+            direction: str = "downstream",
+            max_depth: int | None = None,
+            include_edges: bool = False,
+            ):
+            """Find the assets and DAGs a DAG feeds (or depends on, with direction="upstream"), transitively (see tools.dag_lineage for details)."""
+            return await self.assets.dag_lineage(dag_id, direction, max_depth, include_edges)
         
     #-------------------------------- Connection Registration ----------------------------------#
     def _connections(self):
-        @self.mcp.tool("list_connections")
-        async def list_connections():
-            """List all Airflow connections (see tools.list_connections for details)."""
-            return await self.connection.list_connection()
+        @self.tool("list_connections")
+        async def list_connections(fields: list[str] | None = None, output_format: str = "json"):
+            """List all Airflow connections; `fields` and `output_format="table"` shrink the result (see tools.list_connections for details)."""
+            return await self.connection.list_connection(fields, output_format)
 
-        @self.mcp.tool("get_connection_details")
-        async def get_connection_details(conn_id: str):
-            """Get details of a specific Airflow connection (see tools.get_connection_details for details)."""
-            return await self.connection.get_connection_details(conn_id)
+        @self.tool("get_connection_details")
+        async def get_connection_details(conn_id: str, fields: list[str] | None = None):
+            """Get details of a specific Airflow connection, optionally only the given fields (see tools.get_connection_details for details)."""
+            return await self.connection.get_connection_details(conn_id, fields)
 
-        @self.mcp.tool("create_connection")
+        @self.tool("create_connection")
         async def create_connection(conn_id: str, conn_type: str, host: str, schema: str = "", login: str = "", password: str = "", port: int = 0):
             """Create a new Airflow connection (see tools.create_connection for details)."""
             return await self.connection.create_connection(conn_id, conn_type, host, schema, login, password, port)
         
-        @self.mcp.tool("update_connection")
+        @self.tool("update_connection")
         async def update_connection(conn_id: str, conn_type: str, host: str, schema: str = "", login: str = "", password: str = "", port: int = 0):
             """Update an existing Airflow connection (see tools.update_connection for details)."""
             return await self.connection.update_connection(conn_id, conn_type, host, schema, login, password, port)
 
-        @self.mcp.tool("delete_connection")
+        @self.tool("delete_connection")
         async def delete_connection(conn_id: str):
             """Delete an Airflow connection (see tools.delete_connection for details)."""
             return await self.connection.delete_connection(conn_id)
-        
\ No newline at end of file
+
+        @self.tool("sync_connections")
+        async def sync_connections(
+            connections: list[dict],
+            ctx: Context,
+            dry_run: bool = True,
+            delete_missing: bool = True,
+            update_secrets: bool = False,
+            ):
+            """Diff a full desired set of connections against Airflow and apply only the changes in bulk; previews by default (see tools.sync_connections for details)."""
+            return await self.connection.sync_connections(
+                connections, dry_run, delete_missing, update_secrets, progress=ctx.report_progress
+            )
+
+    #-------------------------------- Server Registration ----------------------------------#
+    def _server(self):
+        @self.tool("fetch_more", paged=False)
+        async def fetch_more(cursor: str):
+            """Fetch the next page of an oversized tool result from its `next_cursor`; pages are served from memory without querying Airflow again."""
+            return self.results.fetch(cursor)
+
+        @self.tool("cache_stats")
+        async def cache_stats():
+            """Report response cache hit/miss counters and size, plus coalesced requests, to help size the cache."""
+            return {**self.client.cache.stats(), **self.client.counters}
+
+        @self.tool("request_stats")
+        async def request_stats():
+            """Report upstream attempts, retries, hedges and deadline misses per Airflow endpoint."""
+            return self.client.endpoint_stats
+
+        def stats():
+            return {
+                **self.client.metrics.snapshot(),
+                "cache": self.client.cache.stats(),
+                "resilience": self.client.endpoint_stats,
+                "results": self.results.stats(),
+                **self.client.counters,
+            }
+
+        @self.tool("server_stats")
+        async def server_stats():
+            """Report per-tool latency percentiles, errors and upstream calls, per-endpoint latency, bytes and status codes, and cache/retry events."""
+            return stats()
+
+        @self.mcp.resource("stats://server", name="server_stats", mime_type="application/json")
+        def server_stats_resource() -> dict:
+            """Server statistics, the same as the `server_stats` tool."""
+            return stats()
+
+        @self.mcp.custom_route("/metrics", methods=["GET"])
+        async def metrics(request):
+            """Prometheus metrics, served by the HTTP transports."""
+            from starlette.responses import PlainTextResponse
+
+            if not self.client.metrics.enabled:
+                return PlainTextResponse("Metrics are disabled (_MCP_METRICS_ENABLED).", status_code=404)
+            body = self.client.metrics.prometheus(self.client.cache.stats(), self.client.endpoint_stats, self.client.counters)
+            return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,170 @@
+class AirflowTaskLogs:
+    """
+    Reads task instance logs via the Airflow REST API without holding whole logs in memory.
+
+    Args:
+        client: An asynchronous HTTP client with a method `api_request`
+                for making API calls to Airflow.
+    """
+
+    # Safety stop for logs that keep producing continuation tokens.
+    MAX_PAGES = 10_000
+
+    def __init__(self, client):
+        from services.settings import env_int
+
+        self.client = client
+        self.max_bytes = env_int("_AIRFLOW_LOG_MAX_BYTES", 65536)
+
+    @staticmethod
+    def render(entry) -> list[str]:
+        """Turn one log entry (a text chunk or a structured message) into lines."""
+        if isinstance(entry, dict):
+            level = entry.get("level")
+            parts = [entry.get("timestamp"), f"[{level}]" if level else None, entry.get("event")]
+            return [" ".join(str(part) for part in parts if part)]
+        return str(entry).splitlines()
+
+    async def iter_lines(self, endpoint: str, params: dict, stats: dict):
+        """
+        Yield the lines of a log page by page, following continuation tokens.
+
+        Stops when a page is empty or the token stops changing. `stats` counts
+        the pages read and tells whether the end of the log was reached.
+
+        Raises:
+            AirflowAPIError: If a page cannot be fetched.
+        """
+        from services.airflow_client import AirflowAPIError
+
+        token = None
+        for _ in range(self.MAX_PAGES):
+            query = {**params, "token": token} if token else params
+            response = await self.client.api_request(endpoint, "get", params=query, cache=False)
+            if self.client.is_error(response):
+                raise AirflowAPIError(response)
+            stats["pages"] += 1
+
+            content = response.get("content") or []
+            for entry in [content] if isinstance(content, str) else content:
+                for line in self.render(entry):
+                    yield line
+
+            next_token = response.get("continuation_token")
+            if not content or not next_token or next_token == token:
+                stats["end_of_log"] = True
+                return
+            token = next_token
+
+    async def get_task_logs(
+        self,
+        dag_id: str,
+        dag_run_id: str,
+        task_id: str,
+        try_number: int | None = None,
+        map_index: int = -1,
+        tail_lines: int | None = None,
+        max_bytes: int | None = None,
+        grep: str | None = None,
+        ignore_case: bool = True,
+    ):
+        """
+        Fetch a task instance's log, bounded to what fits in a response.
+
+        Pages are requested one continuation token at a time and filtered as
+        they arrive, so only the lines being returned are kept in memory:
+
+        - by default the head of the log, up to `max_bytes`; reading stops as
+          soon as the limit is reached;
+        - with `tail_lines`, the last N lines (still capped at `max_bytes`);
+        - with `grep`, only lines matching the regular expression, in either mode.
+
+        Args:
+            dag_id (str): The DAG ID.
+            dag_run_id (str): The DAG run ID.
+            task_id (str): The task ID.
+            try_number (int, optional): Attempt to read (default: the latest try).
+            map_index (int, optional): Map index of a mapped task (default: -1).
+            tail_lines (int, optional): Return only the last N (matching) lines.
+            max_bytes (int, optional): Maximum bytes of log returned
+                                       (default: `_AIRFLOW_LOG_MAX_BYTES`).
+            grep (str, optional): Regular expression lines must match, e.g. "ERROR|Traceback".
+            ignore_case (bool, optional): Case-insensitive `grep`. Defaults to True.
+
+        Returns:
+            dict: `log` (the selected lines joined by newlines), `try_number`,
+                  `truncated` (whether lines were dropped to honor the limits),
+                  `lines_scanned`, `lines_matched` (with `grep`), `pages` and
+                  `end_of_log`. If a request fails, returns the error response.
+        """
+        import re
+        from collections import deque
+        from contextlib import aclosing
+        from urllib.parse import quote
+
+        from services.airflow_client import AirflowAPIError
+
+        pattern = None
+        if grep:
+            try:
+                pattern = re.compile(grep, re.IGNORECASE if ignore_case else 0)
+            except re.error as e:
+                return {"error": f"Invalid grep pattern: {e}"}
+
+        task_instance = f"dags/{dag_id}/dagRuns/{quote(dag_run_id, safe='')}/taskInstances/{task_id}"
+
+        if try_number is None:
+            endpoint = f"{task_instance}/{map_index}" if map_index >= 0 else task_instance
+            instance = await self.client.api_request(endpoint, "get", cache=False)
+            if self.client.is_error(instance):
+                return instance
+            try_number = instance.get("try_number") or 1
+
+        limit = max_bytes or self.max_bytes
+        stats = {"pages": 0, "end_of_log": False}
+        lines = deque(maxlen=tail_lines) if tail_lines else []
+        scanned = matched = size = 0
+        truncated = False
+
+        params = {"full_content": "false", "map_index": map_index}
+        try:
+            async with aclosing(self.iter_lines(f"{task_instance}/logs/{try_number}", params, stats)) as log_lines:
+                async for line in log_lines:
+                    scanned += 1
+                    if pattern is not None and not pattern.search(line):
+                        continue
+                    matched += 1
+                    cost = len(line.encode()) + 1
+
+                    if tail_lines:
+                        if len(lines) == tail_lines:
+                            size -= len(lines[0].encode()) + 1
+                            truncated = True
+                        lines.append(line)
+                        size += cost
+                        while size > limit and lines:
+                            size -= len(lines.popleft().encode()) + 1
+                            truncated = True
+                    elif size + cost > limit:
+                        truncated = True
+                        break
+                    else:
+                        lines.append(line)
+                        size += cost
+        except AirflowAPIError as e:
+            return e.response
+
+        result = {
+            "dag_id": dag_id,
+            "dag_run_id": dag_run_id,
+            "task_id": task_id,
+            "try_number": try_number,
+            "log": "\n".join(lines),
+            "truncated": truncated,
+            "lines_scanned": scanned,
+            "pages": stats["pages"],
+            "end_of_log": stats["end_of_log"],
+        }
+        if pattern is not None:
+            result["lines_matched"] = matched
+        return result
@@ -15,7 +15,9 @@ class AirflowTasksInstance:
         dag_run_id: str,
         limit: int = 100,
         offset: int = 0,
-        order_by: str = "map_index"
+        order_by: str = "map_index",
+        fields: list[str] | None = None,
+        output_format: str = "json",
     ):
         """
         Fetch task instances for a given DAG run.
@@ -26,11 +28,14 @@ class AirflowTasksInstance:
             limit (int): Maximum number of results to return.
             offset (int): Number of items to skip.
             order_by (str): Field to order results by (default: 'map_index').
+            fields (list[str], optional): Task instance fields to return, e.g. ["task_id", "state"].
+            output_format (str): "json" (default) or "table" for `{columns, rows}`.
 
         Returns:
             dict: List of task instances or error message.
         """
         from urllib.parse import quote
+        from services.projection import shape
 
         encoded_dag_run_id = quote(dag_run_id, safe="")
 
@@ -44,7 +49,214 @@ class AirflowTasksInstance:
 
         response = await self.client.api_request(endpoint, method, params=params)
 
-        return response
+        return shape(response, fields, output_format, key="task_instances")
+
+    async def get_task_instances_batch(
+        self,
+        dag_ids: list[str] | None = None,
+        dag_run_ids: list[str] | None = None,
+        states: list[str] | None = None,
+        task_ids: list[str] | None = None,
+        start_date_gte: str | None = None,
+        start_date_lte: str | None = None,
+        end_date_gte: str | None = None,
+        end_date_lte: str | None = None,
+        max_results: int = 10000,
+        fields: list[str] | None = None,
+        output_format: str = "json",
+    ):
+        """
+        Fetch task instances across many DAGs and DAG runs in one call.
+
+        Sends POST requests to the batch `/dags/~/dagRuns/~/taskInstances/list`
+        endpoint, so the cost is one round trip per page of results rather than
+        one per DAG run. Pages are prefetched concurrently and merged, and
+        duplicates (the same task instance seen on two pages) are dropped.
+
+        Args:
+            dag_ids (list[str], optional): DAG IDs to include (default: all).
+            dag_run_ids (list[str], optional): DAG run IDs to include (default: all).
+            states (list[str], optional): Task instance states, e.g. ["failed", "up_for_retry"].
+            task_ids (list[str], optional): Task IDs to include (default: all).
+            start_date_gte (str, optional): ISO 8601 lower bound on start date.
+            start_date_lte (str, optional): ISO 8601 upper bound on start date.
+            end_date_gte (str, optional): ISO 8601 lower bound on end date.
+            end_date_lte (str, optional): ISO 8601 upper bound on end date.
+            max_results (int): Stop after this many task instances (default: 10000).
+            fields (list[str], optional): Task instance fields to return, e.g. ["task_id", "state"].
+            output_format (str): "json" (default) or "table" for `{columns, rows}`.
+
+        Returns:
+            dict: `task_instances` (merged and deduplicated), `total_entries` and
+                  `truncated`, or the error response.
+        """
+        from services.airflow_client import AirflowAPIError
+        from services.projection import shape
+
+        body = {
+            "dag_ids": dag_ids,
+            "dag_run_ids": dag_run_ids,
+            "state": states,
+            "task_ids": task_ids,
+            "start_date_gte": start_date_gte,
+            "start_date_lte": start_date_lte,
+            "end_date_gte": end_date_gte,
+            "end_date_lte": end_date_lte,
+        }
+        body = {k: v for k, v in body.items() if v is not None}
+
+        seen = set()
+        task_instances = []
+        truncated = False
+        stream = self.client.stream("dags/~/dagRuns/~/taskInstances/list", "task_instances", method="post", json=body)
+        try:
+            async for task_instance in stream:
+                identity = (
+                    task_instance.get("dag_id"),
+                    task_instance.get("dag_run_id"),
+                    task_instance.get("task_id"),
+                    task_instance.get("map_index", -1),
+                )
+                if identity in seen:
+                    continue
+                if len(task_instances) >= max_results:
+                    truncated = True
+                    break
+                seen.add(identity)
+                task_instances.append(task_instance)
+        except AirflowAPIError as e:
+            return e.response
+        finally:
+            await stream.aclose()
+
+        response = {"task_instances": task_instances, "total_entries": len(task_instances), "truncated": truncated}
+        return shape(response, fields, output_format, key="task_instances")
+
+    def _rest_task_instances(
+        self,
+        dag_ids: list[str] | None = None,
+        states: list[str] | None = None,
+        start_date_gte: str | None = None,
+        start_date_lte: str | None = None,
+    ):
+        """Stream task instances over REST, one paginated listing per DAG (or all DAGs via `~`)."""
+        params = {"order_by": "-start_date"}
+        if states:
+            params["state"] = states
+        if start_date_gte:
+            params["start_date_gte"] = start_date_gte
+        if start_date_lte:
+            params["start_date_lte"] = start_date_lte
+
+        async def rows():
+            for dag_id in dag_ids or ["~"]:
+                async for task_instance in self.client.stream(
+                    f"dags/{dag_id}/dagRuns/~/taskInstances", "task_instances", params
+                ):
+                    yield task_instance
+
+        return rows()
+
+    async def get_task_instance_summary(
+        self,
+        dag_ids: list[str] | None = None,
+        states: list[str] | None = None,
+        start_date_gte: str | None = None,
+        start_date_lte: str | None = None,
+    ):
+        """
+        Summarize task instances per DAG and state across all runs.
+
+        Answers historical questions such as "failed task instances across all
+        DAGs in the last 7 days" in one aggregate query when the metadata DB
+        fast path is configured; otherwise the task instances are streamed over
+        REST and aggregated on the fly.
+
+        Args:
+            dag_ids (list[str], optional): Only these DAGs (default: all DAGs).
+            states (list[str], optional): Only these states, e.g. ["failed"].
+            start_date_gte (str, optional): ISO 8601 lower bound on start date.
+            start_date_lte (str, optional): ISO 8601 upper bound on start date.
+
+        Returns:
+            dict: `backend` ("metadata_db" or "rest") and `summary`, a list of
+                  `{dag_id, state, count, avg_duration, max_duration}` rows.
+        """
+        from services.airflow_client import AirflowAPIError
+        from services.metadata_db import summarize
+
+        filters = {"dag_ids": dag_ids, "states": states, "start_date_gte": start_date_gte, "start_date_lte": start_date_lte}
+
+        db = self.client.metadata_db
+        if db.enabled:
+            try:
+                return {"backend": "metadata_db", "summary": await db.task_instance_summary(**filters)}
+            except Exception as e:
+                db.warn_fallback(e)
+
+        try:
+            return {"backend": "rest", "summary": await summarize(self._rest_task_instances(**filters))}
+        except AirflowAPIError as e:
+            return e.response
+
+    async def query_task_instances(
+        self,
+        dag_ids: list[str] | None = None,
+        states: list[str] | None = None,
+        start_date_gte: str | None = None,
+        start_date_lte: str | None = None,
+        limit: int = 500,
+    ):
+        """
+        List task instances across DAGs and runs, newest first.
+
+        Uses a server-side cursor on the metadata DB when configured, falling
+        back to paginated REST listings.
+
+        Args:
+            dag_ids (list[str], optional): Only these DAGs (default: all DAGs).
+            states (list[str], optional): Only these states, e.g. ["failed"].
+            start_date_gte (str, optional): ISO 8601 lower bound on start date.
+            start_date_lte (str, optional): ISO 8601 upper bound on start date.
+            limit (int): Maximum number of task instances returned (default: 500).
+
+        Returns:
+            dict: `backend` and `task_instances`, each with dag_id, dag_run_id, task_id,
+                  map_index, state, try_number, dates, duration, operator and hostname.
+        """
+        from services.airflow_client import AirflowAPIError
+
+        filters = {"dag_ids": dag_ids, "states": states, "start_date_gte": start_date_gte, "start_date_lte": start_date_lte}
+
+        db = self.client.metadata_db
+        if db.enabled:
+            try:
+                rows = [row async for row in db.task_instances(limit, **filters)]
+                return {"backend": "metadata_db", "task_instances": rows}
+            except Exception as e:
+                db.warn_fallback(e)
+
+        fields = (
+            "dag_id", "dag_run_id", "task_id", "map_index", "state", "try_number",
+            "start_date", "end_date", "duration", "operator", "hostname",
+        )
+        rows = []
+        try:
+            # Each DAG listing is already newest first, so `limit` rows per DAG suffice.
+            for dag_id in dag_ids or [None]:
+                stream = self._rest_task_instances([dag_id] if dag_id else None, states, start_date_gte, start_date_lte)
+                count = 0
+                async for task_instance in stream:
+                    rows.append({field: task_instance.get(field) for field in fields})
+                    count += 1
+                    if count >= limit:
+                        await stream.aclose()
+                        break
+        except AirflowAPIError as e:
+            return e.response
+
+        rows.sort(key=lambda row: row["start_date"] or "", reverse=True)
+        return {"backend": "rest", "task_instances": rows[:limit]}
 
     async def clear_task_instance(
         self,
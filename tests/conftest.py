@@ -0,0 +1,171 @@
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "server"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_airflow import FakeAirflow  # noqa: E402
+from services.airflow_client import AirflowClient  # noqa: E402
+from services.metadata_db import MetadataDB  # noqa: E402
+
+# The subset of the Airflow metadata schema the MetadataDB queries read.
+SCHEMA = """
+CREATE TABLE dag_run (dag_id TEXT, run_id TEXT, state TEXT, start_date TEXT, end_date TEXT);
+CREATE TABLE task_instance (
+    dag_id TEXT, run_id TEXT, task_id TEXT, map_index INTEGER, state TEXT, try_number INTEGER,
+    start_date TEXT, end_date TEXT, duration REAL, operator TEXT, hostname TEXT
+);
+"""
+
+
+def to_sqlite(sql: str, params: dict | None) -> tuple[str, dict]:
+    """Rewrite the Postgres constructs used by MetadataDB into SQLite."""
+    params = dict(params or {})
+    for name, value in params.items():
+        if isinstance(value, list):
+            params[name] = json.dumps(value)
+    sql = re.sub(r"= ANY\(%\((\w+)\)s\)", r"IN (SELECT value FROM json_each(:\1))", sql)
+    sql = re.sub(r"%\((\w+)\)s", r":\1", sql)
+    sql = re.sub(r"EXTRACT\(EPOCH FROM ([\w.]+) - ([\w.]+)\)", r"((julianday(\1) - julianday(\2)) * 86400.0)", sql)
+    sql = re.sub(r"EXTRACT\(EPOCH FROM ([\w.]+)\)", r"((julianday(\1) - 2440587.5) * 86400.0)", sql)
+    return sql, params
+
+
+class Column:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class SQLiteCursor:
+    """psycopg2-style cursor over sqlite3; remembers whether it was a named (server-side) cursor."""
+
+    def __init__(self, connection: sqlite3.Connection, name: str | None, log: list):
+        self._cursor = connection.cursor()
+        self.name = name
+        self.itersize = 2000
+        self.log = log
+
+    @property
+    def description(self):
+        return [Column(column[0]) for column in self._cursor.description]
+
+    def execute(self, sql, params=None):
+        self.log.append(("execute", self.name))
+        self._cursor.execute(*to_sqlite(sql, params))
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        self.log.append(("fetchmany", self.name))
+        return self._cursor.fetchmany(size)
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path: Path, log: list):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self.log = log
+        self.readonly = False
+
+    def set_session(self, readonly=False):
+        self.readonly = readonly
+
+    def cursor(self, name=None):
+        return SQLiteCursor(self._connection, name, self.log)
+
+    def rollback(self):
+        self._connection.rollback()
+
+
+class SQLitePool:
+    """Stands in for psycopg2's ThreadedConnectionPool."""
+
+    def __init__(self, path: Path, log: list):
+        self.path = path
+        self.log = log
+        self.closed = False
+
+    def getconn(self):
+        return SQLiteConnection(self.path, self.log)
+
+    def putconn(self, connection):
+        assert connection.readonly, "metadata DB sessions must be read-only"
+
+    def closeall(self):
+        self.closed = True
+
+
+class BrokenPool(SQLitePool):
+    def getconn(self):
+        raise sqlite3.OperationalError("could not connect to server")
+
+
+class SQLiteMetadataDB(MetadataDB):
+    """MetadataDB whose connection pool is a SQLite file loaded with the fake's data."""
+
+    def __init__(self, pool):
+        super().__init__(dsn="sqlite-stand-in")
+        self._pool = pool
+        self.log = pool.log
+
+    def _get_pool(self):
+        return self._pool
+
+
+def load(fake: FakeAirflow, path: Path) -> None:
+    """Copy the fake API's DAG runs and task instances into the metadata tables."""
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    for dag_id in fake.dags:
+        for run in fake._dag_runs(dag_id):
+            connection.execute(
+                "INSERT INTO dag_run VALUES (?, ?, ?, ?, ?)",
+                (dag_id, run["dag_run_id"], run["state"], run["start_date"], run["end_date"]),
+            )
+            for ti in fake._run_task_instances(dag_id, run):
+                connection.execute(
+                    "INSERT INTO task_instance VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        dag_id, run["dag_run_id"], ti["task_id"], ti["map_index"], ti["state"], ti["try_number"],
+                        ti["start_date"], ti["end_date"], ti["duration"], ti.get("operator"), ti.get("hostname"),
+                    ),
+                )
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def fake():
+    return FakeAirflow(dags=4, runs_per_dag=6, tasks_per_dag=3, connections=5, assets=5, backfills=0)
+
+
+@pytest.fixture
+def client(fake):
+    return AirflowClient(transport=fake.transport())
+
+
+@pytest.fixture
+def metadata_db(fake, tmp_path):
+    path = tmp_path / "airflow.db"
+    load(fake, path)
+    return SQLiteMetadataDB(SQLitePool(path, []))
+
+
+@pytest.fixture
+def broken_metadata_db(tmp_path):
+    return SQLiteMetadataDB(BrokenPool(tmp_path / "missing.db", []))
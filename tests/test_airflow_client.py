@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+
+from services.airflow_client import AirflowClient
+
+
+def refusing(fake):
+    """A transport that issues tokens but refuses every API connection."""
+    attempts = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("auth/token"):
+            return await fake.handle(request)
+        attempts.append(request.url.path)
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    return httpx.MockTransport(handle), attempts
+
+
+def test_transport_error_is_reported_when_the_deadline_stops_retries(fake):
+    transport, attempts = refusing(fake)
+    client = AirflowClient(transport=transport)
+    client._backoff = lambda attempt, response=None: 5.0
+
+    # The first backoff would cross the deadline, and no response was ever received.
+    response = asyncio.run(client.api_request("dags", "get", cache=False, retries=3, deadline=1, hedge_after=0))
+
+    assert response == {"error": "Connection refused", "transport_error": True}
+    assert len(attempts) == 1
+
+
+def test_transport_error_is_reported_after_the_last_retry(fake):
+    transport, attempts = refusing(fake)
+    client = AirflowClient(transport=transport)
+
+    response = asyncio.run(client.api_request("dags", "get", cache=False, retries=1, deadline=30, hedge_after=0))
+
+    assert response == {"error": "Connection refused", "transport_error": True}
+    assert len(attempts) == 2
@@ -0,0 +1,73 @@
+import asyncio
+
+from services.backfill_planner import BackfillPlanner
+
+FROM, TO = "2020-01-01T00:00:00Z", "2020-01-10T00:00:00Z"
+
+
+def test_partition_splits_dates_into_contiguous_slices():
+    dates = [f"2020-01-{day:02d}" for day in range(1, 11)]
+
+    partitions = BackfillPlanner.partition(dates, 4)
+
+    assert [(p.from_date, p.to_date, p.runs) for p in partitions] == [
+        ("2020-01-01", "2020-01-04", 4),
+        ("2020-01-05", "2020-01-08", 4),
+        ("2020-01-09", "2020-01-10", 2),
+    ]
+    assert BackfillPlanner.partition([], 4) == []
+
+
+def test_plan_partitions_every_dag_from_its_dry_run(client, fake):
+    dag_ids = list(fake.dags)[:2]
+
+    plan = asyncio.run(BackfillPlanner(client).plan(dag_ids + ["no_such_dag"], FROM, TO, {}, partition_runs=4))
+
+    assert plan["estimated_runs"] == 20
+    assert [p["runs"] for p in plan["partitions"][dag_ids[0]]] == [4, 4, 2]
+    assert [error["dag_id"] for error in plan["errors"]] == ["no_such_dag"]
+    # Planning alone submits nothing.
+    assert fake.requests["POST backfills"] == 0
+
+
+def test_plan_orders_partitions_backwards_for_run_backwards(client, fake):
+    dag_id = next(iter(fake.dags))
+
+    plan = asyncio.run(BackfillPlanner(client).plan([dag_id], FROM, TO, {"run_backwards": True}, partition_runs=4))
+
+    assert [p["from_date"] for p in plan["partitions"][dag_id]] == [
+        "2020-01-09T00:00:00Z", "2020-01-05T00:00:00Z", "2020-01-01T00:00:00Z",
+    ]
+
+
+def test_progress_submits_one_partition_per_dag_at_a_time(client, fake):
+    dag_ids = list(fake.dags)[:2]
+    planner = BackfillPlanner(client)
+
+    async def scenario():
+        plan = await planner.plan(dag_ids, FROM, TO, {}, partition_runs=4, submit=True)
+        submitted_first = fake.requests["POST backfills"]
+        reports = []
+        while len(reports) < 10:
+            reports.append(await planner.progress(plan["plan_id"]))
+            if reports[-1]["partitions"]["completed"] == 6:
+                break
+        # Runs are listed before the backfills, so the last completions show up on the next call.
+        reports.append(await planner.progress(plan["plan_id"]))
+        return plan, submitted_first, reports
+
+    plan, submitted_first, reports = asyncio.run(scenario())
+
+    assert plan["submitted"]["succeeded"] == 2
+    assert submitted_first == 2
+    # Each progress call completes the running backfills and submits the next partitions.
+    assert reports[0]["partitions"] == {"pending": 2, "submitted": 2, "completed": 2}
+    assert reports[-1]["partitions"] == {"pending": 0, "submitted": 0, "completed": 6}
+    assert reports[-1]["done"] == 20
+    assert reports[-1]["percent_done"] == 100.0
+    assert fake.requests["POST backfills"] == 6
+    assert "errors" not in reports[-1]
+
+
+def test_progress_of_an_unknown_plan_is_an_error(client):
+    assert "error" in asyncio.run(BackfillPlanner(client).progress("missing"))
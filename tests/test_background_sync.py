@@ -0,0 +1,55 @@
+import asyncio
+
+from services.asset_lineage import AssetLineage
+from services.dag_catalog import DagCatalog
+
+
+def test_lineage_refresh_relinks_only_changed_assets(client, fake):
+    async def scenario():
+        lineage = AssetLineage(client)
+        first = await lineage.sync()
+        fake.assets[0]["scheduled_dags"] = [{"dag_id": "dag_00003", "asset_id": 1}]
+        del fake.assets[-1]
+        fake.requests.clear()
+        second = await lineage.sync()
+        return lineage, first, second
+
+    lineage, first, second = asyncio.run(scenario())
+
+    assert first == {"added": 5, "updated": 0, "removed": 0, "total": 5}
+    assert second == {"added": 0, "updated": 1, "removed": 1, "total": 4}
+    # A full refresh: the whole asset listing is read again.
+    assert fake.requests["GET assets"] == 1
+    assert lineage.traverse(asset="asset_0000", max_depth=1)["dags"] == [{"dag_id": "dag_00003", "depth": 1}]
+
+
+def test_background_refresh_runs_until_the_client_closes(client, fake):
+    async def scenario():
+        catalog = DagCatalog(client, refresh_interval=0.01)
+        lineage = AssetLineage(client, refresh_interval=0.01)
+        await asyncio.gather(catalog.ensure_started(), lineage.ensure_started())
+        fake.dags["dag_00001"]["is_paused"] = not fake.dags["dag_00001"]["is_paused"]
+        fake.assets.pop()
+        await asyncio.sleep(0.1)
+        tasks = [catalog._task, lineage._task]
+        await client.aclose()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return catalog, lineage, tasks
+
+    catalog, lineage, tasks = asyncio.run(scenario())
+
+    assert catalog._records["dag_00001"]["is_paused"] == fake.dags["dag_00001"]["is_paused"]
+    assert len(lineage._assets) == 4
+    assert all(task.cancelled() for task in tasks)
+    assert catalog._task is None and lineage._task is None
+
+
+def test_concurrent_first_calls_share_one_initial_sync(client, fake):
+    async def scenario():
+        lineage = AssetLineage(client)
+        await asyncio.gather(*(lineage.ensure_started() for _ in range(5)))
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+    assert fake.requests["GET assets"] == 1
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+
+from services.airflow_client import AirflowClient
+from services.cache import ResponseCache
+
+
+def expire(client: AirflowClient) -> None:
+    """Age every cached entry past its TTL."""
+    for entry in client.cache._entries.values():
+        entry.expires_at = 0
+
+
+def test_fresh_entry_is_served_without_a_request(fake):
+    client = AirflowClient(transport=fake.transport())
+
+    async def main():
+        return [await client.api_request("dags", "get") for _ in range(3)]
+
+    first, second, third = asyncio.run(main())
+
+    assert first == second == third
+    assert fake.requests["GET dags"] == 1
+    assert client.cache.counters["hits"] == 2
+
+
+def test_expired_entry_is_revalidated_with_its_etag(fake):
+    sent = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("auth/token"):
+            sent.append(request.headers.get("if-none-match"))
+        return await fake.handle(request)
+
+    client = AirflowClient(transport=httpx.MockTransport(handle))
+
+    async def main():
+        first = await client.api_request("dags", "get")
+        expire(client)
+        return first, await client.api_request("dags", "get")
+
+    first, second = asyncio.run(main())
+
+    assert second == first
+    assert sent[0] is None and sent[1] is not None
+    assert client.cache.counters["revalidated"] == 1
+    # The 304 renewed the entry, so the next read is a plain hit.
+    assert next(iter(client.cache._entries.values())).fresh
+
+
+def test_expired_entry_is_replaced_when_the_resource_changed(fake):
+    client = AirflowClient(transport=fake.transport())
+    dag_id = next(iter(fake.dags))
+
+    async def main():
+        await client.api_request(f"dags/{dag_id}", "get")
+        fake.dags[dag_id]["description"] = "changed"
+        expire(client)
+        return await client.api_request(f"dags/{dag_id}", "get")
+
+    dag = asyncio.run(main())
+
+    assert dag["description"] == "changed"
+    assert client.cache.counters["revalidated"] == 0
+
+
+def test_mutation_invalidates_the_resource_and_its_listing(fake):
+    client = AirflowClient(transport=fake.transport())
+    dag_id = next(iter(fake.dags))
+
+    async def main():
+        await client.api_request("dags", "get")
+        await client.api_request(f"dags/{dag_id}", "get")
+        await client.api_request(f"dags/{dag_id}", "patch", json={"is_paused": True})
+        return await client.api_request(f"dags/{dag_id}", "get")
+
+    dag = asyncio.run(main())
+
+    assert dag["is_paused"] is True
+    assert client.cache.counters["invalidations"] == 2
+    assert fake.requests["GET dags/{dag_id}"] == 2
+
+
+def test_ttl_patterns_match_one_segment_per_wildcard():
+    cache = ResponseCache(ttls={"dags": 15, "dags/*/tasks": 300}, enabled=True)
+
+    assert cache.ttl_for("dags") == 15
+    assert cache.ttl_for("/dags/etl/tasks") == 300
+    assert cache.ttl_for("dags/etl") == 0
+    assert cache.ttl_for("dags/etl/tasks/extract") == 0
+    assert ResponseCache(enabled=False).ttl_for("dags") == 0
+
+
+def test_least_recently_used_entries_are_evicted_over_max_bytes():
+    cache = ResponseCache(max_bytes=400, ttls={"dags/*": 60}, enabled=True)
+    body = httpx.Response(200, content=b"x" * 100)
+
+    for dag_id in ("a", "b", "c"):
+        cache.put(f"dags/{dag_id}?", f"dags/{dag_id}", body, 60)
+    cache.get("dags/a?")
+    cache.put("dags/d?", "dags/d", body, 60)
+    cache.put("dags/e?", "dags/e", body, 60)
+
+    assert cache.get("dags/a?") is not None
+    assert cache.get("dags/b?") is None
+    assert cache.counters["evictions"] == 1
+    # Bodies over a quarter of the budget are never cached.
+    cache.put("dags/big?", "dags/big", httpx.Response(200, content=b"x" * 101), 60)
+    assert cache.get("dags/big?") is None
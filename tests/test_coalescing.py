@@ -0,0 +1,76 @@
+import asyncio
+
+from fake_airflow import FakeAirflow
+from services.airflow_client import AirflowClient
+
+
+def slow_fake() -> FakeAirflow:
+    # Enough latency for concurrent callers to overlap.
+    return FakeAirflow(dags=4, runs_per_dag=6, tasks_per_dag=3, connections=5, assets=5, latency=0.05)
+
+
+def test_identical_concurrent_gets_share_one_request():
+    fake = slow_fake()
+    client = AirflowClient(transport=fake.transport())
+
+    async def main():
+        return await asyncio.gather(*(client.api_request("dags", "get", cache=False) for _ in range(5)))
+
+    responses = asyncio.run(main())
+
+    assert fake.requests["GET dags"] == 1
+    assert client.counters["coalesced_requests"] == 4
+    assert all(response == responses[0] for response in responses)
+    # Every caller decodes its own copy, so one caller's edits don't leak to the others.
+    assert len({id(response) for response in responses}) == 5
+
+
+def test_gets_with_different_params_are_not_coalesced():
+    fake = slow_fake()
+    client = AirflowClient(transport=fake.transport())
+
+    async def main():
+        await asyncio.gather(
+            client.api_request("dags", "get", cache=False, params={"limit": 1}),
+            client.api_request("dags", "get", cache=False, params={"limit": 2}),
+        )
+
+    asyncio.run(main())
+
+    assert fake.requests["GET dags"] == 2
+    assert client.counters["coalesced_requests"] == 0
+
+
+def test_mutations_are_never_coalesced():
+    fake = slow_fake()
+    client = AirflowClient(transport=fake.transport())
+    dag_id = next(iter(fake.dags))
+
+    async def main():
+        await asyncio.gather(
+            *(client.api_request(f"dags/{dag_id}", "patch", json={"is_paused": True}) for _ in range(3))
+        )
+
+    asyncio.run(main())
+
+    assert fake.requests["PATCH dags/{dag_id}"] == 3
+    assert client.counters["coalesced_requests"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_request():
+    fake = slow_fake()
+    client = AirflowClient(transport=fake.transport())
+
+    async def main():
+        first = asyncio.create_task(client.api_request("dags", "get", cache=False))
+        second = asyncio.create_task(client.api_request("dags", "get", cache=False))
+        while not client.counters["coalesced_requests"]:
+            await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    response = asyncio.run(main())
+
+    assert "dags" in response
+    assert fake.requests["GET dags"] == 1
+    assert client.counters["coalesced_requests"] == 1
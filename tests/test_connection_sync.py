@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+
+from services.airflow_client import AirflowClient
+from services.bulk import BulkExecutor
+from services.connection_sync import ConnectionSync
+from tools.connections import AirflowConnection
+
+
+def without_bulk_endpoint(fake, failures: dict):
+    """A transport with no bulk PATCH /connections, failing the first requests listed in `failures`."""
+    async def handle(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "PATCH" and path.endswith("/connections"):
+            return httpx.Response(405, json={"detail": "Method Not Allowed"})
+        outcome = failures.get((request.method, path.rsplit("/", 1)[-1]))
+        if outcome:
+            failure = outcome.pop(0)
+            if failure == "refused":
+                raise httpx.ConnectError("Connection refused", request=request)
+            if failure == "timeout after commit":
+                await fake.handle(request)
+                raise httpx.ReadTimeout("Read timed out", request=request)
+            return httpx.Response(failure, json={"detail": f"HTTP {failure}"})
+        return await fake.handle(request)
+
+    return httpx.MockTransport(handle)
+
+
+def entity(conn_id: str) -> dict:
+    return ConnectionSync.entity({"connection_id": conn_id, "conn_type": "http", "host": f"{conn_id}.internal"})
+
+
+def test_per_connection_changes_are_judged_by_http_status(fake):
+    existing = list(fake.connections)
+    failures = {
+        ("PATCH", existing[0]): [503],  # transient: retried
+        ("PATCH", existing[1]): [400],  # rejected: final
+        ("DELETE", existing[2]): ["refused"],  # transport failure: retried
+    }
+    sync = per_connection(fake, failures)
+
+    result = asyncio.run(sync.apply(
+        {"create": [entity("new_conn")], "update": [entity(existing[0]), entity(existing[1])]},
+        [existing[2], "missing_conn"],
+    ))
+
+    assert result["method"] == "per_connection"
+    assert (result["create"]["succeeded"], result["create"]["failed"]) == (1, 0)  # 201
+    assert (result["update"]["succeeded"], result["update"]["failed"]) == (1, 1)  # 200 after a retry, then 400
+    assert (result["delete"]["succeeded"], result["delete"]["failed"]) == (1, 1)  # 204 after a retry, then 404
+    assert "new_conn" in fake.connections and existing[2] not in fake.connections
+    assert all(not outcome for outcome in failures.values())
+
+
+def per_connection(fake, failures: dict) -> ConnectionSync:
+    client = AirflowClient(transport=without_bulk_endpoint(fake, failures))
+    client.retries = 0
+    sync = ConnectionSync(client)
+    sync.bulk = BulkExecutor(rate=0, backoff=0)
+    return sync
+
+
+def test_create_committed_before_a_timeout_counts_as_created(fake):
+    failures = {("POST", "connections"): ["timeout after commit"]}
+    sync = per_connection(fake, failures)
+
+    result = asyncio.run(sync.apply({"create": [entity("new_conn")], "update": []}, []))
+
+    # The retry is rejected with 409 because the first attempt went through.
+    assert (result["create"]["succeeded"], result["create"]["failed"]) == (1, 0)
+    assert fake.requests["POST connections"] == 2
+
+
+def test_create_is_not_retried_after_a_server_error(fake):
+    failures = {("POST", "connections"): [503]}
+    sync = per_connection(fake, failures)
+
+    result = asyncio.run(sync.apply({"create": [entity("new_conn")], "update": []}, []))
+
+    assert (result["create"]["succeeded"], result["create"]["failed"]) == (0, 1)
+    assert fake.requests["POST connections"] == 0  # the 503 was served before reaching the fake
+
+
+def test_omitted_password_is_left_unchanged(client, fake):
+    conn_id, stored = next(iter(fake.connections.items()))
+    assert stored["password"] == "***"
+    desired = [{**{k: v for k, v in stored.items() if k != "password"}, "host": "moved.internal"}]
+
+    result = asyncio.run(AirflowConnection(client).sync_connections(desired, dry_run=False, delete_missing=False))
+
+    assert result["update"] == [{"connection_id": conn_id, "changed": ["host"]}]
+    assert "secrets_unverified" not in result
+    assert fake.connections[conn_id]["host"] == "moved.internal"
+    assert fake.connections[conn_id]["password"] == "***"
+
+
+def test_retryable_failures_depend_on_idempotency():
+    retryable = BulkExecutor.is_retryable
+
+    assert retryable({"error": "Connection refused", "transport_error": True})
+    assert retryable({"status": 429, "error": "Too Many Requests"})
+    assert retryable({"status": 500, "error": ""}) and retryable({"status": 503, "error": ""})
+    assert not retryable({"status": 400, "error": "Bad Request"})
+    assert not retryable({"status": 409, "error": "Conflict"})
+    assert not retryable({"error": "Invalid HTTP method: FETCH"})
+    assert not retryable("Not found")
+
+    assert retryable({"error": "Read timed out", "transport_error": True}, idempotent=False)
+    assert retryable({"status": 429, "error": ""}, idempotent=False)
+    assert not retryable({"status": 503, "error": ""}, idempotent=False)
@@ -0,0 +1,88 @@
+import asyncio
+
+from services.critical_path import RunTimings, TaskGraph, analyze
+from services.models import TaskInstance
+from tools.dags import AirflowDAGs
+
+# a -> (b, c) -> d
+GRAPH = TaskGraph([
+    {"task_id": "a", "downstream_task_ids": ["b", "c"]},
+    {"task_id": "b", "downstream_task_ids": ["d"]},
+    {"task_id": "c", "downstream_task_ids": ["d"]},
+    {"task_id": "d", "downstream_task_ids": []},
+])
+
+
+def at(seconds: float) -> str:
+    return f"2024-01-01T00:{int(seconds) // 60:02d}:{int(seconds) % 60:02d}+00:00"
+
+
+def timings(spans: dict[str, dict[str, tuple[float, float]]]) -> RunTimings:
+    """Build timings from `{run_id: {task_id: (start, end)}}`, every run starting at 0."""
+    result = RunTimings(GRAPH, [(run_id, at(0)) for run_id in spans])
+    for run_id, tasks in spans.items():
+        for task_id, (start, end) in tasks.items():
+            result.add(TaskInstance(task_id=task_id, dag_id="dag", dag_run_id=run_id, start_date=at(start), end_date=at(end)))
+    return result
+
+
+def test_graph_records_upstream_tasks():
+    assert GRAPH.upstream == [(), (0,), (0,), (1, 2)]
+
+
+def test_critical_path_follows_the_upstream_that_finished_last():
+    run = timings({"r1": {"a": (0, 10), "b": (10, 40), "c": (12, 20), "d": (45, 50)}})
+
+    wall, path = run.critical_path(0)
+
+    assert wall == 50
+    # d waited 5s after b, its last upstream, finished; c is off the path.
+    assert [(GRAPH.task_ids[task], running, waiting) for task, running, waiting in path] == [
+        ("a", 10, 0), ("b", 30, 0), ("d", 5, 5),
+    ]
+    assert sum(running + waiting for _, running, waiting in path) == wall
+
+
+def test_mapped_task_instances_widen_one_span():
+    run = timings({"r1": {"a": (0, 10)}})
+    run.add(TaskInstance(task_id="a", dag_id="dag", dag_run_id="r1", map_index=1, start_date=at(5), end_date=at(30)))
+
+    assert run.durations(0) == [30]
+
+
+def test_run_without_finished_tasks_has_no_critical_path():
+    run = timings({"r1": {}})
+
+    assert run.critical_path(0) is None
+    assert analyze(run) == {"runs_analyzed": 0, "task_count": 4, "bottlenecks": []}
+
+
+def test_analyze_ranks_bottlenecks_by_share_of_wall_time():
+    run = timings({
+        "r1": {"a": (0, 10), "b": (10, 40), "c": (12, 20), "d": (45, 50)},
+        "r2": {"a": (0, 10), "b": (10, 20), "c": (10, 50), "d": (50, 60)},
+    })
+
+    result = analyze(run)
+
+    assert result["runs_analyzed"] == 2
+    assert result["wall_time"]["max"] == 60
+    assert result["critical_path"] == {"task_ids": ["a", "b", "d"], "runs": 1, "distinct_paths": 2}
+    bottlenecks = {b["task_id"]: b for b in result["bottlenecks"]}
+    assert result["bottlenecks"][0]["task_id"] == "c"
+    assert bottlenecks["a"]["on_critical_path"] == 1
+    assert bottlenecks["b"]["on_critical_path"] == 0.5
+    assert abs(sum(b["share_of_wall_time"] for b in result["bottlenecks"]) - 1) < 1e-3
+    assert len(analyze(run, top=2)["bottlenecks"]) == 2
+
+
+def test_get_critical_path_analyzes_finished_runs(client, fake):
+    dag_id = next(iter(fake.dags))
+    finished = [run for run in fake._dag_runs(dag_id) if run["state"] in ("success", "failed")]
+
+    result = asyncio.run(AirflowDAGs(client).get_critical_path(dag_id, runs=3))
+
+    assert result["dag_id"] == dag_id
+    assert result["runs_analyzed"] == min(3, len(finished))
+    assert result["task_count"] == 3
+    assert set(result["critical_path"]["task_ids"]) <= {"task_0", "task_1", "task_2"}
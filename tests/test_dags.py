@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+
+from services.airflow_client import AirflowClient
+from services.bulk import BulkExecutor
+from tools.dags import AirflowDAGs
+
+
+def test_pause_all_dags_sees_pauses_made_elsewhere(client, fake):
+    async def scenario():
+        # Cache the DAG listing while every DAG is paused...
+        for dag in fake.dags.values():
+            dag["is_paused"] = True
+        await client.fetch_all("dags", "dags", {})
+        # ...then unpause one outside this server.
+        fake.dags["dag_00002"]["is_paused"] = False
+        return await AirflowDAGs(client).pause_all_dags(pause=True)
+
+    summary = asyncio.run(scenario())
+
+    assert summary["succeeded"] == 1
+    assert summary["skipped"] == len(fake.dags) - 1
+    assert fake.dags["dag_00002"]["is_paused"] is True
+
+
+def test_pause_all_dags_without_matches_returns_an_empty_summary(client):
+    summary = asyncio.run(AirflowDAGs(client).pause_all_dags(pause=True, dag_id_prefix="no_such_dag"))
+
+    assert summary == {"total": 0, "succeeded": 0, "failed": 0, "skipped": 0, "retries": 0, "errors": []}
+
+
+def test_pause_all_dags_retries_only_in_the_executor(fake):
+    attempts = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.method == "PATCH" and request.url.path.endswith("/dag_00001"):
+            attempts.append(request.url.path)
+            raise httpx.ConnectError("Connection refused", request=request)
+        return await fake.handle(request)
+
+    dags = AirflowDAGs(AirflowClient(transport=httpx.MockTransport(handle)))
+    dags.bulk = BulkExecutor(rate=0, retries=2, backoff=0)
+    for dag in fake.dags.values():
+        dag["is_paused"] = False
+
+    summary = asyncio.run(dags.pause_all_dags(pause=True))
+
+    assert (summary["succeeded"], summary["failed"], summary["retries"]) == (len(fake.dags) - 1, 1, 2)
+    assert len(attempts) == 3
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from services.airflow_client import AirflowClient
+from services.federation import Federation
+
+
+def test_instance_without_url_is_a_configuration_error(monkeypatch):
+    monkeypatch.setenv("_END_POINT_UTL", "http://default:8080")
+    monkeypatch.delenv("_AIRFLOW_EU_WEST_URL", raising=False)
+
+    with pytest.raises(ValueError, match="_AIRFLOW_EU_WEST_URL"):
+        AirflowClient(instance="eu-west")
+
+
+def test_federation_reads_each_instance_url(monkeypatch, fake):
+    monkeypatch.setenv("_AIRFLOW_INSTANCES", "eu, us")
+    monkeypatch.setenv("_AIRFLOW_EU_URL", "http://eu:8080")
+    monkeypatch.setenv("_AIRFLOW_US_URL", "http://us:8080")
+
+    federation = Federation.from_env(transport=fake.transport())
+
+    assert {name: client.endpoint_url for name, client in federation.clients.items()} == {
+        "eu": "http://eu:8080",
+        "us": "http://us:8080",
+    }
+    asyncio.run(federation.aclose())
+
+
+def test_federation_rejects_an_instance_without_url(monkeypatch):
+    monkeypatch.setenv("_AIRFLOW_INSTANCES", "eu,us")
+    monkeypatch.setenv("_AIRFLOW_EU_URL", "http://eu:8080")
+    monkeypatch.delenv("_AIRFLOW_US_URL", raising=False)
+
+    with pytest.raises(ValueError, match="_AIRFLOW_US_URL"):
+        Federation.from_env()
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from tools.dags import AirflowDAGs
+from tools.tasks_instance import AirflowTasksInstance
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def by_group(summary: list[dict]) -> dict:
+    return {(row["dag_id"], row["state"]): row for row in summary}
+
+
+def assert_same_summary(db_summary: list[dict], rest_summary: list[dict]) -> None:
+    db_rows, rest_rows = by_group(db_summary), by_group(rest_summary)
+    assert db_rows.keys() == rest_rows.keys()
+    for group, rest in rest_rows.items():
+        db = db_rows[group]
+        assert db["count"] == rest["count"]
+        for field in ("avg_duration", "max_duration"):
+            if rest[field] is None:
+                assert db[field] is None
+            else:
+                assert db[field] == pytest.approx(rest[field], abs=0.01)
+
+
+# ------------------------------ MetadataDB queries ----------------------------- #
+def test_dag_run_summary_query(metadata_db, fake):
+    summary = run(metadata_db.dag_run_summary())
+
+    assert sum(row["count"] for row in summary) == len(fake.dags) * fake.runs_per_dag
+    assert [row["count"] for row in summary] == sorted((row["count"] for row in summary), reverse=True)
+    running = [row for row in summary if row["state"] == "running"]
+    assert running and all(row["avg_duration"] is None for row in running)
+
+
+def test_task_instance_summary_query_filters(metadata_db):
+    summary = run(metadata_db.task_instance_summary(dag_ids=["dag_00001"], states=["success"]))
+
+    assert [(row["dag_id"], row["state"]) for row in summary] == [("dag_00001", "success")]
+    assert summary[0]["max_duration"] >= summary[0]["avg_duration"] > 0
+
+
+def test_task_instances_stream_through_a_server_side_cursor(metadata_db):
+    async def collect():
+        return [row async for row in metadata_db.task_instances(5, states=["success"])]
+
+    rows = run(collect())
+
+    assert len(rows) == 5
+    assert all(row["state"] == "success" for row in rows)
+    assert [row["start_date"] for row in rows] == sorted((row["start_date"] for row in rows), reverse=True)
+    assert ("execute", "mcp_stream") in metadata_db.log
+
+
+def test_stream_fetches_in_batches(metadata_db, fake):
+    async def collect():
+        return [row async for row in metadata_db.stream("SELECT dag_id, run_id FROM dag_run", batch_size=5)]
+
+    rows = run(collect())
+
+    assert len(rows) == len(fake.dags) * fake.runs_per_dag
+    # 24 rows in batches of 5, plus the empty fetch that ends the stream.
+    assert metadata_db.log.count(("fetchmany", "mcp_stream")) == 6
+
+
+def test_dag_run_timings_query(metadata_db):
+    async def collect():
+        return [row async for row in metadata_db.dag_run_timings(dag_ids=["dag_00002"])]
+
+    rows = run(collect())
+
+    finished = [row for row in rows if row["state"] in ("success", "failed")]
+    assert {row["dag_id"] for row in rows} == {"dag_00002"}
+    assert finished and all(60 <= row["duration"] <= 3600 for row in finished)
+    assert all(row["start"] > 1.7e9 for row in rows)
+
+
+# ------------------------------- Tool backends -------------------------------- #
+def test_dag_run_summary_backends_agree(client, metadata_db):
+    rest = run(AirflowDAGs(client).get_dag_run_summary())
+    client.metadata_db = metadata_db
+    db = run(AirflowDAGs(client).get_dag_run_summary())
+
+    assert rest["backend"] == "rest"
+    assert db["backend"] == "metadata_db"
+    assert_same_summary(db["summary"], rest["summary"])
+
+
+def test_task_instance_summary_backends_agree(client, metadata_db):
+    filters = {"dag_ids": ["dag_00000", "dag_00003"], "states": ["success", "failed"]}
+    rest = run(AirflowTasksInstance(client).get_task_instance_summary(**filters))
+    client.metadata_db = metadata_db
+    db = run(AirflowTasksInstance(client).get_task_instance_summary(**filters))
+
+    assert (rest["backend"], db["backend"]) == ("rest", "metadata_db")
+    assert_same_summary(db["summary"], rest["summary"])
+
+
+def test_query_task_instances_backends_agree(client, metadata_db):
+    filters = {"dag_ids": ["dag_00001"], "start_date_gte": "2025-01-03T00:00:00Z", "limit": 4}
+    rest = run(AirflowTasksInstance(client).query_task_instances(**filters))
+    client.metadata_db = metadata_db
+    db = run(AirflowTasksInstance(client).query_task_instances(**filters))
+
+    assert (rest["backend"], db["backend"]) == ("rest", "metadata_db")
+    identity = lambda row: (row["dag_run_id"], row["task_id"], row["start_date"])  # noqa: E731
+    assert [identity(row) for row in db["task_instances"]] == [identity(row) for row in rest["task_instances"]]
+
+
+def test_dag_run_stats_backends_agree(client, metadata_db):
+    rest = run(AirflowDAGs(client).get_dag_run_stats())
+    client.metadata_db = metadata_db
+    db = run(AirflowDAGs(client).get_dag_run_stats())
+
+    assert (rest["backend"], db["backend"]) == ("rest", "metadata_db")
+    assert db["total_runs"] == rest["total_runs"]
+    rest_dags = {row["dag_id"]: row for row in rest["dags"]}
+    for row in db["dags"]:
+        assert row["failed"] == rest_dags[row["dag_id"]]["failed"]
+        assert row["duration_p50"] == pytest.approx(rest_dags[row["dag_id"]]["duration_p50"], abs=0.1)
+
+
+def test_falls_back_to_rest_when_the_database_fails(client, broken_metadata_db, capsys):
+    rest = run(AirflowDAGs(client).get_dag_run_summary())
+    client.metadata_db = broken_metadata_db
+
+    dag_runs = run(AirflowDAGs(client).get_dag_run_summary())
+    task_instances = run(AirflowTasksInstance(client).query_task_instances(limit=3))
+
+    assert dag_runs == rest
+    assert task_instances["backend"] == "rest" and len(task_instances["task_instances"]) == 3
+    assert "falling back to REST" in capsys.readouterr().err
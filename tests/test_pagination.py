@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from fake_airflow import FakeAirflow
+from services.airflow_client import AirflowClient
+
+
+def without_totals(fake):
+    """A transport that strips `total_entries`, as some list endpoints do."""
+    async def handle(request: httpx.Request) -> httpx.Response:
+        response = await fake.handle(request)
+        body = json.loads(await response.aread())
+        if isinstance(body, dict):
+            body.pop("total_entries", None)
+        return httpx.Response(response.status_code, json=body)
+
+    return httpx.MockTransport(handle)
+
+
+@pytest.mark.parametrize("dags", [30, 28, 7, 1, 0])
+def test_pages_capped_below_the_page_size_lose_nothing(dags):
+    fake = FakeAirflow(dags=dags, runs_per_dag=1, tasks_per_dag=1, max_page_limit=7)
+    client = AirflowClient(transport=fake.transport())
+
+    result = asyncio.run(client.fetch_all("dags", "dags", page_size=10, cache=False))
+
+    assert [dag["dag_id"] for dag in result["dags"]] == list(fake.dags)
+    assert fake.requests["GET dags"] == max(1, -(-dags // 7))
+
+
+@pytest.mark.parametrize("dags", [30, 28, 7, 3])
+def test_pages_without_a_total_are_walked_until_a_short_page(dags):
+    fake = FakeAirflow(dags=dags, runs_per_dag=1, tasks_per_dag=1, max_page_limit=7)
+    client = AirflowClient(transport=without_totals(fake))
+
+    result = asyncio.run(client.fetch_all("dags", "dags", page_size=10, cache=False))
+
+    assert [dag["dag_id"] for dag in result["dags"]] == list(fake.dags)
+
+
+def test_uneven_last_page(fake):
+    client = AirflowClient(transport=fake.transport())
+
+    result = asyncio.run(client.fetch_all("dags/dag_00000/dagRuns", "dag_runs", page_size=4, max_concurrency=1))
+
+    assert len(result["dag_runs"]) == fake.runs_per_dag == 6
+    assert len({run["dag_run_id"] for run in result["dag_runs"]}) == 6
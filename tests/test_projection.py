@@ -0,0 +1,67 @@
+import asyncio
+
+from services.models import DagRun
+from services.projection import project, shape, tabulate
+from tools.dags import AirflowDAGs
+
+DAGS = [
+    {"dag_id": "a", "is_paused": False, "owners": ["ops"], "dag_versions": [{"version_number": 1, "bundle_name": "x"}]},
+    {"dag_id": "b", "is_paused": True, "tags": [{"name": "etl"}], "dag_versions": []},
+]
+
+
+def test_project_keeps_dotted_paths_through_lists():
+    assert project(DAGS, ["dag_id", "dag_versions.version_number"]) == [
+        {"dag_id": "a", "dag_versions": [{"version_number": 1}]},
+        {"dag_id": "b", "dag_versions": []},
+    ]
+
+
+def test_project_ignores_unknown_fields_and_passes_through_without_fields():
+    assert project(DAGS, ["dag_id", "no_such_field"]) == [{"dag_id": "a"}, {"dag_id": "b"}]
+    assert project(DAGS, None) is DAGS
+
+
+def test_tabulate_writes_columns_once_in_order_of_first_appearance():
+    table = tabulate([{"dag_id": "a", "is_paused": False}, {"dag_id": "b", "tags": ["etl"]}])
+
+    assert table == {"columns": ["dag_id", "is_paused", "tags"], "rows": [["a", False, None], ["b", None, ["etl"]]]}
+
+
+def test_tabulate_uses_the_top_level_of_requested_fields_as_columns():
+    table = tabulate(DAGS, ["dag_id", "dag_versions.version_number", "dag_versions.bundle_name"])
+
+    assert table["columns"] == ["dag_id", "dag_versions"]
+    assert table["rows"][0] == ["a", [{"version_number": 1, "bundle_name": "x"}]]
+
+
+def test_shape_applies_to_the_records_of_a_listing():
+    response = {"dags": DAGS, "total_entries": 2}
+
+    shaped = shape(response, ["dag_id"], "table", key="dags")
+
+    assert shaped == {"dags": {"columns": ["dag_id"], "rows": [["a"], ["b"]]}, "total_entries": 2}
+    assert response["dags"] is DAGS
+
+
+def test_shape_converts_typed_records_to_dicts():
+    runs = [DagRun(dag_run_id="r1", dag_id="a", state="success")]
+
+    assert shape(runs, ["dag_run_id", "state"]) == [{"dag_run_id": "r1", "state": "success"}]
+
+
+def test_shape_passes_errors_through_and_rejects_unknown_formats():
+    error = {"status": 404, "error": "not found"}
+
+    assert shape(error, ["dag_id"], "table", key="dags") is error
+    assert "Unknown output_format" in shape(DAGS, output_format="csv")["error"]
+
+
+def test_get_dag_runs_returns_a_table_of_the_requested_fields(client, fake):
+    dag_id = next(iter(fake.dags))
+
+    table = asyncio.run(AirflowDAGs(client).get_dag_runs(dag_id, fields=["dag_run_id", "state"], output_format="table"))
+
+    assert table["columns"] == ["dag_run_id", "state"]
+    assert len(table["rows"]) == 6
+    assert {run_id for run_id, _ in table["rows"]} == {run["dag_run_id"] for run in fake._dag_runs(dag_id)}
@@ -0,0 +1,86 @@
+import json
+
+from mcp.server.fastmcp.utilities.func_metadata import _convert_to_content
+
+from services.result_store import ResultStore
+
+
+def result(rows: int, marker: str = "x") -> dict:
+    return {"dag_runs": [{"dag_run_id": f"{marker}_{i:04d}", "note": marker * 80} for i in range(rows)], "total_entries": rows}
+
+
+def collect(store: ResultStore, first: dict) -> list:
+    items, response = list(first["dag_runs"]), first
+    while response["next_cursor"]:
+        response = store.fetch(response["next_cursor"])
+        items += response["dag_runs"]
+    return items
+
+
+def test_pages_cover_the_whole_result():
+    store = ResultStore(page_bytes=1024, max_bytes=64 * 1024, ttl=60)
+    full = result(100)
+
+    first = store.page(full)
+
+    assert first["total_entries"] == 100 and first["page"]["total"] == 100
+    assert collect(store, first) == full["dag_runs"]
+
+
+def test_oldest_results_are_evicted_to_make_room():
+    store = ResultStore(page_bytes=1024, max_bytes=16 * 1024, ttl=60)
+    older = store.page(result(100, "a"))
+    newer = store.page(result(100, "b"))
+
+    # Each result takes over half the store, so the second one evicts the first.
+    assert store.counters["evictions"] == 1
+    assert "error" in store.fetch(older["next_cursor"])
+    assert len(collect(store, newer)) == 100
+    assert store.stats()["bytes"] <= store.max_bytes
+
+
+def test_result_larger_than_the_store_is_an_error():
+    store = ResultStore(page_bytes=1024, max_bytes=8 * 1024, ttl=60)
+
+    response = store.page(result(100))
+
+    assert set(response) == {"error"}
+    assert "_MCP_RESULT_STORE_MAX_BYTES" in response["error"]
+    assert store.stats()["results"] == 0 and store.counters["too_large"] == 1
+
+
+def test_small_results_are_encoded_once_as_fastmcp_would():
+    store = ResultStore(page_bytes=64 * 1024, max_bytes=1024 * 1024, ttl=60)
+    small = result(10)
+
+    text = store.page(small)
+
+    assert isinstance(text, str)
+    assert _convert_to_content(text)[0].text == _convert_to_content(small)[0].text
+    assert store.stats()["results"] == 0
+
+
+def test_bare_lists_have_the_same_shape_paged_or_not():
+    store = ResultStore(page_bytes=1024, max_bytes=64 * 1024, ttl=60)
+    names = [f"dag_{i:05d}" for i in range(500)]
+
+    small = json.loads(store.page(names[:3]))
+    first = store.page(names)
+
+    assert small == {"items": names[:3]}
+    assert set(first) == {"items", "page", "next_cursor"}
+    items, response = list(first["items"]), first
+    while response["next_cursor"]:
+        response = store.fetch(response["next_cursor"])
+        items += response["items"]
+    assert items == names
+
+
+def test_errors_and_results_without_a_list_are_returned_unchanged():
+    store = ResultStore(page_bytes=16, max_bytes=1024, ttl=60)
+    error = {"status": 404, "error": "x" * 100}
+    message = {"message": "y" * 100}
+
+    assert store.page(error) is error
+    assert store.page(message) is message
+    assert store.page("Backfill created.") == "Backfill created."
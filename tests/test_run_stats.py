@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import SQLiteMetadataDB, SQLitePool, load
+from fake_airflow import FakeAirflow
+from services.airflow_client import AirflowClient
+from services.run_stats import RunHistory, summarize_history
+from tools.dags import AirflowDAGs
+
+
+def history(durations: list[float]) -> RunHistory:
+    runs = RunHistory()
+    for day, duration in enumerate(durations):
+        runs.append("success", 1.7e9 + day * 86400, duration, f"run_{day:03d}")
+    return runs
+
+
+def test_anomalies_name_their_runs():
+    durations = [600.0 + (day % 5) for day in range(40)]
+    durations[17] = 5400.0
+
+    summary = summarize_history("etl", history(durations))
+
+    assert summary["mad_anomalies"] == 1
+    [anomaly] = summary["anomalies"]
+    assert anomaly["dag_run_id"] == "run_017"
+    assert anomaly["duration"] == 5400.0
+    assert anomaly["mad_score"] > 3.5
+
+
+def test_untimed_runs_do_not_shift_anomaly_run_ids():
+    runs = history([600.0] * 10 + [3000.0, 601.0, 602.0])
+    runs.append("running", 1.7e9, None, "still_running")
+
+    summary = summarize_history("etl", runs)
+
+    assert [anomaly["dag_run_id"] for anomaly in summary["anomalies"]] == ["run_010"]
+    assert summary["runs"] == 14 and summary["timed_runs"] == 13
+
+
+def test_trend_and_percentiles():
+    summary = summarize_history("etl", history([100.0 + 10 * day for day in range(11)]))
+
+    assert summary["trend_seconds_per_day"] == pytest.approx(10.0)
+    assert summary["duration_p50"] == 150.0
+    assert summary["duration_max"] == 200.0
+    assert summary["failure_rate"] == 0
+
+
+def test_both_backends_report_the_same_anomalous_runs(tmp_path):
+    fake = FakeAirflow(dags=1, runs_per_dag=30, tasks_per_dag=1)
+    finished = [run for run in fake._dag_runs("dag_00000") if run["end_date"]]
+    for i, run in enumerate(finished):
+        start = datetime.fromisoformat(run["start_date"].replace("Z", "+00:00"))
+        minutes = 300 if i == 7 else 10 + i % 4
+        run["end_date"] = (start + timedelta(minutes=minutes)).isoformat().replace("+00:00", "Z")
+    load(fake, tmp_path / "airflow.db")
+    client = AirflowClient(transport=fake.transport())
+
+    rest = asyncio.run(AirflowDAGs(client).get_dag_run_stats())
+    client.metadata_db = SQLiteMetadataDB(SQLitePool(tmp_path / "airflow.db", []))
+    db = asyncio.run(AirflowDAGs(client).get_dag_run_stats())
+
+    assert (rest["backend"], db["backend"]) == ("rest", "metadata_db")
+    for result in (rest, db):
+        [dag] = result["dags"]
+        assert [anomaly["dag_run_id"] for anomaly in dag["anomalies"]] == [finished[7]["dag_run_id"]]
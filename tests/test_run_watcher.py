@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from services.airflow_client import AirflowClient
+from services.run_watcher import RunWatcher
+
+
+class Session:
+    """Stands in for an MCP session, which the watcher holds weakly."""
+
+
+def recording(fake):
+    """A transport that records the `updated_at_gte` cursor of every DAG run listing."""
+    cursors = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/dagRuns"):
+            cursors.append(datetime.fromisoformat(request.url.params["updated_at_gte"]))
+        return await fake.handle(request)
+
+    return httpx.MockTransport(handle), cursors
+
+
+def test_watch_reports_each_transition_once_and_advances_the_cursor(fake):
+    transport, cursors = recording(fake)
+    watcher = RunWatcher(AirflowClient(transport=transport), lookback=600)
+    session = Session()
+
+    async def scenario():
+        first = await watcher.watch(["dag_00000"], session=session, timeout=0)
+        second = await watcher.watch(["dag_00000"], session=session, timeout=0)
+        running = next(run for run in fake._dag_runs("dag_00000") if run["state"] == "running")
+        running["state"] = "success"
+        third = await watcher.watch(["dag_00000"], session=session, timeout=0, include_task_instances=False)
+        return first, second, third, running["dag_run_id"]
+
+    first, second, third, finished = asyncio.run(scenario())
+
+    assert len(first["run_changes"]) == fake.runs_per_dag
+    assert all(change["previous_state"] is None for change in first["run_changes"])
+    assert first["active_runs"] == 1
+    # The overlap window returns the same runs again; unchanged states are not reported twice.
+    assert second["run_changes"] == [] and second["task_instance_changes"] == []
+    assert [(c["dag_run_id"], c["previous_state"], c["state"]) for c in third["run_changes"]] == [
+        (finished, "running", "success")
+    ]
+    assert third["active_runs"] == 0
+    # Each poll starts from the previous poll's start time minus the overlap.
+    assert cursors == sorted(cursors)
+    assert (cursors[1] - cursors[0]).total_seconds() > 500
+    assert datetime.fromisoformat(second["cursors"]["dag_00000"]) == cursors[2]
+
+
+def test_sessions_keep_their_own_cursors(client, fake):
+    watcher = RunWatcher(client)
+    first, second = Session(), Session()
+
+    async def scenario():
+        await watcher.watch(["dag_00001"], session=first, timeout=0)
+        return await watcher.watch(["dag_00001"], session=second, timeout=0)
+
+    other_session = asyncio.run(scenario())
+
+    assert len(other_session["run_changes"]) == fake.runs_per_dag
+
+
+def test_idle_and_least_recently_watched_states_are_evicted(client):
+    watcher = RunWatcher(client, max_dags=2)
+
+    async def watch(*dag_ids):
+        return await watcher.watch(list(dag_ids), timeout=0, include_task_instances=False)
+
+    async def scenario():
+        await watch("dag_00000")
+        await watch("dag_00001")
+        await watch("dag_00000")
+        await watch("dag_00002")
+        kept = list(watcher._default)
+        watcher.idle_ttl = 1e-9
+        await watch("dag_00003")
+        return kept, list(watcher._default)
+
+    kept, after_idle = asyncio.run(scenario())
+
+    assert kept == ["dag_00000", "dag_00002"]
+    assert after_idle == ["dag_00003"]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from fake_airflow import FakeAirflow
+from services.airflow_client import AirflowClient
+from tools.tasks_instance import AirflowTasksInstance
+
+BATCH = "dags/~/dagRuns/~/taskInstances/list"
+
+
+@pytest.fixture
+def big_fake():
+    # 4 DAGs x 30 runs x 3 tasks: several pages of the batch endpoint.
+    return FakeAirflow(dags=4, runs_per_dag=30, tasks_per_dag=3, connections=0, assets=0)
+
+
+def shifting(fake):
+    """A transport whose later batch pages repeat the first task instance, as if rows moved between pages."""
+    first = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        response = await fake.handle(request)
+        if not request.url.path.endswith(BATCH):
+            return response
+        body = json.loads(response.content)
+        if json.loads(request.content).get("page_offset", 0) == 0:
+            first[:] = body["task_instances"][:1]
+        else:
+            body["task_instances"] = first + body["task_instances"]
+        return httpx.Response(200, json=body)
+
+    return httpx.MockTransport(handle)
+
+
+def identity(task_instance: dict) -> tuple:
+    return task_instance["dag_id"], task_instance["dag_run_id"], task_instance["task_id"], task_instance.get("map_index", -1)
+
+
+def test_batch_drops_task_instances_repeated_across_pages(big_fake):
+    client = AirflowClient(transport=shifting(big_fake))
+
+    response = asyncio.run(AirflowTasksInstance(client).get_task_instances_batch())
+
+    identities = [identity(ti) for ti in response["task_instances"]]
+    assert len(identities) == len(set(identities)) == 4 * 30 * 3
+    assert response["total_entries"] == 4 * 30 * 3
+    assert response["truncated"] is False
+    assert big_fake.requests[f"POST {BATCH}"] > 1
+
+
+def test_batch_stops_at_max_results(big_fake):
+    client = AirflowClient(transport=big_fake.transport())
+
+    response = asyncio.run(AirflowTasksInstance(client).get_task_instances_batch(max_results=10))
+
+    assert len(response["task_instances"]) == response["total_entries"] == 10
+    assert response["truncated"] is True
+
+
+def test_batch_is_not_truncated_when_the_results_fit_exactly(big_fake):
+    client = AirflowClient(transport=big_fake.transport())
+
+    response = asyncio.run(AirflowTasksInstance(client).get_task_instances_batch(max_results=4 * 30 * 3))
+
+    assert response["total_entries"] == 4 * 30 * 3
+    assert response["truncated"] is False
+
+
+def test_batch_forwards_filters(client, fake):
+    dag_id = next(iter(fake.dags))
+
+    response = asyncio.run(
+        AirflowTasksInstance(client).get_task_instances_batch(dag_ids=[dag_id], task_ids=["task_0"])
+    )
+
+    assert response["total_entries"] == 6
+    assert {(ti["dag_id"], ti["task_id"]) for ti in response["task_instances"]} == {(dag_id, "task_0")}
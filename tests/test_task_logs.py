@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from fake_airflow import FakeAirflow
+from services.airflow_client import AirflowClient
+from tools.task_logs import AirflowTaskLogs
+
+
+@pytest.fixture
+def logs():
+    # 1200 lines, served as pages of 500.
+    fake = FakeAirflow(dags=1, runs_per_dag=2, tasks_per_dag=1, connections=0, assets=0, log_lines=1200)
+    dag_id = next(iter(fake.dags))
+    run_id = fake._dag_runs(dag_id)[0]["dag_run_id"]
+    tool = AirflowTaskLogs(AirflowClient(transport=fake.transport()))
+
+    def read(**kwargs):
+        return asyncio.run(tool.get_task_logs(dag_id, run_id, "task_0", **kwargs))
+
+    return read
+
+
+def test_whole_log_is_read_across_pages(logs):
+    result = logs(max_bytes=10_000_000)
+
+    assert result["lines_scanned"] == 1200
+    assert len(result["log"].splitlines()) == 1200
+    assert result["truncated"] is False
+    assert result["end_of_log"] is True
+    assert result["try_number"] == 1
+
+
+def test_head_stops_reading_at_max_bytes(logs):
+    result = logs(max_bytes=2000)
+
+    assert len(result["log"].encode()) <= 2000
+    assert result["log"].splitlines()[0].endswith("Processed batch 0 of task_0")
+    assert result["truncated"] is True
+    # The limit is hit on the first page, so the rest of the log is never fetched.
+    assert result["pages"] == 1
+    assert result["end_of_log"] is False
+
+
+def test_tail_returns_the_last_lines(logs):
+    result = logs(tail_lines=3, max_bytes=10_000)
+
+    assert [line.rsplit(" ", 3)[1] for line in result["log"].splitlines()] == ["1197", "1198", "1199"]
+    assert result["truncated"] is True
+    assert result["end_of_log"] is True
+
+
+def test_tail_is_still_capped_at_max_bytes(logs):
+    longest = max(len(line.encode()) for line in logs(tail_lines=50, max_bytes=10_000)["log"].splitlines())
+
+    result = logs(tail_lines=50, max_bytes=longest * 5)
+
+    lines = result["log"].splitlines()
+    assert 0 < len(lines) < 50
+    assert lines[-1].endswith("Processed batch 1199 of task_0")
+    assert len(result["log"].encode()) <= longest * 5
+
+
+def test_grep_keeps_only_matching_lines(logs):
+    result = logs(grep="WARNING", max_bytes=10_000_000)
+
+    lines = result["log"].splitlines()
+    # The fake logs a warning every 97 lines.
+    assert len(lines) == result["lines_matched"] == len(range(0, 1200, 97))
+    assert all("[warning]" in line for line in lines)
+    assert result["lines_scanned"] == 1200
+
+
+def test_grep_combines_with_tail_and_honors_case(logs):
+    assert logs(grep="WARNING", ignore_case=False)["lines_matched"] == 0
+
+    result = logs(grep="warning", tail_lines=2)
+
+    assert [line.rsplit(" ", 3)[1] for line in result["log"].splitlines()] == ["1067", "1164"]
+
+
+def test_invalid_grep_pattern_is_an_error(logs):
+    assert "Invalid grep pattern" in logs(grep="(")["error"]
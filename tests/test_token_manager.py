@@ -0,0 +1,122 @@
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+
+from services.airflow_client import AirflowClient
+from services.token_manager import TokenManager
+
+
+def jwt(exp: float | None, serial: int) -> str:
+    claims = {"sub": "airflow", "n": serial, **({"exp": exp} if exp is not None else {})}
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"e30.{payload}.sig"
+
+
+class AuthServer:
+    """Issues a new token per `/auth/token` call, each valid for `lifetime` seconds."""
+
+    def __init__(self, lifetime: float | None = 3600, delay: float = 0.0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.issued = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.delay)
+        exp = time.time() + self.lifetime if self.lifetime is not None else None
+        self.issued.append(jwt(exp, len(self.issued)))
+        return httpx.Response(201, json={"access_token": self.issued[-1]})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+
+def test_concurrent_callers_share_one_token_request():
+    server = AuthServer(delay=0.01)
+    manager = TokenManager("http://airflow", "airflow", "airflow")
+
+    async def scenario():
+        async with server.client() as http:
+            return await asyncio.gather(*(manager.get_token(http) for _ in range(20)))
+
+    tokens = asyncio.run(scenario())
+
+    assert len(server.issued) == 1
+    assert set(tokens) == {server.issued[0]}
+
+
+def test_token_near_expiry_is_served_while_it_refreshes_in_the_background():
+    server = AuthServer(lifetime=30)  # inside the 60 s refresh margin
+    manager = TokenManager("http://airflow", "airflow", "airflow", refresh_margin=60)
+
+    async def scenario():
+        async with server.client() as http:
+            first = await manager.get_token(http)
+            server.lifetime = 3600
+            during = await manager.get_token(http)  # still valid: served without waiting
+            await manager._refresh_task
+            after = await manager.get_token(http)
+            return first, during, after
+
+    first, during, after = asyncio.run(scenario())
+
+    assert first == during == server.issued[0]
+    assert after == server.issued[1]
+    assert len(server.issued) == 2
+
+
+def test_expired_token_is_refreshed_before_use():
+    server = AuthServer()
+    manager = TokenManager("http://airflow", "airflow", "airflow")
+
+    async def scenario():
+        async with server.client() as http:
+            await manager.get_token(http)
+            manager._expires_at = time.time() - 1
+            return await manager.get_token(http)
+
+    assert asyncio.run(scenario()) == server.issued[1]
+
+
+def test_token_without_exp_gets_the_default_lifetime():
+    server = AuthServer(lifetime=None)
+    manager = TokenManager("http://airflow", "airflow", "airflow", default_lifetime=300)
+
+    async def scenario():
+        async with server.client() as http:
+            return await manager.get_token(http)
+
+    before = time.time()
+    asyncio.run(scenario())
+
+    assert TokenManager.decode_expiry(server.issued[0]) is None
+    assert before + 299 <= manager._expires_at <= time.time() + 300
+    assert TokenManager.decode_expiry("not-a-jwt") is None
+
+
+def test_a_burst_of_401s_for_one_stale_token_refreshes_once(fake):
+    server = AuthServer()
+    stale = set()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("auth/token"):
+            return await server.handle(request)
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        if token == server.issued[0]:
+            stale.add(token)
+            return httpx.Response(401, json={"detail": "Token expired"})
+        return await fake.handle(request)
+
+    client = AirflowClient(transport=httpx.MockTransport(handle))
+
+    async def scenario():
+        await client.generate_jwt_token()
+        return await asyncio.gather(*(client.api_request(f"dags/dag_0000{i}", "get", cache=False) for i in range(4)))
+
+    responses = asyncio.run(scenario())
+
+    assert [response["dag_id"] for response in responses] == [f"dag_0000{i}" for i in range(4)]
+    assert stale == {server.issued[0]}
+    assert len(server.issued) == 2